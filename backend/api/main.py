@@ -3,9 +3,9 @@ import logging
 from fastapi import FastAPI, Depends, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-from database.connection import create_tables, close_db
-from services.bot_manager import bot_manager, start_bot_system, stop_bot_system
-from services.verification_service import verification_service, start_verification_service, stop_verification_service
+from database.connection import create_tables, close_db, get_pool_status
+from services.verification_service import verification_service
+from services.worker_lease import get_lease_states
 from api.routes import search_api
 
 # Configure logging
@@ -25,22 +25,15 @@ async def lifespan(app: FastAPI):
     await create_tables()
     logger.info("Database tables created")
     
-    # Start bot system in background
-    asyncio.create_task(start_bot_system())
-    logger.info("Bot system started")
-    
-    # Start verification service in background
-    asyncio.create_task(start_verification_service())
-    logger.info("Verification service started")
+    # Bots and the verifier run in worker.py; this process only reads their state
     
     yield
     
     # Shutdown
     logger.info("Shutting down Granada Search Backend")
     
-    # Stop services
-    await stop_bot_system()
-    await stop_verification_service()
+    # Close the session used for on-demand verification
+    await verification_service.verifier.close_session()
     
     # Close database connections
     await close_db()
@@ -68,23 +61,29 @@ app.include_router(search_api.router, prefix="/api/search", tags=["search"])
 
 @app.get("/")
 async def root():
+    leases = await get_lease_states()
+    bots = leases.get('bot_manager', {})
+    verifier = leases.get('verification_service', {})
+    
     return {
         "name": "Granada Search Backend",
         "version": "1.0.0",
         "status": "running",
-        "bots_active": len(bot_manager.bots),
-        "verification_service": "running" if verification_service.running else "stopped"
+        "bots_active": len(bots.get('status', {}).get('bots', {})) if bots.get('running') else 0,
+        "verification_service": "running" if verifier.get('running') else "stopped"
     }
 
 @app.get("/health")
 async def health_check():
     # Check database connection
     try:
+        leases = await get_lease_states()
+        
         # Check bot system
-        bot_status = "healthy" if bot_manager.running else "stopped"
+        bot_status = "healthy" if leases.get('bot_manager', {}).get('running') else "stopped"
         
         # Check verification service
-        verification_status = "healthy" if verification_service.running else "stopped"
+        verification_status = "healthy" if leases.get('verification_service', {}).get('running') else "stopped"
         
         return {
             "status": "healthy",
@@ -92,7 +91,12 @@ async def health_check():
             "services": {
                 "bot_system": bot_status,
                 "verification_service": verification_status
-            }
+            },
+            "workers": {
+                name: {"holder": lease['holder'], "heartbeat_at": lease['heartbeat_at']}
+                for name, lease in leases.items() if lease['running']
+            },
+            "database_pool": get_pool_status()
         }
     except Exception as e:
         logger.error(f"Health check failed: {e}")
@@ -5,8 +5,13 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, and_, or_, desc
 from database.connection import get_db_session
 from database.models import DonorOpportunity, SearchStatistics
-from services.bot_manager import bot_manager
 from services.verification_service import verification_service
+from services.worker_lease import get_lease_state
+from services.bot_manager import bot_configs
+from tasks.celery import app as celery_app
+from services.search_index import apply_full_text_search, order_by_relevance
+from services.count_estimator import count_estimator
+from services.pagination import apply_opportunity_cursor, encode_opportunity_cursor, scraped_at_key
 import uuid
 
 router = APIRouter()
@@ -21,9 +26,14 @@ async def get_opportunities(
     verified_only: bool = False,
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
     db: AsyncSession = Depends(get_db_session)
 ):
-    """Get funding opportunities with filtering"""
+    """Get funding opportunities with filtering.
+    
+    Pass the previous response's next_cursor as cursor for keyset
+    pagination; offset is ignored when a cursor is given.
+    """
     try:
         # Build query
         stmt = select(DonorOpportunity).where(
@@ -31,20 +41,9 @@ async def get_opportunities(
         )
         
         # Apply filters
-        if query:
-            search_terms = [term.strip() for term in query.split() if term.strip()]
-            search_conditions = []
-            
-            for term in search_terms:
-                search_conditions.append(
-                    or_(
-                        DonorOpportunity.title.ilike(f"%{term}%"),
-                        DonorOpportunity.description.ilike(f"%{term}%")
-                    )
-                )
-            
-            if search_conditions:
-                stmt = stmt.where(and_(*search_conditions))
+        rank = None
+        if query and query.strip():
+            stmt, rank = apply_full_text_search(stmt, query.strip())
         
         if country:
             stmt = stmt.where(DonorOpportunity.country == country)
@@ -71,26 +70,62 @@ async def get_opportunities(
         if verified_only:
             stmt = stmt.where(DonorOpportunity.is_verified == True)
         
-        # Order by most recent first
-        stmt = stmt.order_by(desc(DonorOpportunity.scraped_at))
+        # Large listings report an estimated total instead of counting exactly
+        filter_signature = (query, country, sector, min_amount, max_amount, verified_only)
+        estimated_total = await count_estimator.estimate(db, stmt, filter_signature)
+        count_stmt = stmt
+        
+        # Keyset pagination: continue after the row the cursor points at
+        if cursor:
+            try:
+                stmt = apply_opportunity_cursor(stmt, cursor, rank)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+        
+        # Count matching rows in the same round trip as the page itself. A
+        # cursor page only sees rows after the cursor, so it can't do this.
+        use_window_count = estimated_total is None and not cursor
+        if use_window_count:
+            stmt = stmt.add_columns(func.count().over().label('total_count'))
+        
+        if rank is not None:
+            stmt = stmt.add_columns(rank.label('rank'))
+        
+        # Order by relevance for text searches, most recent first otherwise
+        if rank is not None:
+            stmt = order_by_relevance(stmt, rank)
+        else:
+            stmt = stmt.order_by(desc(scraped_at_key), desc(DonorOpportunity.id))
         
         # Apply pagination
-        stmt = stmt.offset(offset).limit(limit)
+        if not cursor:
+            stmt = stmt.offset(offset)
+        stmt = stmt.limit(limit)
         
         # Execute query
         result = await db.execute(stmt)
-        opportunities = result.scalars().all()
+        rows = result.all()
+        opportunities = [row[0] for row in rows]
+        
+        if estimated_total is not None:
+            total_count = estimated_total
+        elif use_window_count and rows:
+            total_count = rows[0].total_count
+        elif use_window_count and offset == 0:
+            total_count = 0
+        else:
+            # Cursor page, or paged past the end: the window count has no row to ride on
+            total_count = count_estimator.cached(filter_signature)
+            if total_count is None:
+                total_count = await count_estimator.exact_count(db, count_stmt)
         
-        # Get total count
-        count_stmt = select(func.count()).select_from(DonorOpportunity).where(
-            DonorOpportunity.is_active == True
-        )
+        if estimated_total is None:
+            count_estimator.record(filter_signature, total_count)
         
-        if verified_only:
-            count_stmt = count_stmt.where(DonorOpportunity.is_verified == True)
-            
-        count_result = await db.execute(count_stmt)
-        total_count = count_result.scalar()
+        next_cursor = None
+        if len(rows) == limit:
+            last = rows[-1]
+            next_cursor = encode_opportunity_cursor(last[0], last.rank if rank is not None else None)
         
         # Format response
         return {
@@ -114,11 +149,15 @@ async def get_opportunities(
                 for opp in opportunities
             ],
             "total": total_count,
+            "total_is_estimate": estimated_total is not None,
             "limit": limit,
             "offset": offset,
-            "has_more": (offset + limit) < total_count
+            "has_more": next_cursor is not None if cursor else (offset + limit) < total_count,
+            "next_cursor": next_cursor
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving opportunities: {str(e)}")
 
@@ -181,8 +220,9 @@ async def get_search_statistics(
 ):
     """Get statistics about the search system"""
     try:
-        # Get bot statistics
-        bot_stats = await bot_manager.get_bot_statistics()
+        # Get bot statistics published by the bot worker
+        bot_state = await get_lease_state('bot_manager')
+        bot_stats = bot_state['status'].get('bots', {})
         
         # Get opportunity counts
         total_result = await db.execute(
@@ -270,26 +310,21 @@ async def trigger_search(
 ):
     """Trigger an immediate search for a specific country"""
     try:
-        # Check if bot exists for country
-        bot = bot_manager.bots.get(country.lower().replace(' ', '_'))
+        # Check the country against the configured bots, not the worker's
+        # published state, which is empty while the worker is down or starting
+        bot = bot_configs().get(country.lower().replace(' ', '_'))
         
         if not bot:
             raise HTTPException(status_code=404, detail=f"No search bot found for {country}")
         
-        # Trigger search
-        if query:
-            # Add search query to all targets
-            for target in bot.targets:
-                bot_manager.scrapingQueue.append({"target": target, "query": query})
-        else:
-            # Add all targets without specific query
-            for target in bot.targets:
-                bot_manager.scrapingQueue.append({"target": target})
+        # Bots live in the worker process; hand the search to the task queue
+        celery_app.send_task('tasks.search_tasks.search_specific_country', args=[country, query])
         
+        _, _, targets = bot
         return {
             "status": "success",
             "message": f"Search triggered for {country}",
-            "targets_queued": len(bot.targets),
+            "targets_queued": len(targets),
             "estimated_completion_time": (datetime.utcnow() + timedelta(minutes=5)).isoformat()
         }
         
@@ -302,13 +337,19 @@ async def trigger_search(
 async def get_bot_status():
     """Get status of all search bots"""
     try:
-        bot_stats = await bot_manager.get_bot_statistics()
+        bot_state = await get_lease_state('bot_manager')
+        status = bot_state['status']
         
         return {
-            "bots": bot_stats,
-            "queue_length": len(bot_manager.scrapingQueue),
-            "is_scraping_active": bot_manager.isScrapingActive,
-            "last_scraping_run": bot_manager.lastScrapingRun.isoformat() if bot_manager.lastScrapingRun else None
+            "bots": status.get('bots', {}),
+            "queue_length": status.get('queue_length', 0),
+            "is_scraping_active": status.get('is_scraping_active', False),
+            "last_scraping_run": status.get('last_scraping_run'),
+            "worker": {
+                "running": bot_state['running'],
+                "holder": bot_state['holder'],
+                "heartbeat_at": bot_state['heartbeat_at']
+            }
         }
         
     except Exception as e:
@@ -338,7 +379,10 @@ async def verify_opportunity(
             raise HTTPException(status_code=404, detail="Opportunity not found")
         
         # Verify opportunity
+        if not verification_service.verifier.session:
+            await verification_service.verifier.start_session()
         verification_result = await verification_service.verifier.verify_opportunity(opportunity)
+        await verification_service.verifier.writer.flush()
         
         return {
             "status": "success",
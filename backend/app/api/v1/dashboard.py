@@ -5,6 +5,7 @@ from typing import List, Optional
 from ...core.database import get_db
 from ...core.auth import get_current_user
 from ...services.dashboard_service import DashboardService
+from ...services.stats_cache import dashboard_stats_cache
 from ...schemas.dashboard import (
     User, StudentProfile, BusinessProfile, JobSeekerProfile,
     StudentProfileCreate, StudentProfileUpdate,
@@ -32,7 +33,10 @@ async def get_student_dashboard_stats(
         raise HTTPException(status_code=403, detail="Access denied")
     
     service = DashboardService(db)
-    return service.get_student_dashboard_stats(current_user.id)
+    return dashboard_stats_cache.get_or_compute(
+        current_user.id, "student", StudentDashboardStats,
+        lambda: service.get_student_dashboard_stats(current_user.id)
+    )
 
 @router.get("/stats/business", response_model=BusinessDashboardStats)
 async def get_business_dashboard_stats(
@@ -44,7 +48,10 @@ async def get_business_dashboard_stats(
         raise HTTPException(status_code=403, detail="Access denied")
     
     service = DashboardService(db)
-    return service.get_business_dashboard_stats(current_user.id)
+    return dashboard_stats_cache.get_or_compute(
+        current_user.id, "business", BusinessDashboardStats,
+        lambda: service.get_business_dashboard_stats(current_user.id)
+    )
 
 @router.get("/stats/job-seeker", response_model=JobSeekerDashboardStats)
 async def get_job_seeker_dashboard_stats(
@@ -56,7 +63,10 @@ async def get_job_seeker_dashboard_stats(
         raise HTTPException(status_code=403, detail="Access denied")
     
     service = DashboardService(db)
-    return service.get_job_seeker_dashboard_stats(current_user.id)
+    return dashboard_stats_cache.get_or_compute(
+        current_user.id, "job_seeker", JobSeekerDashboardStats,
+        lambda: service.get_job_seeker_dashboard_stats(current_user.id)
+    )
 
 # Profile Management Endpoints
 @router.get("/profile")
@@ -116,7 +126,10 @@ async def search_opportunities(
 ):
     """Search opportunities with filters and matching"""
     service = DashboardService(db)
-    return service.search_opportunities(search_params, current_user.id)
+    try:
+        return service.search_opportunities(search_params, current_user.id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/opportunities/recommended")
 async def get_recommended_opportunities(
@@ -132,6 +145,7 @@ async def get_recommended_opportunities(
 async def get_scholarships(
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -139,15 +153,20 @@ async def get_scholarships(
     search_params = OpportunitySearch(
         filters={"opportunity_type": OpportunityType.SCHOLARSHIP},
         limit=limit,
-        offset=offset
+        offset=offset,
+        cursor=cursor
     )
     service = DashboardService(db)
-    return service.search_opportunities(search_params, current_user.id)
+    try:
+        return service.search_opportunities(search_params, current_user.id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/opportunities/grants", response_model=OpportunityListResponse)
 async def get_grants(
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -155,15 +174,20 @@ async def get_grants(
     search_params = OpportunitySearch(
         filters={"opportunity_type": OpportunityType.GRANT},
         limit=limit,
-        offset=offset
+        offset=offset,
+        cursor=cursor
     )
     service = DashboardService(db)
-    return service.search_opportunities(search_params, current_user.id)
+    try:
+        return service.search_opportunities(search_params, current_user.id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/opportunities/jobs", response_model=OpportunityListResponse)
 async def get_jobs(
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -171,10 +195,14 @@ async def get_jobs(
     search_params = OpportunitySearch(
         filters={"opportunity_type": OpportunityType.JOB},
         limit=limit,
-        offset=offset
+        offset=offset,
+        cursor=cursor
     )
     service = DashboardService(db)
-    return service.search_opportunities(search_params, current_user.id)
+    try:
+        return service.search_opportunities(search_params, current_user.id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 # Application Management
 @router.post("/applications")
@@ -42,6 +42,15 @@ class Settings(BaseSettings):
     AI_ASSISTANCE_COST: int = 5
     PREMIUM_FEATURE_COST: int = 10
     
+    # Dashboard Stats Cache
+    DASHBOARD_STATS_CACHE_TTL: int = int(os.getenv("DASHBOARD_STATS_CACHE_TTL", "300"))  # seconds
+    DASHBOARD_STATS_CACHE_SIZE: int = int(os.getenv("DASHBOARD_STATS_CACHE_SIZE", "10000"))  # entries, in-process only
+    
+    # Activity Logging
+    ACTIVITY_FLUSH_SIZE: int = int(os.getenv("ACTIVITY_FLUSH_SIZE", "200"))  # events per INSERT
+    ACTIVITY_FLUSH_INTERVAL: float = float(os.getenv("ACTIVITY_FLUSH_INTERVAL", "2.0"))  # seconds
+    ACTIVITY_MAX_PENDING: int = int(os.getenv("ACTIVITY_MAX_PENDING", "10000"))  # queued events before new ones are dropped
+    
     # Rate Limiting
     RATE_LIMIT_PER_MINUTE: int = 60
     RATE_LIMIT_PER_HOUR: int = 1000
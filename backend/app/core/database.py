@@ -1,11 +1,17 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from .config import settings
 
-# Create database engine
+# Create database engine; Celery workers share the search backend's async
+# DATABASE_URL, so an asyncpg URL falls back to the default sync driver
+database_url = make_url(settings.DATABASE_URL)
+if database_url.drivername == "postgresql+asyncpg":
+    database_url = database_url.set(drivername="postgresql")
+
 engine = create_engine(
-    settings.DATABASE_URL,
+    database_url,
     pool_pre_ping=True,
     pool_recycle=300,
     echo=False  # Set to True for SQL debugging
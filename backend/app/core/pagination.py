@@ -0,0 +1,21 @@
+import json
+import base64
+from typing import Any, List
+
+def encode_cursor(values: List[Any]) -> str:
+    """Encode keyset values (sort key, id) as an opaque, URL-safe token"""
+    payload = json.dumps(values, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+def decode_cursor(token: str, size: int) -> List[Any]:
+    """Decode a token produced by encode_cursor, raising ValueError if malformed"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Invalid cursor")
+
+    return values
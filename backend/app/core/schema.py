@@ -0,0 +1,47 @@
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Columns and constraints added to the models after their tables were first
+# created; create_all never alters an existing table, so these are applied at
+# startup. Each statement is idempotent.
+SCHEMA_UPGRADES = [
+    "ALTER TABLE opportunities ADD COLUMN IF NOT EXISTS amount_value DOUBLE PRECISION",
+    # Left NULL on existing rows: when they last changed is unknown
+    "ALTER TABLE applications ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITHOUT TIME ZONE",
+    # Match score upserts conflict on (user_id, opportunity_id); keep the newest
+    # score of each pair before adding the constraint they rely on
+    """
+    DO $$
+    BEGIN
+        IF NOT EXISTS (
+            SELECT 1 FROM pg_constraint WHERE conname = 'uq_match_scores_user_opportunity'
+        ) THEN
+            DELETE FROM match_scores WHERE id IN (
+                SELECT id FROM (
+                    SELECT id, row_number() OVER (
+                        PARTITION BY user_id, opportunity_id
+                        ORDER BY calculated_at DESC NULLS LAST, id DESC
+                    ) AS position
+                    FROM match_scores
+                ) ranked
+                WHERE position > 1
+            );
+            ALTER TABLE match_scores
+                ADD CONSTRAINT uq_match_scores_user_opportunity UNIQUE (user_id, opportunity_id);
+        END IF;
+    END $$
+    """,
+]
+
+def upgrade_schema(engine: Engine):
+    """Bring tables created by an older version up to date with the models"""
+    if engine.dialect.name != "postgresql":
+        return  # Only PostgreSQL databases outlive a release; others are created fresh
+
+    with engine.begin() as connection:
+        for statement in SCHEMA_UPGRADES:
+            connection.execute(text(statement))
+    logger.info(f"Applied {len(SCHEMA_UPGRADES)} schema upgrade statements")
@@ -4,21 +4,47 @@ from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.security import HTTPBearer
 import uvicorn
 import os
+import asyncio
+import logging
 from contextlib import asynccontextmanager
 
 from .api.v1 import dashboard, credits, search
-from .core.database import engine, Base
+from .core.database import engine, Base, SessionLocal
 from .core.config import settings
+from .core.schema import upgrade_schema
+from .services.micro_bots import backfill_amount_values
+from .services.stats_cache import dashboard_stats_cache
+from .services.activity_log import activity_buffer
 
-# Create database tables
+logger = logging.getLogger(__name__)
+
+# Create database tables, and add columns newer than existing ones
 Base.metadata.create_all(bind=engine)
+upgrade_schema(engine)
+
+def backfill_opportunity_amounts():
+    """Parse amount_value for opportunities stored before the column existed"""
+    db = SessionLocal()
+    try:
+        updated = backfill_amount_values(db)
+        if updated:
+            logger.info(f"Parsed amount_value for {updated} opportunities")
+    finally:
+        db.close()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     print("🚀 Granada Dashboard API starting up...")
+    try:
+        await asyncio.to_thread(backfill_opportunity_amounts)
+    except Exception as e:
+        logger.error(f"Amount backfill failed: {e}")
+    activity_buffer.start()
+    # match_scores are refreshed by the tasks.dashboard_tasks.refresh_match_scores beat task
     yield
     # Shutdown
+    await asyncio.to_thread(activity_buffer.close)
     print("📴 Granada Dashboard API shutting down...")
 
 # Create FastAPI app
@@ -74,7 +100,9 @@ async def health_check():
     return {
         "status": "healthy",
         "service": "Granada Dashboard API",
-        "version": "1.0.0"
+        "version": "1.0.0",
+        "dashboard_stats_cache": dashboard_stats_cache.get_statistics(),
+        "activity_log": activity_buffer.get_statistics()
     }
 
 # Root endpoint
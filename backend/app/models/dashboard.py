@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float, Boolean, Text, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, DateTime, Float, Boolean, Text, ForeignKey, Enum, UniqueConstraint
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -97,6 +97,7 @@ class Opportunity(Base):
     organization = Column(String)
     opportunity_type = Column(Enum(OpportunityType))
     amount = Column(String)
+    amount_value = Column(Float)  # lower bound parsed from amount at ingest, for SQL totals
     location = Column(String)
     deadline = Column(DateTime)
     description = Column(Text)
@@ -118,6 +119,7 @@ class Application(Base):
     opportunity_id = Column(Integer, ForeignKey("opportunities.id"))
     status = Column(Enum(ApplicationStatus), default=ApplicationStatus.PENDING)
     submitted_date = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     next_step = Column(String)
     notes = Column(Text)
     
@@ -172,7 +174,11 @@ class MatchScore(Base):
     opportunity_id = Column(Integer, ForeignKey("opportunities.id"))
     score = Column(Float)  # 0-100 match percentage
     factors = Column(Text)  # JSON string with matching factors
-    calculated_at = Column(DateTime, default=datetime.utcnow)
+    calculated_at = Column(DateTime, default=datetime.utcnow)  # NULL once the profile changes
     
     user = relationship("User")
-    opportunity = relationship("Opportunity")
\ No newline at end of file
+    opportunity = relationship("Opportunity")
+    
+    __table_args__ = (
+        UniqueConstraint("user_id", "opportunity_id", name="uq_match_scores_user_opportunity"),
+    )
\ No newline at end of file
@@ -235,12 +235,14 @@ class OpportunitySearch(BaseModel):
     filters: Optional[OpportunityFilter] = None
     limit: int = 20
     offset: int = 0
+    cursor: Optional[str] = None  # next_cursor from the previous page; overrides offset
 
 # Response Schemas
 class OpportunityListResponse(BaseModel):
     opportunities: List[OpportunityWithMatch]
     total: int
     has_more: bool
+    next_cursor: Optional[str] = None
 
 class ApplicationListResponse(BaseModel):
     applications: List[Application]
@@ -0,0 +1,170 @@
+from typing import Dict, Any, List, Optional
+from datetime import datetime
+import json
+import time
+import queue
+import atexit
+import threading
+import logging
+
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError, DataError, ProgrammingError
+
+from ..core.config import settings
+from ..core.database import SessionLocal
+from ..models.dashboard import UserActivity
+
+logger = logging.getLogger(__name__)
+
+# Failed flushes of one batch before its events are written one by one, dropping the ones the database rejects
+MAX_BATCH_ATTEMPTS = 3
+
+# Errors caused by the events themselves rather than by the connection;
+# OperationalError and InterfaceError (database down, connection lost) are always retried
+REJECTED_BATCH_ERRORS = (IntegrityError, DataError, ProgrammingError)
+
+class ActivityBuffer:
+    """Buffers user activity events and writes them to user_activities in bulk.
+
+    record() only enqueues, so request handlers no longer pay for an
+    INSERT and a commit. A background thread flushes whenever batch_size
+    events are waiting or flush_interval seconds have passed, in one
+    multi-row INSERT. record() never blocks, since it runs on the event
+    loop: once max_pending events are queued (the database is slow or
+    down) new events are dropped and counted. A batch is retried until the
+    database is reachable again. close() drains everything still queued.
+    """
+
+    def __init__(self, batch_size: int = settings.ACTIVITY_FLUSH_SIZE,
+                 flush_interval: float = settings.ACTIVITY_FLUSH_INTERVAL,
+                 max_pending: int = settings.ACTIVITY_MAX_PENDING):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=max_pending)
+        self.retry: List[Dict[str, Any]] = []
+        self.attempts = 0
+        self.stopping = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+        self.start_lock = threading.Lock()
+        self.recorded = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed_flushes = 0
+        atexit.register(self.close)
+
+    def start(self):
+        with self.start_lock:
+            if self.thread is not None and self.thread.is_alive():
+                return
+            self.stopping.clear()
+            self.thread = threading.Thread(target=self._run, name="activity-writer", daemon=True)
+            self.thread.start()
+
+    def record(self, user_id: int, activity_type: str, activity_data: Dict[str, Any]) -> bool:
+        """Queue an event without blocking; returns False if it was dropped because the buffer is full"""
+        if self.thread is None or not self.thread.is_alive():
+            self.start()
+
+        event = {
+            "user_id": user_id,
+            "activity_type": activity_type,
+            "activity_data": json.dumps(activity_data),
+            "timestamp": datetime.utcnow()
+        }
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+            logger.warning(f"Activity buffer full, dropped {activity_type} event for user {user_id}")
+            return False
+
+        self.recorded += 1
+        return True
+
+    def _take(self, deadline: float) -> List[Dict[str, Any]]:
+        """Events for the next flush: up to batch_size, waiting until deadline for the first ones"""
+        batch = self.retry
+        self.retry = []
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            try:
+                if timeout <= 0 or self.stopping.is_set():
+                    batch.append(self.queue.get_nowait())
+                else:
+                    batch.append(self.queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not self.stopping.is_set():
+            batch = self._take(time.monotonic() + self.flush_interval)
+            if batch:
+                self._write(batch)
+
+        # Shutting down: drain whatever is left
+        while True:
+            batch = self._take(time.monotonic())
+            if not batch or not self._write(batch):
+                break
+
+    def _write(self, batch: List[Dict[str, Any]]) -> bool:
+        db = SessionLocal()
+        try:
+            db.execute(insert(UserActivity), batch)
+            db.commit()
+            self.written += len(batch)
+            self.attempts = 0
+            return True
+        except Exception as e:
+            db.rollback()
+            self.failed_flushes += 1
+            self.attempts += 1
+            logger.error(f"Failed to write {len(batch)} activity events: {e}")
+            if self.attempts >= MAX_BATCH_ATTEMPTS and isinstance(e, REJECTED_BATCH_ERRORS):
+                # The database is up but rejects the batch; isolate the bad events
+                return self._write_each(db, batch)
+            # Keep the batch for the next flush; the bounded queue holds back new events meanwhile
+            self.retry = batch
+            if not self.stopping.is_set():
+                time.sleep(min(self.flush_interval, 5.0))
+            return False
+        finally:
+            db.close()
+
+    def _write_each(self, db, batch: List[Dict[str, Any]]) -> bool:
+        for event in batch:
+            try:
+                db.execute(insert(UserActivity), [event])
+                db.commit()
+                self.written += 1
+            except Exception as e:
+                db.rollback()
+                self.dropped += 1
+                logger.error(f"Dropped activity event for user {event['user_id']}: {e}")
+        self.attempts = 0
+        return True
+
+    def close(self, timeout: float = 10.0):
+        """Stop the writer after flushing every queued event"""
+        thread = self.thread
+        if thread is None:
+            return
+        self.stopping.set()
+        thread.join(timeout)
+        if thread.is_alive():
+            logger.warning(f"Activity writer did not finish within {timeout}s; {self.queue.qsize()} events unwritten")
+        elif self.retry:
+            logger.warning(f"{len(self.retry)} activity events could not be written at shutdown")
+
+    def get_statistics(self) -> Dict[str, Any]:
+        return {
+            "recorded": self.recorded,
+            "written": self.written,
+            "pending": self.queue.qsize() + len(self.retry),
+            "dropped": self.dropped,
+            "failed_flushes": self.failed_flushes,
+        }
+
+# Global activity buffer instance
+activity_buffer = ActivityBuffer()
@@ -15,6 +15,7 @@ from ..schemas.credits import (
     CreditPurchaseCreate, CreditUsageCreate, PaymentIntentCreate,
     UserSubscriptionCreate, PaymentMethodCreate, CreditStats
 )
+from .stats_cache import dashboard_stats_cache
 
 # Configure Stripe
 stripe.api_key = os.getenv("STRIPE_SECRET_KEY")
@@ -157,6 +158,7 @@ class CreditService:
         
         self.db.commit()
         self.db.refresh(usage)
+        dashboard_stats_cache.invalidate(user_id)
         return usage
 
     def get_usage_history(self, user_id: int, limit: int = 50) -> List[CreditUsage]:
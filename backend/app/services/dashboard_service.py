@@ -1,19 +1,37 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func, desc
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import and_, or_, func, desc, tuple_, literal, DateTime
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
 import json
+import math
+import logging
 
 from ..models.dashboard import (
     User, StudentProfile, BusinessProfile, JobSeekerProfile,
     Opportunity, Application, SavedOpportunity, TrainingProgram,
     UserActivity, MatchScore, OpportunityType, ApplicationStatus
 )
+from ..core.database import SessionLocal
+from ..core.pagination import encode_cursor, decode_cursor
+from .match_scoring import MatchScorer, MATCH_SCORE_TTL, opportunity_catalogue
+from .stats_cache import dashboard_stats_cache
+from .activity_log import activity_buffer
 from ..schemas.dashboard import (
     OpportunitySearch, OpportunityFilter, UserActivityCreate,
     StudentDashboardStats, BusinessDashboardStats, JobSeekerDashboardStats
 )
 
+logger = logging.getLogger(__name__)
+
+# Rows per INSERT ... ON CONFLICT statement when storing match scores
+MATCH_SCORE_UPSERT_BATCH = 1000
+
+# Opportunity listings sort and page on posted_date with NULLs read as this,
+# so rows without one come last and still carry a cursor
+POSTED_DATE_FLOOR = datetime(1970, 1, 1)
+posted_date_key = func.coalesce(Opportunity.posted_date, literal(POSTED_DATE_FLOOR, DateTime))
+
 class DashboardService:
     def __init__(self, db: Session):
         self.db = db
@@ -50,6 +68,7 @@ class DashboardService:
             if hasattr(profile, key):
                 setattr(profile, key, value)
         
+        self._invalidate_match_scores(user_id)
         self.db.commit()
         self.db.refresh(profile)
         return profile
@@ -65,6 +84,7 @@ class DashboardService:
             if hasattr(profile, key):
                 setattr(profile, key, value)
         
+        self._invalidate_match_scores(user_id)
         self.db.commit()
         self.db.refresh(profile)
         return profile
@@ -80,6 +100,7 @@ class DashboardService:
             if hasattr(profile, key):
                 setattr(profile, key, value)
         
+        self._invalidate_match_scores(user_id)
         self.db.commit()
         self.db.refresh(profile)
         return profile
@@ -123,40 +144,58 @@ class DashboardService:
         # Get total count
         total = query.count()
         
+        # Keyset pagination: continue after the (posted_date, id) in the cursor
+        if search_params.cursor:
+            posted_date, opportunity_id = decode_cursor(search_params.cursor, 2)
+            try:
+                posted_date = datetime.fromisoformat(posted_date)
+                opportunity_id = int(opportunity_id)
+            except (TypeError, ValueError) as e:
+                raise ValueError("Invalid cursor") from e
+            
+            query = query.filter(
+                tuple_(posted_date_key, Opportunity.id) < tuple_(posted_date, opportunity_id)
+            )
+        
         # Apply pagination and ordering
-        opportunities = query.order_by(desc(Opportunity.posted_date))\
-                           .offset(search_params.offset)\
-                           .limit(search_params.limit)\
-                           .all()
+        query = query.order_by(desc(posted_date_key), desc(Opportunity.id))
+        if not search_params.cursor:
+            query = query.offset(search_params.offset)
+        opportunities = query.limit(search_params.limit).all()
+        
+        next_cursor = None
+        if len(opportunities) == search_params.limit:
+            last = opportunities[-1]
+            next_cursor = encode_cursor([(last.posted_date or POSTED_DATE_FLOOR).isoformat(), last.id])
         
         # Add match scores if user is provided
         if user_id:
+            match_scores = self.score_opportunities(user_id, opportunities)
             opportunities_with_match = []
             for opp in opportunities:
-                match_score = self.calculate_match_score(user_id, opp.id)
                 opp_dict = opp.__dict__.copy()
-                opp_dict['match_percentage'] = match_score
+                opp_dict['match_percentage'] = match_scores.get(opp.id, 0.0)
                 opportunities_with_match.append(opp_dict)
             opportunities = opportunities_with_match
         
+        if search_params.cursor:
+            has_more = next_cursor is not None
+        else:
+            has_more = total > (search_params.offset + search_params.limit)
+        
         return {
             "opportunities": opportunities,
             "total": total,
-            "has_more": total > (search_params.offset + search_params.limit)
+            "has_more": has_more,
+            "next_cursor": next_cursor
         }
 
     def get_recommended_opportunities(self, user_id: int, limit: int = 10):
         """Get recommended opportunities for user"""
-        # Get user's match scores
-        match_scores = self.db.query(MatchScore)\
-                             .filter(MatchScore.user_id == user_id)\
-                             .order_by(desc(MatchScore.score))\
-                             .limit(limit)\
-                             .all()
+        scorer = self._match_scorer(user_id)
+        catalogue = opportunity_catalogue.ensure_fresh(self.db)
         
-        opportunity_ids = [ms.opportunity_id for ms in match_scores]
-        
-        if not opportunity_ids:
+        if not scorer or not len(catalogue):
             # Fallback to recent opportunities
             return self.db.query(Opportunity)\
                          .filter(Opportunity.is_active == True)\
@@ -164,17 +203,23 @@ class DashboardService:
                          .limit(limit)\
                          .all()
         
-        opportunities = self.db.query(Opportunity)\
-                              .filter(Opportunity.id.in_(opportunity_ids))\
-                              .filter(Opportunity.is_active == True)\
-                              .all()
+        # Score the user against the whole catalogue in one vectorised pass
+        scores, _ = catalogue.score(scorer)
+        top = catalogue.top_k(scores, limit)
+        
+        opportunities = {
+            opp.id: opp for opp in
+            self.db.query(Opportunity).filter(Opportunity.id.in_([opp_id for opp_id, _ in top])).all()
+        }
         
-        # Add match scores
-        for opp in opportunities:
-            match = next((ms for ms in match_scores if ms.opportunity_id == opp.id), None)
-            opp.match_percentage = match.score if match else 0
+        recommended = []
+        for opp_id, score in top:
+            opp = opportunities.get(opp_id)
+            if opp is not None and opp.is_active:
+                opp.match_percentage = score
+                recommended.append(opp)
         
-        return sorted(opportunities, key=lambda x: x.match_percentage, reverse=True)
+        return recommended
 
     # Application Services
     def create_application(self, user_id: int, opportunity_id: int, notes: Optional[str] = None):
@@ -198,6 +243,7 @@ class DashboardService:
         self.db.add(application)
         self.db.commit()
         self.db.refresh(application)
+        dashboard_stats_cache.invalidate(user_id)
         
         # Log activity
         self.log_user_activity(user_id, "apply", {
@@ -228,6 +274,7 @@ class DashboardService:
         
         self.db.commit()
         self.db.refresh(application)
+        dashboard_stats_cache.invalidate(application.user_id)
         return application
 
     # Saved Opportunities Services
@@ -246,6 +293,7 @@ class DashboardService:
         self.db.add(saved)
         self.db.commit()
         self.db.refresh(saved)
+        dashboard_stats_cache.invalidate(user_id)
         
         # Log activity
         self.log_user_activity(user_id, "save", {"opportunity_id": opportunity_id})
@@ -269,6 +317,7 @@ class DashboardService:
         if saved:
             self.db.delete(saved)
             self.db.commit()
+            dashboard_stats_cache.invalidate(user_id)
             return True
         return False
 
@@ -286,157 +335,98 @@ class DashboardService:
         return query.order_by(TrainingProgram.title).all()
 
     # Dashboard Stats Services
+    def _application_stats(self, user_id: int, with_opportunity: bool = False, **extra_columns):
+        """One grouped aggregate over the user's applications: totals by status plus extra_columns"""
+        query = self.db.query(
+            func.count(Application.id).label("total"),
+            func.count(Application.id).filter(Application.status == ApplicationStatus.APPROVED).label("approved"),
+            func.count(Application.id).filter(Application.status.in_([
+                ApplicationStatus.PENDING,
+                ApplicationStatus.UNDER_REVIEW
+            ])).label("pending"),
+            *(column.label(name) for name, column in extra_columns.items())
+        ).select_from(Application)
+        
+        if with_opportunity:
+            query = query.outerjoin(Opportunity, Opportunity.id == Application.opportunity_id)
+        
+        return query.filter(Application.user_id == user_id).one()
+
     def get_student_dashboard_stats(self, user_id: int) -> StudentDashboardStats:
         """Get dashboard statistics for students"""
-        total_applications = self.db.query(Application)\
-                                   .filter(Application.user_id == user_id)\
-                                   .count()
-        
-        approved_applications = self.db.query(Application)\
-                                      .filter(Application.user_id == user_id)\
-                                      .filter(Application.status == ApplicationStatus.APPROVED)\
-                                      .count()
-        
-        pending_applications = self.db.query(Application)\
-                                     .filter(Application.user_id == user_id)\
-                                     .filter(Application.status.in_([
-                                         ApplicationStatus.PENDING,
-                                         ApplicationStatus.UNDER_REVIEW
-                                     ]))\
-                                     .count()
-        
-        # Calculate total funding from approved applications
-        approved_apps = self.db.query(Application)\
-                              .join(Opportunity)\
-                              .filter(Application.user_id == user_id)\
-                              .filter(Application.status == ApplicationStatus.APPROVED)\
-                              .all()
-        
-        total_funding = 0
-        for app in approved_apps:
-            if app.opportunity.amount:
-                # Extract numeric value from amount string
-                amount_str = app.opportunity.amount.replace('$', '').replace(',', '')
-                try:
-                    amount = float(amount_str.split('-')[0].strip())
-                    total_funding += amount
-                except:
-                    pass
-        
-        success_rate = (approved_applications / total_applications * 100) if total_applications > 0 else 0
+        # Funding from approved applications, summed from the amount parsed at ingest
+        stats = self._application_stats(
+            user_id,
+            with_opportunity=True,
+            total_funding=func.sum(Opportunity.amount_value).filter(
+                Application.status == ApplicationStatus.APPROVED
+            )
+        )
+        
+        total_funding = stats.total_funding or 0
+        success_rate = (stats.approved / stats.total * 100) if stats.total > 0 else 0
         
         return StudentDashboardStats(
-            total_applications=total_applications,
-            approved_applications=approved_applications,
-            pending_applications=pending_applications,
-            awards_won=approved_applications,
-            pending_reviews=pending_applications,
+            total_applications=stats.total,
+            approved_applications=stats.approved,
+            pending_applications=stats.pending,
+            awards_won=stats.approved,
+            pending_reviews=stats.pending,
             total_funding=f"${total_funding:,.0f}" if total_funding > 0 else None,
             success_rate=round(success_rate, 1)
         )
 
     def get_business_dashboard_stats(self, user_id: int) -> BusinessDashboardStats:
         """Get dashboard statistics for businesses"""
-        total_applications = self.db.query(Application)\
-                                   .filter(Application.user_id == user_id)\
-                                   .count()
-        
-        approved_applications = self.db.query(Application)\
-                                      .filter(Application.user_id == user_id)\
-                                      .filter(Application.status == ApplicationStatus.APPROVED)\
-                                      .count()
-        
-        pending_applications = self.db.query(Application)\
-                                     .filter(Application.user_id == user_id)\
-                                     .filter(Application.status.in_([
-                                         ApplicationStatus.PENDING,
-                                         ApplicationStatus.UNDER_REVIEW
-                                     ]))\
-                                     .count()
-        
-        # Calculate average review days
-        completed_apps = self.db.query(Application)\
-                               .filter(Application.user_id == user_id)\
-                               .filter(Application.status.in_([
-                                   ApplicationStatus.APPROVED,
-                                   ApplicationStatus.REJECTED
-                               ]))\
-                               .all()
-        
-        if completed_apps:
-            total_days = sum([(app.updated_at - app.submitted_date).days for app in completed_apps])
-            avg_review_days = total_days // len(completed_apps)
-        else:
-            avg_review_days = None
+        # Average whole days between submission and decision
+        review_days = func.floor(func.extract("epoch", Application.updated_at - Application.submitted_date) / 86400)
+        stats = self._application_stats(
+            user_id,
+            avg_review_days=func.avg(review_days).filter(Application.status.in_([
+                ApplicationStatus.APPROVED,
+                ApplicationStatus.REJECTED
+            ]))
+        )
         
-        success_rate = (approved_applications / total_applications * 100) if total_applications > 0 else 0
+        avg_review_days = math.floor(stats.avg_review_days) if stats.avg_review_days is not None else None
+        success_rate = (stats.approved / stats.total * 100) if stats.total > 0 else 0
         
         return BusinessDashboardStats(
-            total_applications=total_applications,
-            approved_applications=approved_applications,
-            pending_applications=pending_applications,
-            grants_awarded=approved_applications,
+            total_applications=stats.total,
+            approved_applications=stats.approved,
+            pending_applications=stats.pending,
+            grants_awarded=stats.approved,
             avg_review_days=avg_review_days,
             success_rate=round(success_rate, 1)
         )
 
     def get_job_seeker_dashboard_stats(self, user_id: int) -> JobSeekerDashboardStats:
         """Get dashboard statistics for job seekers"""
-        total_applications = self.db.query(Application)\
-                                   .filter(Application.user_id == user_id)\
-                                   .count()
-        
-        approved_applications = self.db.query(Application)\
-                                      .filter(Application.user_id == user_id)\
-                                      .filter(Application.status == ApplicationStatus.APPROVED)\
-                                      .count()
-        
-        pending_applications = self.db.query(Application)\
-                                     .filter(Application.user_id == user_id)\
-                                     .filter(Application.status.in_([
-                                         ApplicationStatus.PENDING,
-                                         ApplicationStatus.UNDER_REVIEW
-                                     ]))\
-                                     .count()
-        
-        interviews = self.db.query(Application)\
-                           .filter(Application.user_id == user_id)\
-                           .filter(Application.status == ApplicationStatus.INTERVIEW_SCHEDULED)\
-                           .count()
-        
-        job_offers = self.db.query(Application)\
-                           .filter(Application.user_id == user_id)\
-                           .filter(Application.status == ApplicationStatus.OFFER)\
-                           .count()
-        
-        # Calculate response rate (applications that got any response)
-        responded_apps = self.db.query(Application)\
-                               .filter(Application.user_id == user_id)\
-                               .filter(Application.status != ApplicationStatus.PENDING)\
-                               .count()
-        
-        response_rate = (responded_apps / total_applications * 100) if total_applications > 0 else 0
+        stats = self._application_stats(
+            user_id,
+            interviews=func.count(Application.id).filter(
+                Application.status == ApplicationStatus.INTERVIEW_SCHEDULED
+            ),
+            job_offers=func.count(Application.id).filter(Application.status == ApplicationStatus.OFFER),
+            # Applications that got any response
+            responded=func.count(Application.id).filter(Application.status != ApplicationStatus.PENDING)
+        )
+        
+        response_rate = (stats.responded / stats.total * 100) if stats.total > 0 else 0
         
         return JobSeekerDashboardStats(
-            total_applications=total_applications,
-            approved_applications=approved_applications,
-            pending_applications=pending_applications,
-            interviews=interviews,
-            job_offers=job_offers,
+            total_applications=stats.total,
+            approved_applications=stats.approved,
+            pending_applications=stats.pending,
+            interviews=stats.interviews,
+            job_offers=stats.job_offers,
             response_rate=round(response_rate, 1)
         )
 
     # Activity Logging
     def log_user_activity(self, user_id: int, activity_type: str, activity_data: Dict[str, Any]):
-        """Log user activity"""
-        activity = UserActivity(
-            user_id=user_id,
-            activity_type=activity_type,
-            activity_data=json.dumps(activity_data)
-        )
-        
-        self.db.add(activity)
-        self.db.commit()
+        """Log user activity; written in the background by the activity buffer"""
+        activity_buffer.record(user_id, activity_type, activity_data)
 
     def get_user_activities(self, user_id: int, limit: int = 50):
         """Get user activities"""
@@ -458,86 +448,117 @@ class DashboardService:
     # Match Score Calculation
     def calculate_match_score(self, user_id: int, opportunity_id: int) -> float:
         """Calculate match score between user and opportunity"""
-        # Check if score already exists and is recent
-        existing_score = self.db.query(MatchScore)\
-                               .filter(MatchScore.user_id == user_id)\
-                               .filter(MatchScore.opportunity_id == opportunity_id)\
-                               .filter(MatchScore.calculated_at > datetime.utcnow() - timedelta(days=1))\
-                               .first()
-        
-        if existing_score:
-            return existing_score.score
-        
-        # Calculate new score
-        user = self.db.query(User).filter(User.id == user_id).first()
         opportunity = self.db.query(Opportunity).filter(Opportunity.id == opportunity_id).first()
-        
-        if not user or not opportunity:
+        if not opportunity:
             return 0.0
         
-        score = 50.0  # Base score
-        factors = []
-        
-        # Location matching
-        if user.location and opportunity.location:
-            if user.location.lower() in opportunity.location.lower() or \
-               opportunity.location.lower() in user.location.lower() or \
-               opportunity.location.lower() == "remote" or \
-               opportunity.location.lower() == "nationwide":
-                score += 20
-                factors.append("location_match")
-        
-        # User type specific matching
-        if user.user_type == "student":
-            student_profile = self.db.query(StudentProfile).filter(StudentProfile.user_id == user_id).first()
-            if student_profile and opportunity.opportunity_type == OpportunityType.SCHOLARSHIP:
-                score += 15
-                factors.append("user_type_match")
-                
-                # Major matching
-                if student_profile.major and opportunity.category:
-                    if student_profile.major.lower() in opportunity.category.lower():
-                        score += 10
-                        factors.append("major_match")
-        
-        elif user.user_type == "business":
-            if opportunity.opportunity_type == OpportunityType.GRANT:
-                score += 15
-                factors.append("user_type_match")
-        
-        elif user.user_type == "job_seeker":
-            if opportunity.opportunity_type == OpportunityType.JOB:
-                score += 15
-                factors.append("user_type_match")
-                
-                job_profile = self.db.query(JobSeekerProfile).filter(JobSeekerProfile.user_id == user_id).first()
-                if job_profile and job_profile.skills:
-                    try:
-                        skills = json.loads(job_profile.skills)
-                        if any(skill.lower() in opportunity.description.lower() for skill in skills):
-                            score += 10
-                            factors.append("skills_match")
-                    except:
-                        pass
-        
-        # Deadline urgency (closer deadlines get slightly higher scores)
-        days_until_deadline = (opportunity.deadline - datetime.utcnow()).days
-        if days_until_deadline <= 30:
-            score += 5
-            factors.append("deadline_urgency")
-        
-        # Cap the score at 100
-        score = min(score, 100.0)
-        
-        # Save the calculated score
-        match_score = MatchScore(
-            user_id=user_id,
-            opportunity_id=opportunity_id,
-            score=score,
-            factors=json.dumps(factors)
+        return self.score_opportunities(user_id, [opportunity]).get(opportunity_id, 0.0)
+
+    def score_opportunities(self, user_id: int, opportunities: List[Opportunity]) -> Dict[int, float]:
+        """Match scores for many opportunities: recent stored scores in one query, the rest scored in one pass"""
+        if not opportunities:
+            return {}
+        
+        scores = dict(
+            self.db.query(MatchScore.opportunity_id, MatchScore.score)
+                   .filter(MatchScore.user_id == user_id)
+                   .filter(MatchScore.opportunity_id.in_([opp.id for opp in opportunities]))
+                   .filter(MatchScore.calculated_at > datetime.utcnow() - MATCH_SCORE_TTL)
+                   .all()
         )
         
-        self.db.add(match_score)
-        self.db.commit()
+        missing = [opp for opp in opportunities if opp.id not in scores]
+        if missing:
+            scorer = self._match_scorer(user_id)
+            if not scorer:
+                return {opp.id: 0.0 for opp in opportunities}
+            
+            rows = scorer.score_rows(user_id, missing)
+            self._upsert_match_scores(rows)
+            self.db.commit()
+            scores.update((row["opportunity_id"], row["score"]) for row in rows)
+        
+        return scores
+
+    def refresh_match_scores(self) -> int:
+        """Score every active user against the active catalogue where scores are missing or stale"""
+        catalogue = opportunity_catalogue.ensure_fresh(self.db)
+        if not len(catalogue):
+            return 0
+        
+        cutoff = datetime.utcnow() - MATCH_SCORE_TTL
+        
+        # Users whose fresh scores already cover the catalogue cost nothing beyond this query
+        fresh_counts = dict(
+            self.db.query(MatchScore.user_id, func.count(MatchScore.id))
+                   .join(Opportunity, Opportunity.id == MatchScore.opportunity_id)
+                   .filter(Opportunity.is_active == True)
+                   .filter(MatchScore.calculated_at > cutoff)
+                   .group_by(MatchScore.user_id)
+                   .all()
+        )
+        user_ids = [
+            user_id for (user_id,) in self.db.query(User.id).filter(User.is_active == True).all()
+            if fresh_counts.get(user_id, 0) < len(catalogue)
+        ]
+        
+        rescored = 0
+        for user_id in user_ids:
+            scorer = self._match_scorer(user_id)
+            if not scorer:
+                continue
+            
+            fresh = {
+                opportunity_id for (opportunity_id,) in
+                self.db.query(MatchScore.opportunity_id)
+                       .filter(MatchScore.user_id == user_id)
+                       .filter(MatchScore.calculated_at > cutoff)
+                       .all()
+            }
+            rows = catalogue.score_rows(user_id, scorer, fresh)
+            self._upsert_match_scores(rows)
+            self.db.commit()
+            rescored += len(rows)
         
-        return score
\ No newline at end of file
+        return rescored
+
+    def _match_scorer(self, user_id: int) -> Optional[MatchScorer]:
+        user = self.db.query(User)\
+                      .options(joinedload(User.student_profile), joinedload(User.job_seeker_profile))\
+                      .filter(User.id == user_id)\
+                      .first()
+        return MatchScorer(user) if user else None
+
+    def _upsert_match_scores(self, rows: List[Dict[str, Any]]):
+        """Insert or overwrite match_scores rows, many per statement"""
+        for start in range(0, len(rows), MATCH_SCORE_UPSERT_BATCH):
+            stmt = pg_insert(MatchScore).values(rows[start:start + MATCH_SCORE_UPSERT_BATCH])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[MatchScore.user_id, MatchScore.opportunity_id],
+                set_={
+                    "score": stmt.excluded.score,
+                    "factors": stmt.excluded.factors,
+                    "calculated_at": stmt.excluded.calculated_at
+                }
+            )
+            self.db.execute(stmt)
+
+    def _invalidate_match_scores(self, user_id: int):
+        """Mark a user's scores stale after a profile change; they keep ranking until rescored"""
+        self.db.query(MatchScore)\
+               .filter(MatchScore.user_id == user_id)\
+               .update({MatchScore.calculated_at: None}, synchronize_session=False)
+
+def refresh_all_match_scores() -> int:
+    """Run DashboardService.refresh_match_scores in a session of its own"""
+    db = SessionLocal()
+    try:
+        rescored = DashboardService(db).refresh_match_scores()
+        if rescored:
+            logger.info(f"Refreshed {rescored} match scores")
+        return rescored
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
@@ -0,0 +1,295 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from typing import List, Optional, Tuple, Iterable, Dict, Any
+from datetime import datetime, timedelta
+import json
+import time
+import threading
+import numpy as np
+
+from ..models.dashboard import User, Opportunity, OpportunityType
+
+# Stored scores older than this are recalculated (deadline urgency drifts daily)
+MATCH_SCORE_TTL = timedelta(days=1)
+
+# Seconds before the in-memory catalogue is reloaded even if no row was added or removed
+CATALOGUE_MAX_AGE = 300
+
+# Deadlines closer than this get the urgency bonus; (deadline - now).days <= 30
+URGENT_SECONDS = 31 * 86400
+
+TYPE_CODES = {opportunity_type.value: code for code, opportunity_type in enumerate(OpportunityType)}
+
+# Locations that match every user
+OPEN_LOCATIONS = ("remote", "nationwide")
+
+# Points each factor adds to the base score of 50
+FACTOR_POINTS = {
+    "location_match": 20,
+    "user_type_match": 15,
+    "major_match": 10,
+    "skills_match": 10,
+    "deadline_urgency": 5,
+}
+
+def _enum_value(value):
+    return getattr(value, "value", value)
+
+class MatchScorer:
+    """Scores opportunities for one user.
+
+    The user and their profile are read once when the scorer is built, so
+    scoring a page or the whole catalogue costs no queries; the caller
+    stores the results in bulk.
+    """
+
+    def __init__(self, user: User, now: Optional[datetime] = None):
+        self.user_type = _enum_value(user.user_type)
+        self.location = (user.location or "").lower()
+        self.now = now or datetime.utcnow()
+
+        student_profile = user.student_profile if self.user_type == "student" else None
+        job_profile = user.job_seeker_profile if self.user_type == "job_seeker" else None
+
+        self.has_student_profile = student_profile is not None
+        self.major = (student_profile.major or "").lower() if student_profile else ""
+        self.has_job_profile = job_profile is not None
+        self.skills = self._parse_skills(job_profile.skills) if job_profile else []
+
+    @staticmethod
+    def _parse_skills(raw: Optional[str]) -> List[str]:
+        if not raw:
+            return []
+        try:
+            skills = json.loads(raw)
+        except (TypeError, ValueError):
+            return []
+        if not isinstance(skills, list):
+            return []
+        return [str(skill).lower() for skill in skills if skill]
+
+    def score(self, opportunity: Opportunity) -> Tuple[float, List[str]]:
+        """Match score (0-100) and the factors that contributed to it"""
+        score = 50.0  # Base score
+        factors = []
+        opportunity_type = _enum_value(opportunity.opportunity_type)
+
+        # Location matching
+        location = (opportunity.location or "").lower()
+        if self.location and location:
+            if self.location in location or location in self.location or location in OPEN_LOCATIONS:
+                score += 20
+                factors.append("location_match")
+
+        # User type specific matching
+        if self.user_type == "student":
+            if self.has_student_profile and opportunity_type == OpportunityType.SCHOLARSHIP.value:
+                score += 15
+                factors.append("user_type_match")
+
+                if self.major and opportunity.category and self.major in opportunity.category.lower():
+                    score += 10
+                    factors.append("major_match")
+
+        elif self.user_type == "business":
+            if opportunity_type == OpportunityType.GRANT.value:
+                score += 15
+                factors.append("user_type_match")
+
+        elif self.user_type == "job_seeker":
+            if opportunity_type == OpportunityType.JOB.value:
+                score += 15
+                factors.append("user_type_match")
+
+                description = (opportunity.description or "").lower()
+                if self.skills and any(skill in description for skill in self.skills):
+                    score += 10
+                    factors.append("skills_match")
+
+        # Deadline urgency (closer deadlines get slightly higher scores)
+        if opportunity.deadline and (opportunity.deadline - self.now).days <= 30:
+            score += 5
+            factors.append("deadline_urgency")
+
+        return min(score, 100.0), factors
+
+    def score_rows(self, user_id: int, opportunities: Iterable[Opportunity]) -> List[Dict[str, Any]]:
+        """match_scores rows for opportunities, ready for a bulk upsert"""
+        rows = []
+        for opportunity in opportunities:
+            score, factors = self.score(opportunity)
+            rows.append({
+                "user_id": user_id,
+                "opportunity_id": opportunity.id,
+                "score": score,
+                "factors": json.dumps(factors),
+                "calculated_at": self.now
+            })
+        return rows
+
+def _codes(values: List[str]) -> Tuple[List[str], np.ndarray]:
+    """Distinct values and, per row, the index of its value"""
+    uniques, codes = np.unique(np.array(values, dtype=object), return_inverse=True)
+    return list(uniques), codes.astype(np.int32)
+
+def _epoch(value: Optional[datetime]) -> float:
+    return (value - datetime(1970, 1, 1)).total_seconds() if value else np.nan
+
+class OpportunityCatalogue:
+    """Snapshot of active opportunities as NumPy columns, for scoring one user against all of them at once.
+
+    Locations and categories are stored as codes into their distinct values,
+    so the substring rules run once per distinct value and are spread to
+    rows by indexing. Job descriptions are joined into one string so a skill
+    is found in every row with a few str.find calls. Mirrors
+    MatchScorer.score rule for rule.
+    """
+
+    def __init__(self, rows: List[Any]):
+        self.ids = np.array([row.id for row in rows], dtype=np.int64)
+        self.type_codes = np.array(
+            [TYPE_CODES.get(_enum_value(row.opportunity_type), -1) for row in rows], dtype=np.int8
+        )
+        self.locations, self.location_codes = _codes([(row.location or "").lower() for row in rows])
+        self.categories, self.category_codes = _codes([(row.category or "").lower() for row in rows])
+        self.deadlines = np.array([_epoch(row.deadline) for row in rows], dtype=np.float64)
+        self.posted = np.array([_epoch(row.posted_date) for row in rows], dtype=np.float64)
+
+        job_code = TYPE_CODES[OpportunityType.JOB.value]
+        self.job_rows = np.flatnonzero(self.type_codes == job_code)
+        descriptions = [(rows[i].description or "").lower() for i in self.job_rows]
+        lengths = [len(text) + 1 for text in descriptions]
+        self.job_starts = np.concatenate([[0], np.cumsum(lengths[:-1])]).astype(np.int64) if lengths else np.zeros(0, dtype=np.int64)
+        self.job_text = "\0".join(descriptions)
+
+    @classmethod
+    def load(cls, db: Session) -> "OpportunityCatalogue":
+        return cls(
+            db.query(
+                Opportunity.id, Opportunity.opportunity_type, Opportunity.location, Opportunity.category,
+                Opportunity.description, Opportunity.deadline, Opportunity.posted_date
+            ).filter(Opportunity.is_active == True).all()
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _per_value(self, values: List[str], test) -> np.ndarray:
+        return np.fromiter((bool(value) and test(value) for value in values), dtype=bool, count=len(values))
+
+    def _jobs_containing(self, term: str) -> np.ndarray:
+        """Boolean over job_rows: whether each job description contains term"""
+        hits = np.zeros(len(self.job_rows), dtype=bool)
+        text, starts = self.job_text, self.job_starts
+        pos = text.find(term)
+        while pos != -1:
+            row = int(np.searchsorted(starts, pos, side="right")) - 1
+            hits[row] = True
+            if row + 1 >= len(starts):
+                break
+            pos = text.find(term, int(starts[row + 1]))
+        return hits
+
+    def score(self, scorer: MatchScorer) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Scores for every opportunity, and a boolean array per contributing factor"""
+        count = len(self.ids)
+        factors = {}
+
+        if scorer.location:
+            user_location = scorer.location
+            factors["location_match"] = self._per_value(
+                self.locations,
+                lambda location: user_location in location or location in user_location or location in OPEN_LOCATIONS
+            )[self.location_codes]
+
+        if scorer.user_type == "student":
+            if scorer.has_student_profile:
+                type_match = self.type_codes == TYPE_CODES[OpportunityType.SCHOLARSHIP.value]
+                factors["user_type_match"] = type_match
+                if scorer.major:
+                    major = scorer.major
+                    in_category = self._per_value(self.categories, lambda category: major in category)
+                    factors["major_match"] = type_match & in_category[self.category_codes]
+
+        elif scorer.user_type == "business":
+            factors["user_type_match"] = self.type_codes == TYPE_CODES[OpportunityType.GRANT.value]
+
+        elif scorer.user_type == "job_seeker":
+            factors["user_type_match"] = self.type_codes == TYPE_CODES[OpportunityType.JOB.value]
+            if scorer.skills and len(self.job_rows):
+                in_jobs = np.zeros(len(self.job_rows), dtype=bool)
+                for skill in scorer.skills:
+                    in_jobs |= self._jobs_containing(skill)
+                skills_match = np.zeros(count, dtype=bool)
+                skills_match[self.job_rows] = in_jobs
+                factors["skills_match"] = skills_match
+
+        with np.errstate(invalid="ignore"):
+            factors["deadline_urgency"] = self.deadlines - _epoch(scorer.now) < URGENT_SECONDS
+
+        scores = np.full(count, 50.0)
+        for name, mask in factors.items():
+            scores += FACTOR_POINTS[name] * mask
+        return np.minimum(scores, 100.0), factors
+
+    def top_k(self, scores: np.ndarray, k: int) -> List[Tuple[int, float]]:
+        """The k best (opportunity id, score); ties go to the most recently posted"""
+        if not len(scores) or k <= 0:
+            return []
+
+        k = min(k, len(scores))
+        threshold = np.partition(scores, len(scores) - k)[len(scores) - k]
+        candidates = np.flatnonzero(scores >= threshold)
+        posted = np.nan_to_num(self.posted[candidates], nan=-np.inf)
+        order = candidates[np.lexsort((-self.ids[candidates], -posted, -scores[candidates]))][:k]
+        return [(int(self.ids[i]), float(scores[i])) for i in order]
+
+    def score_rows(self, user_id: int, scorer: MatchScorer, skip_ids: Iterable[int] = ()) -> List[Dict[str, Any]]:
+        """match_scores rows for every opportunity not in skip_ids, ready for a bulk upsert"""
+        scores, factors = self.score(scorer)
+        keep = ~np.isin(self.ids, np.fromiter(skip_ids, dtype=np.int64))
+        names = list(factors)
+        masks = np.stack([factors[name] for name in names]) if names else np.zeros((0, len(scores)), dtype=bool)
+
+        rows = []
+        for i in np.flatnonzero(keep):
+            rows.append({
+                "user_id": user_id,
+                "opportunity_id": int(self.ids[i]),
+                "score": float(scores[i]),
+                "factors": json.dumps([name for name, hit in zip(names, masks[:, i]) if hit]),
+                "calculated_at": scorer.now
+            })
+        return rows
+
+class CatalogueCache:
+    """Holds the current catalogue snapshot and replaces it when opportunities change.
+
+    Snapshots are never modified, so a request scoring against one is not
+    disturbed by a reload in another thread.
+    """
+
+    def __init__(self, max_age: int = CATALOGUE_MAX_AGE):
+        self.max_age = max_age
+        self.catalogue: Optional[OpportunityCatalogue] = None
+        self.signature = None
+        self.loaded_at = 0.0
+        self.lock = threading.Lock()
+
+    def ensure_fresh(self, db: Session) -> OpportunityCatalogue:
+        """Current snapshot, reloaded if opportunities were added or deactivated or it is older than max_age"""
+        signature = tuple(
+            db.query(func.count(Opportunity.id), func.max(Opportunity.id))
+              .filter(Opportunity.is_active == True)
+              .one()
+        )
+        with self.lock:
+            if (self.catalogue is None or signature != self.signature
+                    or time.monotonic() - self.loaded_at >= self.max_age):
+                self.catalogue = OpportunityCatalogue.load(db)
+                self.signature = signature
+                self.loaded_at = time.monotonic()
+            return self.catalogue
+
+# Global catalogue cache, shared by the requests and the refresh job of one process
+opportunity_catalogue = CatalogueCache()
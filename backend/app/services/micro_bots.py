@@ -5,9 +5,11 @@ import re
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 import logging
 
+from services.html_parser import PARSER_BACKEND
+
 from ..models.dashboard import Opportunity, OpportunityType
 from ..schemas.dashboard import OpportunityCreate
 
@@ -16,6 +18,9 @@ logger = logging.getLogger(__name__)
 class MicroBot:
     """Base class for micro bots that scrape specific sources"""
     
+    # Restricts parsing to listing elements; None builds the whole tree
+    listing_strainer: Optional[SoupStrainer] = None
+    
     def __init__(self, name: str, base_url: str, db: Session):
         self.name = name
         self.base_url = base_url
@@ -48,6 +53,10 @@ class MicroBot:
             logger.error(f"Error fetching {url}: {str(e)}")
             return None
     
+    def parse_html(self, html: str) -> BeautifulSoup:
+        """Parse only the listing elements of a page"""
+        return BeautifulSoup(html, PARSER_BACKEND, parse_only=self.listing_strainer)
+    
     async def parse_opportunities(self, html: str) -> List[Dict[str, Any]]:
         """Parse opportunities from HTML - to be implemented by subclasses"""
         raise NotImplementedError
@@ -68,11 +77,13 @@ class MicroBot:
 class ScholarshipBot(MicroBot):
     """Bot for scraping scholarship opportunities"""
     
+    listing_strainer = SoupStrainer('div', class_='scholarship-card')
+    
     def __init__(self, db: Session):
         super().__init__("ScholarshipBot", "https://www.scholarships.com", db)
     
     async def parse_opportunities(self, html: str) -> List[Dict[str, Any]]:
-        soup = BeautifulSoup(html, 'html.parser')
+        soup = self.parse_html(html)
         opportunities = []
         
         # Example parsing logic - adapt to actual website structure
@@ -159,11 +170,13 @@ class ScholarshipBot(MicroBot):
 class GrantBot(MicroBot):
     """Bot for scraping grant opportunities"""
     
+    listing_strainer = SoupStrainer('div', class_='grant-listing')
+    
     def __init__(self, db: Session):
         super().__init__("GrantBot", "https://www.grants.gov", db)
     
     async def parse_opportunities(self, html: str) -> List[Dict[str, Any]]:
-        soup = BeautifulSoup(html, 'html.parser')
+        soup = self.parse_html(html)
         opportunities = []
         
         # Example parsing for grants.gov structure
@@ -230,11 +243,13 @@ class GrantBot(MicroBot):
 class JobBot(MicroBot):
     """Bot for scraping job opportunities"""
     
+    listing_strainer = SoupStrainer('div', class_='job-card')
+    
     def __init__(self, db: Session):
         super().__init__("JobBot", "https://www.indeed.com", db)
     
     async def parse_opportunities(self, html: str) -> List[Dict[str, Any]]:
-        soup = BeautifulSoup(html, 'html.parser')
+        soup = self.parse_html(html)
         opportunities = []
         
         # Example parsing for job listings
@@ -282,11 +297,13 @@ class JobBot(MicroBot):
 class VolunteerBot(MicroBot):
     """Bot for scraping volunteer opportunities"""
     
+    listing_strainer = SoupStrainer('div', class_='volunteer-opportunity')
+    
     def __init__(self, db: Session):
         super().__init__("VolunteerBot", "https://www.volunteermatch.org", db)
     
     async def parse_opportunities(self, html: str) -> List[Dict[str, Any]]:
-        soup = BeautifulSoup(html, 'html.parser')
+        soup = self.parse_html(html)
         opportunities = []
         
         volunteer_listings = soup.find_all('div', class_='volunteer-opportunity')
@@ -382,7 +399,7 @@ class MicroBotOrchestrator:
                         if opportunity_types and opp_data['opportunity_type'] not in opportunity_types:
                             continue
                         
-                        opportunity = Opportunity(**opp_data)
+                        opportunity = Opportunity(**opp_data, amount_value=extract_amount(opp_data.get('amount')))
                         self.db.add(opportunity)
                         total_stored += 1
                 
@@ -457,18 +474,53 @@ def clean_text(text: str) -> str:
     text = re.sub(r'[^\w\s\-\.,!?]', '', text)
     return text
 
+AMOUNT_PATTERN = re.compile(r'(\d[\d,]*(?:\.\d+)?)\s*(k|thousand|m|million|b|billion)?\b', re.IGNORECASE)
+AMOUNT_MULTIPLIERS = {'k': 1e3, 'thousand': 1e3, 'm': 1e6, 'million': 1e6, 'b': 1e9, 'billion': 1e9}
+
 def extract_amount(amount_str: str) -> Optional[float]:
-    """Extract numeric amount from string"""
+    """Extract numeric amount from string, taking the lower bound of ranges such as $5,000 - $10,000"""
     if not amount_str:
         return None
     
-    # Remove currency symbols and commas
-    cleaned = re.sub(r'[^\d\.]', '', amount_str)
+    match = AMOUNT_PATTERN.search(amount_str)
+    if not match:
+        return None
     
     try:
-        return float(cleaned)
+        amount = float(match.group(1).replace(',', ''))
     except ValueError:
         return None
+    
+    suffix = (match.group(2) or '').lower()
+    return amount * AMOUNT_MULTIPLIERS.get(suffix, 1)
+
+def backfill_amount_values(db: Session, batch_size: int = 1000) -> int:
+    """Parse amount_value for opportunities stored before it existed"""
+    updated = 0
+    last_id = 0
+    
+    while True:
+        rows = db.query(Opportunity.id, Opportunity.amount)\
+                 .filter(Opportunity.amount.isnot(None), Opportunity.amount_value.is_(None))\
+                 .filter(Opportunity.id > last_id)\
+                 .order_by(Opportunity.id)\
+                 .limit(batch_size)\
+                 .all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        
+        values = []
+        for row in rows:
+            amount = extract_amount(row.amount)
+            if amount is not None:
+                values.append({'id': row.id, 'amount_value': amount})
+        if values:
+            db.bulk_update_mappings(Opportunity, values)
+            db.commit()
+            updated += len(values)
+    
+    return updated
 
 def categorize_opportunity(title: str, description: str) -> str:
     """Automatically categorize opportunity based on content"""
@@ -0,0 +1,156 @@
+from typing import Callable, Dict, Any, Optional, Type, TypeVar
+from collections import OrderedDict
+import os
+import time
+import threading
+import logging
+
+from pydantic import BaseModel
+
+from ..core.config import settings
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+# Dashboards whose stats are cached, one entry per user each
+STATS_KINDS = ("student", "business", "job_seeker")
+
+StatsModel = TypeVar("StatsModel", bound=BaseModel)
+
+class LRUStatsBackend:
+    """In-process LRU with per-entry expiry; used when Redis is not configured"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl: int):
+        with self.lock:
+            self.entries[key] = (value, time.monotonic() + ttl)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def delete(self, *keys: str):
+        with self.lock:
+            for key in keys:
+                self.entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+class RedisStatsBackend:
+    """Redis-backed entries, shared by every API process"""
+
+    def __init__(self, url: str):
+        self.client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.client.get(key)
+        return value.decode() if value is not None else None
+
+    def set(self, key: str, value: str, ttl: int):
+        self.client.setex(key, ttl, value)
+
+    def delete(self, *keys: str):
+        self.client.delete(*keys)
+
+class DashboardStatsCache:
+    """Per-user cache of the *DashboardStats objects.
+
+    Entries expire after ttl seconds and are dropped as soon as something
+    that feeds the stats changes for that user (applications, saved
+    opportunities, credit usage). Backend errors are counted and fall
+    through to computing the stats, so Redis being down only costs speed.
+    """
+
+    def __init__(self, backend, ttl: int):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.errors = 0
+
+    @staticmethod
+    def _key(user_id: int, kind: str) -> str:
+        return f"dashboard_stats:{user_id}:{kind}"
+
+    def get_or_compute(self, user_id: int, kind: str, model: Type[StatsModel],
+                       compute: Callable[[], StatsModel]) -> StatsModel:
+        """Cached stats of one kind for a user, computing and storing them on a miss"""
+        key = self._key(user_id, kind)
+
+        try:
+            cached = self.backend.get(key)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Dashboard stats cache read failed: {e}")
+            cached = None
+
+        if cached is not None:
+            try:
+                stats = model.model_validate_json(cached)
+                self.hits += 1
+                return stats
+            except ValueError:
+                pass  # Written by an older schema; recompute
+
+        self.misses += 1
+        stats = compute()
+
+        try:
+            self.backend.set(key, stats.model_dump_json(), self.ttl)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Dashboard stats cache write failed: {e}")
+
+        return stats
+
+    def invalidate(self, user_id: int):
+        """Drop every cached dashboard for a user"""
+        self.invalidations += 1
+        try:
+            self.backend.delete(*(self._key(user_id, kind) for kind in STATS_KINDS))
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Dashboard stats cache invalidation failed: {e}")
+
+    def get_statistics(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": "redis" if isinstance(self.backend, RedisStatsBackend) else "memory",
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "errors": self.errors,
+            "ttl": self.ttl,
+        }
+
+def _create_backend():
+    # settings.REDIS_URL always has a default; only an explicit REDIS_URL selects Redis
+    url = os.getenv("REDIS_URL")
+    if url and redis is not None:
+        return RedisStatsBackend(url)
+    return LRUStatsBackend(settings.DASHBOARD_STATS_CACHE_SIZE)
+
+# Global dashboard stats cache instance
+dashboard_stats_cache = DashboardStatsCache(_create_backend(), settings.DASHBOARD_STATS_CACHE_TTL)
@@ -0,0 +1,127 @@
+"""HTML parse + extraction throughput for FundingBot listing pages.
+
+Compares the original path (html.parser, selector strings re-parsed for every
+container) against the current one (configured backend, precompiled
+SelectorSets) on synthetic donor listing pages.
+
+Run from backend/:  python -m benchmarks.html_parsing [--pages 20] [--items 200]
+"""
+import argparse
+import random
+import time
+from typing import Callable, List
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+from services.bot_manager import FundingBot, SearchTarget
+from services.html_parser import PARSER_BACKEND, parse_html
+
+SECTORS = ['health', 'education', 'water and sanitation', 'agriculture', 'climate resilience']
+
+def build_page(items: int, seed: int) -> str:
+    """Synthetic listing page resembling a funder's open calls page"""
+    rng = random.Random(seed)
+    cards = []
+
+    for i in range(items):
+        sector = rng.choice(SECTORS)
+        cards.append(
+            f'<article class="grant-item">'
+            f'<h3 class="title"><a href="/grants/{seed}-{i}">Call for proposals: {sector} programme {i}</a></h3>'
+            f'<p class="summary">Funding for community organisations working on {sector} '
+            f'in East Africa. {"Lorem ipsum dolor sit amet. " * rng.randint(3, 12)}</p>'
+            f'<span class="deadline">{rng.randint(1, 28)}/{rng.randint(1, 12)}/2026</span>'
+            f'<span class="amount">${rng.randint(5, 500) * 1000:,} - ${rng.randint(500, 900) * 1000:,}</span>'
+            f'</article>'
+        )
+
+    nav = ''.join(f'<li><a href="/section/{i}">Section {i}</a></li>' for i in range(60))
+    return (
+        '<html><head><title>Open calls</title></head><body>'
+        f'<nav><ul>{nav}</ul></nav><main>{"".join(cards)}</main>'
+        '<footer><p>Contact us for more information about funding.</p></footer>'
+        '</body></html>'
+    )
+
+def first_text(container, selectors: List[str]):
+    for selector in selectors:
+        elem = container.select_one(selector)
+        if elem:
+            text = elem.get_text(strip=True)
+            if text and len(text) > 5:
+                return text
+    return None
+
+def baseline_extract(bot: FundingBot, target: SearchTarget) -> Callable[[str], int]:
+    """The pre-change extraction: html.parser and selector strings per call"""
+    def extract(html: str) -> int:
+        soup = BeautifulSoup(html, 'html.parser')
+        container_selectors = [
+            '.opportunity', '.grant', '.funding', '.call',
+            '[class*="opportunity"]', '[class*="grant"]',
+            'article', '.post', '.item'
+        ]
+
+        containers = []
+        for selector in container_selectors:
+            found = soup.select(selector)
+            if found:
+                containers = found
+                break
+
+        extracted = 0
+        for container in containers[:50]:
+            title = first_text(container, ['h1', 'h2', 'h3', '.title', '.name', 'a[href*="grant"]', 'a[href*="opportunity"]'])
+            if not title or len(title) < 10:
+                continue
+            first_text(container, ['.description', '.summary', '.excerpt', 'p', '.content'])
+            bot._parse_date(first_text(container, ['.deadline', '.due-date', '.closing-date', '[class*="deadline"]']))
+            amount = container.select_one('.amount')
+            if amount:
+                bot._parse_amount(amount.get_text(strip=True))
+            link = container.find('a', href=True)
+            urljoin(target.url, link['href']) if link else target.url
+            extracted += 1
+
+        return extracted
+    return extract
+
+def current_extract(bot: FundingBot, target: SearchTarget) -> Callable[[str], int]:
+    def extract(html: str) -> int:
+        return len(bot._extract_opportunities(parse_html(html), target))
+    return extract
+
+def measure(name: str, extract: Callable[[str], int], pages: List[str], rounds: int):
+    megabytes = sum(len(page.encode()) for page in pages) / (1024 * 1024)
+    best = float('inf')
+
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for page in pages:
+            extract(page)
+        best = min(best, time.perf_counter() - started)
+
+    print(f"{name:<40} {megabytes / best:8.2f} MB/s  ({best * 1000 / len(pages):.1f} ms/page)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', type=int, default=20)
+    parser.add_argument('--items', type=int, default=200)
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+
+    pages = [build_page(args.items, seed) for seed in range(args.pages)]
+    target = SearchTarget(
+        name="Benchmark", url="https://funder.example.org/open-calls", country="Kenya",
+        type="scraping", selectors={}, rate_limit=60, priority=5
+    )
+    bot = FundingBot("benchmark", "Kenya", [target])
+
+    size = sum(len(page.encode()) for page in pages) / (1024 * 1024)
+    print(f"{args.pages} pages, {size:.1f} MB of HTML, best of {args.rounds}")
+    measure("html.parser + selector strings", baseline_extract(bot, target), pages, args.rounds)
+    measure(f"{PARSER_BACKEND} + precompiled selectors", current_extract(bot, target), pages, args.rounds)
+
+if __name__ == '__main__':
+    main()
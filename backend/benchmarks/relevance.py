@@ -0,0 +1,118 @@
+"""Content relevance scoring throughput for the verifier's URL check.
+
+Compares the original scorer (lowercase the whole HTML, one substring scan
+per keyword and title word) against services.relevance (visible text from
+one compiled markup regex, word-start finds, per-page caching) on synthetic
+200-500 KB donor pages. The N/page rows score several opportunities against
+each page, as happens when many opportunities share a source page.
+
+Run from backend/:  python -m benchmarks.relevance [--pages 20] [--titles 10]
+"""
+import argparse
+import random
+import time
+from typing import Callable, List, Tuple
+
+from services.relevance import FUNDING_KEYWORDS, clear_page_terms, content_relevance, score_relevance_batch
+
+SECTORS = ['health', 'education', 'water and sanitation', 'agriculture', 'climate resilience']
+DONORS = ['UNDP', 'ReliefWeb', 'USAID', 'European Union', 'Gates Foundation']
+FILLER = (
+    'Applicants must be registered civil society organisations with audited accounts '
+    'and at least three years of experience implementing projects in the region. '
+)
+
+def build_page(size_kb: int, seed: int) -> str:
+    """Synthetic donor page: heavy head scripts and styles, navigation, then calls"""
+    rng = random.Random(seed)
+    script = ''.join(
+        f'window.__analytics_{i} = {{"event": "view", "grant": {i}, "callback": function(){{ return {i}; }}}};'
+        for i in range(400)
+    )
+    style = ''.join(f'.grant-card-{i} {{ margin: {i % 7}px; color: #{i:06x}; }}' for i in range(600))
+    nav = ''.join(f'<li><a href="/section/{i}">Section {i}</a></li>' for i in range(120))
+
+    parts = [
+        f'<html><head><title>Funding calls</title><style>{style}</style>'
+        f'<script>{script}</script></head><body><nav><ul>{nav}</ul></nav><main>'
+    ]
+    size = sum(map(len, parts))
+    i = 0
+
+    while size < size_kb * 1024:
+        sector = rng.choice(SECTORS)
+        card = (
+            f'<article class="grant-item"><h3><a href="/calls/{seed}-{i}">'
+            f'{rng.choice(DONORS)} call for proposals: {sector} programme {i}</a></h3>'
+            f'<p>Funding for community organisations working on {sector} in South Sudan. '
+            f'{FILLER * rng.randint(2, 6)}</p><span class="deadline">{rng.randint(1, 28)}/11/2026</span>'
+            f'</article><!-- card {i} -->'
+        )
+        parts.append(card)
+        size += len(card)
+        i += 1
+
+    parts.append('</main><footer>Contact the grants team for more information.</footer></body></html>')
+    return ''.join(parts)
+
+def baseline_relevance(content: str, title: str) -> float:
+    """The pre-change OpportunityVerifier._check_content_relevance"""
+    if not content or not title:
+        return 0.0
+
+    content_lower = content.lower()
+    title_words = title.lower().split()
+
+    keyword_matches = sum(1 for keyword in FUNDING_KEYWORDS if keyword in content_lower)
+    title_matches = sum(1 for word in title_words if len(word) > 3 and word in content_lower)
+
+    keyword_score = min(1.0, keyword_matches / len(FUNDING_KEYWORDS))
+    title_score = min(1.0, title_matches / max(1, len([w for w in title_words if len(w) > 3])))
+
+    return (keyword_score + title_score) / 2
+
+def build_titles(count: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    return [
+        f'{rng.choice(DONORS)} call for proposals: {rng.choice(SECTORS)} programme {rng.randint(0, 400)}'
+        for _ in range(count)
+    ]
+
+def measure(name: str, score: Callable[[List[Tuple[str, str]]], List[float]],
+            pairs: List[Tuple[str, str]], pages: int, rounds: int):
+    best = float('inf')
+
+    for _ in range(rounds):
+        clear_page_terms()
+        started = time.perf_counter()
+        score(pairs)
+        best = min(best, time.perf_counter() - started)
+
+    print(f"{name:<44} {pages / best:8.1f} pages/s  ({len(pairs) / best:8.1f} opportunities/s)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', type=int, default=20)
+    parser.add_argument('--titles', type=int, default=10, help="opportunities scored per page in batch mode")
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    pages = [build_page(rng.randint(200, 500), seed) for seed in range(args.pages)]
+    single = [(page, build_titles(1, seed)[0]) for seed, page in enumerate(pages)]
+    batch = [(page, title) for seed, page in enumerate(pages) for title in build_titles(args.titles, seed)]
+
+    size = sum(len(page.encode()) for page in pages) / (1024 * 1024)
+    print(f"{args.pages} pages, {size:.1f} MB of HTML, best of {args.rounds}")
+
+    baseline = lambda pairs: [baseline_relevance(page, title) for page, title in pairs]
+    current = lambda pairs: [content_relevance(page, title) for page, title in pairs]
+
+    measure("substring scans, 1/page", baseline, single, args.pages, args.rounds)
+    measure("visible text + word-start finds, 1/page", current, single, args.pages, args.rounds)
+    measure(f"substring scans, {args.titles}/page", baseline, batch, args.pages, args.rounds)
+    measure(f"score_relevance_batch, {args.titles}/page", score_relevance_batch, batch,
+            args.pages, args.rounds)
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,5 @@
-from sqlalchemy import Column, String, Text, DateTime, Integer, Boolean, BigInteger, Float
-from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy import Column, String, Text, DateTime, Integer, Boolean, BigInteger, Float, Index, LargeBinary, DDL, event
+from sqlalchemy.dialects.postgresql import UUID, JSONB, TSVECTOR, ARRAY
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import func
 import uuid
@@ -34,6 +34,44 @@ class DonorOpportunity(Base):
     verification_score = Column(Float, default=0.0)
     created_at = Column(DateTime(timezone=True), default=func.now())
     updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now())
+    search_vector = Column(TSVECTOR)  # weighted title/description/keywords/focus_areas, set by a trigger
+    minhash = Column(LargeBinary)  # MinHash signature of title+description shingles (uint32 x 128)
+    lsh_buckets = Column(ARRAY(BigInteger))  # one LSH band key per signature band
+    embedding_hash = Column(String(40))  # embedding_cache key of the current title/description text
+    
+    __table_args__ = (
+        Index('idx_donor_opportunities_search_vector', 'search_vector', postgresql_using='gin'),
+        Index('idx_donor_opportunities_lsh_buckets', 'lsh_buckets', postgresql_using='gin'),
+    )
+
+# Same trigger as supabase/migrations/20251017130000_living_lexeme.sql, for tables made by create_all
+SEARCH_VECTOR_TRIGGER = [
+    DDL("""
+    CREATE OR REPLACE FUNCTION donor_opportunities_search_vector()
+    RETURNS trigger
+    LANGUAGE plpgsql
+    AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(NEW.keywords, '[]'::jsonb)), 'B') ||
+            setweight(to_tsvector('english', coalesce(NEW.focus_areas, '[]'::jsonb)), 'B') ||
+            setweight(to_tsvector('english', coalesce(NEW.description, '')), 'C');
+        RETURN NEW;
+    END;
+    $$
+    """),
+    DDL("""
+    CREATE TRIGGER donor_opportunities_search_vector_update
+        BEFORE INSERT OR UPDATE OF title, description, keywords, focus_areas
+        ON donor_opportunities
+        FOR EACH ROW
+        EXECUTE FUNCTION donor_opportunities_search_vector()
+    """),
+]
+
+for statement in SEARCH_VECTOR_TRIGGER:
+    event.listen(DonorOpportunity.__table__, 'after_create', statement.execute_if(dialect='postgresql'))
 
 class SearchBot(Base):
     __tablename__ = "search_bots"
@@ -79,6 +117,7 @@ class SearchTarget(Base):
     api_key = Column(String(500))
     is_active = Column(Boolean, default=True)
     success_rate = Column(Float, default=0.0)
+    change_rate = Column(Float)  # learned by the adaptive scheduler, see services/target_scheduler.py
     last_successful_run = Column(DateTime(timezone=True))
     created_at = Column(DateTime(timezone=True), default=func.now())
     updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now())
@@ -107,4 +146,23 @@ class SearchStatistics(Base):
     success_rate = Column(Float, default=0.0)
     response_time_avg = Column(Float, default=0.0)
     errors_count = Column(Integer, default=0)
-    created_at = Column(DateTime(timezone=True), default=func.now())
\ No newline at end of file
+    created_at = Column(DateTime(timezone=True), default=func.now())
+
+class WorkerLease(Base):
+    __tablename__ = "worker_leases"
+    
+    name = Column(String(100), primary_key=True)  # bot_manager, verification_service
+    holder = Column(String(200), nullable=False)  # host:pid:nonce of the owning worker
+    acquired_at = Column(DateTime(timezone=True), default=func.now())
+    heartbeat_at = Column(DateTime(timezone=True), default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    status = Column(JSONB)  # latest state snapshot published by the holder
+
+class EmbeddingCache(Base):
+    __tablename__ = "embedding_cache"
+    
+    content_hash = Column(String(40), primary_key=True)  # sha1 of model name + embedded text
+    model = Column(String(100), nullable=False)
+    dimensions = Column(Integer, nullable=False)
+    vector = Column(LargeBinary, nullable=False)  # float16 by default, see EMBEDDING_STORAGE_DTYPE
+    created_at = Column(DateTime(timezone=True), default=func.now())
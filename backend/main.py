@@ -8,6 +8,7 @@ from core.config import settings
 from core.database import engine, Base
 from api.routes import auth, users, organizations, proposals, donors, projects, ai_assistant
 from core.auth import get_current_user
+from services.opportunity_index import opportunity_index
 
 # Create tables
 @asynccontextmanager
@@ -20,9 +21,11 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         print(f"⚠️  Database initialization failed: {e}")
         print("🔄 Continuing without database...")
+    # Load and refresh the matching index in the background; /donors matching uses rules until it is ready
+    opportunity_index.start()
     yield
     # Shutdown
-    pass
+    await opportunity_index.stop()
 
 app = FastAPI(
     title="Granada API",
@@ -51,7 +51,8 @@ class DonorCall(Base):
     evaluation_criteria = Column(Text)
     
     # AI Processing
-    embedding_vector = Column(JSON)  # For semantic matching
+    embedding_vector = Column(JSON)  # Superseded by embedding_hash, no longer written
+    embedding_hash = Column(String(40))  # embedding_cache key, set by the embed_new_content task
     keywords = Column(JSON)
     sdg_alignment = Column(JSON)  # SDG goals alignment
     
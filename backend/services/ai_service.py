@@ -27,6 +27,18 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Local sentence-transformers model used for embeddings
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+
+_embedding_model = None
+
+def load_embedding_model():
+    """The local embedding model, loaded once per process (None if unavailable)"""
+    global _embedding_model
+    if _embedding_model is None and SENTENCE_TRANSFORMERS_AVAILABLE:
+        _embedding_model = SentenceTransformer(EMBEDDING_MODEL)
+    return _embedding_model
+
 class AIService:
     def __init__(self):
         self.openai_api_key = os.getenv("OPENAI_API_KEY")
@@ -52,7 +64,7 @@ class AIService:
                 logger.info("AI service initialized with OpenAI")
             elif SENTENCE_TRANSFORMERS_AVAILABLE:
                 # Use local sentence transformers as fallback
-                self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+                self.embedding_model = load_embedding_model()
                 logger.info("AI service initialized with local Sentence Transformers")
                 self.initialized = True
             else:
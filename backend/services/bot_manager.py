@@ -1,18 +1,21 @@
+import os
 import asyncio
 import aiohttp
 import logging
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 import json
 import hashlib
+from collections import Counter
 from urllib.parse import urljoin, urlparse
 import re
 from bs4 import BeautifulSoup
 import feedparser
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, insert, update, delete
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 import uuid
 
 # Configure logging
@@ -22,6 +25,13 @@ logger = logging.getLogger(__name__)
 # Import models and database connection
 from database.models import DonorOpportunity, SearchBot, BotReward, SearchTarget, OpportunityVerification
 from database.connection import get_db_session
+from services.near_duplicates import build_near_duplicate_fields
+from services.rate_limiter import HostRateLimiter
+from services.http_cache import ConditionalFetcher, FetchResult
+from services.page_cache import page_cache
+from services.target_scheduler import AdaptiveScheduler
+from services.html_parser import SelectorSet, parse_html
+from services.extraction_pool import extraction_pool
 
 class BotStatus(Enum):
     ACTIVE = "active"
@@ -29,6 +39,20 @@ class BotStatus(Enum):
     ERROR = "error"
     MAINTENANCE = "maintenance"
 
+# Fallback selectors for generic listing pages, compiled once at import
+CONTAINER_SELECTORS = SelectorSet([
+    '.opportunity', '.grant', '.funding', '.call',
+    '[class*="opportunity"]', '[class*="grant"]',
+    'article', '.post', '.item'
+])
+CONTAINER_CLASS_PATTERN = re.compile(r'(opportunity|grant|funding|call)', re.I)
+DEFAULT_SELECTORS = {
+    'title': SelectorSet(['h1', 'h2', 'h3', '.title', '.name', 'a[href*="grant"]', 'a[href*="opportunity"]']),
+    'description': SelectorSet(['.description', '.summary', '.excerpt', 'p', '.content']),
+    'deadline': SelectorSet(['.deadline', '.due-date', '.closing-date', '[class*="deadline"]']),
+    'amount': SelectorSet(['.amount', '.funding', '.value', '[class*="amount"]']),
+}
+
 @dataclass
 class SearchTarget:
     name: str
@@ -41,6 +65,26 @@ class SearchTarget:
     api_key: Optional[str] = None
     headers: Optional[Dict[str, str]] = None
 
+def create_http_session() -> aiohttp.ClientSession:
+    """HTTP session with browser-like headers for fetching funder sites"""
+    headers = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+        'Accept-Language': 'en-US,en;q=0.5',
+        'Accept-Encoding': 'gzip, deflate',
+        'Connection': 'keep-alive',
+        'Upgrade-Insecure-Requests': '1',
+    }
+    
+    timeout = aiohttp.ClientTimeout(total=30, connect=10)
+    connector = aiohttp.TCPConnector(limit=10, limit_per_host=5)
+    
+    return aiohttp.ClientSession(
+        headers=headers,
+        timeout=timeout,
+        connector=connector
+    )
+
 class FundingBot:
     def __init__(self, bot_id: str, country: str, targets: List[SearchTarget]):
         self.bot_id = bot_id
@@ -48,33 +92,27 @@ class FundingBot:
         self.targets = targets
         self.status = BotStatus.ACTIVE
         self.session: Optional[aiohttp.ClientSession] = None
+        self.owns_session = False
+        self.fetcher = ConditionalFetcher()
+        self.pending_fetches: Dict[str, FetchResult] = {}  # parsed but not yet saved, by URL
+        self.selector_sets: Dict[str, Dict[str, SelectorSet]] = {}
         self.opportunities_found = 0
         self.last_run = None
         self.errors = []
         
     async def start_session(self):
         """Initialize HTTP session with proper headers"""
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-        }
-        
-        timeout = aiohttp.ClientTimeout(total=30, connect=10)
-        connector = aiohttp.TCPConnector(limit=10, limit_per_host=5)
-        
-        self.session = aiohttp.ClientSession(
-            headers=headers,
-            timeout=timeout,
-            connector=connector
-        )
+        self.session = create_http_session()
+        self.owns_session = True
+    
+    def use_session(self, session: aiohttp.ClientSession):
+        """Borrow a session owned by someone else; close_session leaves it open"""
+        self.session = session
+        self.owns_session = False
     
     async def close_session(self):
         """Close HTTP session"""
-        if self.session:
+        if self.session and self.owns_session:
             await self.session.close()
     
     async def search_target(self, target: SearchTarget) -> List[Dict[str, Any]]:
@@ -107,12 +145,16 @@ class FundingBot:
             if target.api_key:
                 headers['Authorization'] = f'Bearer {target.api_key}'
             
-            async with self.session.get(target.url, headers=headers) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    opportunities = self._parse_api_response(data, target)
-                else:
-                    logger.warning(f"API request failed: {response.status}")
+            fetched = await self.fetcher.fetch(self.session, target.url, headers=headers, variant=target.selectors)
+            
+            if fetched.not_modified:
+                logger.info(f"{target.name} unchanged since last fetch, skipping parse")
+            elif fetched.status == 200:
+                data = json.loads(fetched.text)
+                opportunities = self._parse_api_response(data, target)
+                self.pending_fetches[target.url] = fetched
+            else:
+                logger.warning(f"API request failed: {fetched.status}")
                     
         except Exception as e:
             logger.error(f"API search error for {target.name}: {e}")
@@ -124,13 +166,16 @@ class FundingBot:
         opportunities = []
         
         try:
-            async with self.session.get(target.url) as response:
-                if response.status == 200:
-                    html = await response.text()
-                    soup = BeautifulSoup(html, 'html.parser')
-                    opportunities = self._extract_opportunities(soup, target)
-                else:
-                    logger.warning(f"Scraping failed: {response.status}")
+            fetched = await self.fetcher.fetch(self.session, target.url, variant=target.selectors)
+            
+            if fetched.not_modified:
+                logger.info(f"{target.name} unchanged since last fetch, skipping parse")
+            elif fetched.status == 200:
+                # Parse in a worker process so large pages don't stall the event loop
+                opportunities = await extraction_pool.run(extract_page, fetched.text, target)
+                self.pending_fetches[target.url] = fetched
+            else:
+                logger.warning(f"Scraping failed: {fetched.status}")
                     
         except Exception as e:
             logger.error(f"Scraping error for {target.name}: {e}")
@@ -142,17 +187,51 @@ class FundingBot:
         opportunities = []
         
         try:
-            async with self.session.get(target.url) as response:
-                if response.status == 200:
-                    rss_content = await response.text()
-                    feed = feedparser.parse(rss_content)
-                    opportunities = self._parse_rss_feed(feed, target)
+            fetched = await self.fetcher.fetch(self.session, target.url, variant=target.selectors)
+            
+            if fetched.not_modified:
+                logger.info(f"{target.name} unchanged since last fetch, skipping parse")
+            elif fetched.status == 200:
+                feed = feedparser.parse(fetched.text)
+                opportunities = self._parse_rss_feed(feed, target)
+                self.pending_fetches[target.url] = fetched
                     
         except Exception as e:
             logger.error(f"RSS parsing error for {target.name}: {e}")
         
         return opportunities
     
+    def target_changed(self, target: SearchTarget) -> bool:
+        """Whether target returned a new body during the current cycle"""
+        validators = self.fetcher.validators_for(target.url, target.selectors)
+        if not validators or not validators.last_changed or not self.last_run:
+            return False
+        return validators.last_changed == validators.last_checked and validators.last_checked >= self.last_run
+    
+    async def commit_fetches(self, targets: List[SearchTarget]):
+        """Mark targets' pages as processed once their opportunities are saved.
+        
+        Until then an unchanged page is not skipped, so a failed parse or
+        save is retried on the next cycle.
+        """
+        for target in targets:
+            fetched = self.pending_fetches.pop(target.url, None)
+            if fetched:
+                await self.fetcher.commit(fetched)
+    
+    def _selectors_for(self, target: SearchTarget) -> Dict[str, SelectorSet]:
+        """Compiled selectors for target, its own selectors tried before the defaults"""
+        selector_sets = self.selector_sets.get(target.url)
+        
+        if selector_sets is None:
+            overrides = target.selectors or {}
+            selector_sets = {'container': CONTAINER_SELECTORS.with_override(overrides.get('container'))}
+            for field, defaults in DEFAULT_SELECTORS.items():
+                selector_sets[field] = defaults.with_override(overrides.get(field))
+            self.selector_sets[target.url] = selector_sets
+        
+        return selector_sets
+    
     def _parse_api_response(self, data: Dict, target: SearchTarget) -> List[Dict[str, Any]]:
         """Parse API response to extract opportunities"""
         opportunities = []
@@ -188,27 +267,18 @@ class FundingBot:
         """Extract opportunities from HTML using selectors"""
         opportunities = []
         
-        # Find opportunity containers
-        container_selectors = [
-            '.opportunity', '.grant', '.funding', '.call',
-            '[class*="opportunity"]', '[class*="grant"]',
-            'article', '.post', '.item'
-        ]
+        selectors = self._selectors_for(target)
         
-        containers = []
-        for selector in container_selectors:
-            found = soup.select(selector)
-            if found:
-                containers = found
-                break
+        # Find opportunity containers
+        containers = selectors['container'].select(soup)
         
         if not containers:
             # Fallback: look for common patterns
-            containers = soup.find_all(['div', 'article'], class_=re.compile(r'(opportunity|grant|funding|call)', re.I))
+            containers = soup.find_all(['div', 'article'], class_=CONTAINER_CLASS_PATTERN)
         
         for container in containers[:50]:  # Limit to 50 opportunities per page
             try:
-                opportunity = self._extract_from_container(container, target)
+                opportunity = self._extract_from_container(container, target, selectors)
                 if opportunity:
                     opportunities.append(opportunity)
             except Exception as e:
@@ -216,27 +286,26 @@ class FundingBot:
         
         return opportunities
     
-    def _extract_from_container(self, container, target: SearchTarget) -> Optional[Dict[str, Any]]:
+    def _extract_from_container(self, container, target: SearchTarget,
+                                selectors: Optional[Dict[str, SelectorSet]] = None) -> Optional[Dict[str, Any]]:
         """Extract opportunity data from HTML container"""
         try:
+            selectors = selectors or self._selectors_for(target)
+            
             # Extract title
-            title_selectors = ['h1', 'h2', 'h3', '.title', '.name', 'a[href*="grant"]', 'a[href*="opportunity"]']
-            title = self._extract_text(container, title_selectors)
+            title = self._extract_text(container, selectors['title'])
             
             if not title or len(title) < 10:
                 return None
             
             # Extract description
-            desc_selectors = ['.description', '.summary', '.excerpt', 'p', '.content']
-            description = self._extract_text(container, desc_selectors)
+            description = self._extract_text(container, selectors['description'])
             
             # Extract deadline
-            deadline_selectors = ['.deadline', '.due-date', '.closing-date', '[class*="deadline"]']
-            deadline = self._extract_date(container, deadline_selectors)
+            deadline = self._extract_date(container, selectors['deadline'])
             
             # Extract amount
-            amount_selectors = ['.amount', '.funding', '.value', '[class*="amount"]']
-            amount = self._extract_amount(container, amount_selectors)
+            amount = self._extract_amount(container, selectors['amount'])
             
             # Extract link
             link_elem = container.find('a', href=True)
@@ -262,34 +331,29 @@ class FundingBot:
             logger.error(f"Error extracting opportunity data: {e}")
             return None
     
-    def _extract_text(self, container, selectors: List[str]) -> Optional[str]:
+    def _extract_text(self, container, selectors: SelectorSet) -> Optional[str]:
         """Extract text using multiple selectors"""
-        for selector in selectors:
-            elem = container.select_one(selector)
-            if elem:
-                text = elem.get_text(strip=True)
-                if text and len(text) > 5:
-                    return text[:500]  # Limit length
+        for elem in selectors.matches(container):
+            text = elem.get_text(strip=True)
+            if text and len(text) > 5:
+                return text[:500]  # Limit length
         return None
     
-    def _extract_date(self, container, selectors: List[str]) -> Optional[datetime]:
+    def _extract_date(self, container, selectors: SelectorSet) -> Optional[datetime]:
         """Extract and parse date"""
-        for selector in selectors:
-            elem = container.select_one(selector)
-            if elem:
-                date_text = elem.get_text(strip=True)
-                parsed_date = self._parse_date(date_text)
-                if parsed_date:
-                    return parsed_date
+        for elem in selectors.matches(container):
+            date_text = elem.get_text(strip=True)
+            parsed_date = self._parse_date(date_text)
+            if parsed_date:
+                return parsed_date
         return None
     
-    def _extract_amount(self, container, selectors: List[str]) -> Optional[Dict[str, Any]]:
+    def _extract_amount(self, container, selectors: SelectorSet) -> Optional[Dict[str, Any]]:
         """Extract funding amount"""
-        for selector in selectors:
-            elem = container.select_one(selector)
-            if elem:
-                amount_text = elem.get_text(strip=True)
-                return self._parse_amount(amount_text)
+        elem = selectors.select_one(container)
+        if elem:
+            amount_text = elem.get_text(strip=True)
+            return self._parse_amount(amount_text)
         return None
     
     def _parse_date(self, date_text: str) -> Optional[datetime]:
@@ -464,6 +528,82 @@ class FundingBot:
                 return str(item[field])[:500]  # Limit length
         return None
 
+# Maximum number of targets fetched at once across all bots
+MAX_CONCURRENT_FETCHES = int(os.getenv('BOT_MAX_CONCURRENT_FETCHES', '8'))
+
+# Shortest pause between scheduler passes, so a burst of due targets
+# can't spin the loop
+SCHEDULER_MIN_SLEEP = 5
+
+# Rows per INSERT when saving scraped opportunities (keeps bind params well under
+# the 32767 per-statement limit)
+SAVE_CHUNK_SIZE = 500
+
+# Per-process FundingBot used only for its extraction helpers
+_extractor: Optional[FundingBot] = None
+
+def extract_page(html: str, target: SearchTarget) -> List[Dict[str, Any]]:
+    """Parse a listing page and extract opportunities; runs in extraction pool workers"""
+    global _extractor
+    if _extractor is None:
+        _extractor = FundingBot('extractor', target.country, [])
+    return _extractor._extract_opportunities(parse_html(html), target)
+
+def bot_configs() -> Dict[str, Tuple[str, str, List[SearchTarget]]]:
+    """Bot key -> (bot_id, country, targets) for every country bot"""
+    # South Sudan Bot
+    south_sudan_targets = [
+        SearchTarget(
+            name="UNDP South Sudan",
+            url="https://www.undp.org/south-sudan/funding-opportunities",
+            country="South Sudan",
+            type="scraping",
+            selectors={},
+            rate_limit=30,
+            priority=10
+        ),
+        SearchTarget(
+            name="World Bank South Sudan",
+            url="https://projects.worldbank.org/en/projects-operations/projects-list?countrycode_exact=SS",
+            country="South Sudan",
+            type="scraping",
+            selectors={},
+            rate_limit=20,
+            priority=9
+        ),
+        SearchTarget(
+            name="USAID South Sudan",
+            url="https://www.usaid.gov/south-sudan/partnership-opportunities",
+            country="South Sudan",
+            type="scraping",
+            selectors={},
+            rate_limit=25,
+            priority=9
+        ),
+        SearchTarget(
+            name="African Development Bank",
+            url="https://www.afdb.org/en/projects-and-operations/procurement/opportunities",
+            country="South Sudan",
+            type="scraping",
+            selectors={},
+            rate_limit=20,
+            priority=8
+        ),
+        SearchTarget(
+            name="UN Women South Sudan",
+            url="https://africa.unwomen.org/en/where-we-are/east-and-southern-africa/south-sudan",
+            country="South Sudan",
+            type="scraping",
+            selectors={},
+            rate_limit=15,
+            priority=7
+        )
+    ]
+    
+    return {
+        "south_sudan": ("south_sudan_bot", "South Sudan", south_sudan_targets)
+    }
+
 class BotManager:
     def __init__(self):
         self.bots: Dict[str, FundingBot] = {}
@@ -471,65 +611,23 @@ class BotManager:
         self.scrapingQueue = []
         self.isScrapingActive = False
         self.lastScrapingRun = datetime.utcnow()
+        self.rate_limiter = HostRateLimiter()
+        self.fetch_semaphore = asyncio.Semaphore(MAX_CONCURRENT_FETCHES)
+        self.scheduler = AdaptiveScheduler()
         
     async def initialize_bots(self):
         """Initialize bots for different countries"""
+        for key, (bot_id, country, targets) in bot_configs().items():
+            bot = FundingBot(bot_id, country, targets)
+            await bot.start_session()
+            self.bots[key] = bot
+            
+            logger.info(f"Initialized {country} funding bot")
         
-        # South Sudan Bot
-        south_sudan_targets = [
-            SearchTarget(
-                name="UNDP South Sudan",
-                url="https://www.undp.org/south-sudan/funding-opportunities",
-                country="South Sudan",
-                type="scraping",
-                selectors={},
-                rate_limit=30,
-                priority=10
-            ),
-            SearchTarget(
-                name="World Bank South Sudan",
-                url="https://projects.worldbank.org/en/projects-operations/projects-list?countrycode_exact=SS",
-                country="South Sudan",
-                type="scraping",
-                selectors={},
-                rate_limit=20,
-                priority=9
-            ),
-            SearchTarget(
-                name="USAID South Sudan",
-                url="https://www.usaid.gov/south-sudan/partnership-opportunities",
-                country="South Sudan",
-                type="scraping",
-                selectors={},
-                rate_limit=25,
-                priority=9
-            ),
-            SearchTarget(
-                name="African Development Bank",
-                url="https://www.afdb.org/en/projects-and-operations/procurement/opportunities",
-                country="South Sudan",
-                type="scraping",
-                selectors={},
-                rate_limit=20,
-                priority=8
-            ),
-            SearchTarget(
-                name="UN Women South Sudan",
-                url="https://africa.unwomen.org/en/where-we-are/east-and-southern-africa/south-sudan",
-                country="South Sudan",
-                type="scraping",
-                selectors={},
-                rate_limit=15,
-                priority=7
-            )
-        ]
-        
-        # Create South Sudan bot
-        ss_bot = FundingBot("south_sudan_bot", "South Sudan", south_sudan_targets)
-        await ss_bot.start_session()
-        self.bots["south_sudan"] = ss_bot
-        
-        logger.info("Initialized South Sudan funding bot")
+        # Resume learned polling intervals
+        await self.scheduler.load(
+            target for bot in self.bots.values() for target in bot.targets
+        )
     
     async def start_continuous_search(self):
         """Start continuous searching across all bots"""
@@ -538,45 +636,53 @@ class BotManager:
         
         while self.running:
             try:
-                # Run all bots in parallel
+                # Run every bot that has targets due, in parallel
                 tasks = []
+                scheduled_targets = []
                 for bot_id, bot in self.bots.items():
                     if bot.status == BotStatus.ACTIVE:
-                        tasks.append(self._run_bot_cycle(bot))
+                        scheduled_targets.extend(bot.targets)
+                        due_targets = self.scheduler.due(bot.targets)
+                        if due_targets:
+                            tasks.append(self._run_bot_cycle(bot, due_targets))
                 
                 if tasks:
                     await asyncio.gather(*tasks, return_exceptions=True)
                 
-                # Wait before next cycle (5 minutes)
-                await asyncio.sleep(300)
+                # Sleep until the next target is due
+                delay = self.scheduler.seconds_until_next(scheduled_targets)
+                await asyncio.sleep(max(SCHEDULER_MIN_SLEEP, delay))
                 
             except Exception as e:
                 logger.error(f"Error in continuous search: {e}")
                 await asyncio.sleep(60)  # Wait 1 minute on error
     
-    async def _run_bot_cycle(self, bot: FundingBot):
-        """Run a single search cycle for a bot"""
+    async def _run_bot_cycle(self, bot: FundingBot, targets: Optional[List[SearchTarget]] = None):
+        """Run a single search cycle for a bot over targets (all of them by default)"""
         try:
             logger.info(f"Running search cycle for bot {bot.bot_id}")
             bot.last_run = datetime.utcnow()
             
             all_opportunities = []
             
-            # Search each target
-            for target in bot.targets:
-                try:
-                    opportunities = await bot.search_target(target)
-                    all_opportunities.extend(opportunities)
-                    
-                    # Rate limiting
-                    await asyncio.sleep(60 / target.rate_limit)
-                    
-                except Exception as e:
-                    logger.error(f"Error searching target {target.name}: {e}")
+            # Search all targets concurrently; highest priority queues first
+            targets = sorted(targets or bot.targets, key=lambda t: t.priority, reverse=True)
+            results = await asyncio.gather(
+                *(self._search_target(bot, target) for target in targets),
+                return_exceptions=True
+            )
+            
+            for target, result in zip(targets, results):
+                if isinstance(result, Exception):
+                    logger.error(f"Error searching target {target.name}: {result}")
+                else:
+                    all_opportunities.extend(result)
             
             # Save opportunities to database
+            saved_by_source = Counter()
             if all_opportunities:
-                saved_count = await self._save_opportunities(all_opportunities)
+                saved_by_source = await self._insert_opportunities(all_opportunities)
+                saved_count = sum(saved_by_source.values())
                 bot.opportunities_found += saved_count
                 
                 # Award bot for successful finds
@@ -585,57 +691,123 @@ class BotManager:
                 
                 logger.info(f"Bot {bot.bot_id} found {saved_count} new opportunities")
             
+            await bot.commit_fetches(targets)
+            
+            # Learn how often each target changes and reschedule it
+            for target in targets:
+                self.scheduler.record(target, bot.target_changed(target), saved_by_source[target.name])
+            await self.scheduler.persist(targets)
+            
         except Exception as e:
             logger.error(f"Error in bot cycle for {bot.bot_id}: {e}")
             bot.status = BotStatus.ERROR
     
-    async def _save_opportunities(self, opportunities: List[Dict[str, Any]]) -> int:
-        """Save opportunities to database, avoiding duplicates"""
-        saved_count = 0
+    async def _search_target(self, bot: FundingBot, target: SearchTarget) -> List[Dict[str, Any]]:
+        """Search one target under its host's rate limit and the global fetch cap"""
+        await self.rate_limiter.acquire(target.url, target.rate_limit)
+        
+        async with self.fetch_semaphore:
+            return await bot.search_target(target)
+    
+    async def scrape_target(self, bot_id: str, target: SearchTarget, query: Optional[str] = None,
+                            session: Optional[aiohttp.ClientSession] = None) -> Dict[str, Any]:
+        """Fetch, parse and save a single target outside the continuous loop"""
+        bot = FundingBot(bot_id, target.country, [target])
+        if session:
+            bot.use_session(session)
+        else:
+            await bot.start_session()
+        
+        try:
+            opportunities = await bot.search_target(target)
+            saved_count = sum((await self._insert_opportunities(opportunities)).values()) if opportunities else 0
+            await bot.commit_fetches([target])
+        finally:
+            await bot.close_session()
+        
+        if saved_count > 0:
+            await self._award_bot(bot, saved_count)
+        
+        if query:
+            terms = query.lower().split()
+            opportunities = [
+                opp for opp in opportunities
+                if all(term in f"{opp['title']} {opp.get('description') or ''}".lower() for term in terms)
+            ]
+        
+        logger.info(f"Scraped {target.name}: {len(opportunities)} found, {saved_count} new")
+        
+        return {
+            'target': target.name,
+            'country': target.country,
+            'found': len(opportunities),
+            'saved': saved_count,
+            'errors': bot.errors
+        }
+    
+    def _opportunity_row(self, opp_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the donor_opportunities row for a scraped opportunity"""
+        # Create hash for duplicate detection
+        content_hash = hashlib.md5(
+            f"{opp_data['title']}{opp_data['source_name']}".encode()
+        ).hexdigest()
+        
+        return {
+            'title': opp_data['title'],
+            'description': opp_data['description'],
+            'deadline': opp_data.get('deadline'),
+            'amount_min': opp_data.get('amount_min'),
+            'amount_max': opp_data.get('amount_max'),
+            'currency': opp_data.get('currency', 'USD'),
+            'source_url': opp_data['source_url'],
+            'source_name': opp_data['source_name'],
+            'country': opp_data['country'],
+            'keywords': opp_data.get('keywords'),
+            'focus_areas': opp_data.get('focus_areas'),
+            'content_hash': content_hash,
+            'scraped_at': opp_data['scraped_at'],
+            'is_verified': opp_data['is_verified'],
+            **build_near_duplicate_fields(opp_data['title'], opp_data['description'])
+        }
+    
+    async def _insert_opportunities(self, opportunities: List[Dict[str, Any]]) -> Counter:
+        """Insert new opportunities and count them per source.
+        
+        Rows are hashed client-side and inserted in chunks with
+        ON CONFLICT (content_hash) DO NOTHING, so only genuinely new rows
+        come back from RETURNING.
+        """
+        rows: Dict[str, Dict[str, Any]] = {}
+        
+        for opp_data in opportunities:
+            try:
+                row = self._opportunity_row(opp_data)
+                rows.setdefault(row['content_hash'], row)  # Skip duplicates within the batch
+            except Exception as e:
+                logger.error(f"Error preparing opportunity: {e}")
+        
+        saved_by_source = Counter()
+        if not rows:
+            return saved_by_source
+        
+        pending = list(rows.values())
         
         async with get_db_session() as session:
-            for opp_data in opportunities:
-                try:
-                    # Create hash for duplicate detection
-                    content_hash = hashlib.md5(
-                        f"{opp_data['title']}{opp_data['source_name']}".encode()
-                    ).hexdigest()
-                    
-                    # Check if already exists
-                    existing = await session.execute(
-                        select(DonorOpportunity).where(
-                            DonorOpportunity.content_hash == content_hash
-                        )
-                    )
-                    
-                    if existing.scalar_one_or_none():
-                        continue  # Skip duplicate
-                    
-                    # Create new opportunity
-                    opportunity = DonorOpportunity(
-                        title=opp_data['title'],
-                        description=opp_data['description'],
-                        deadline=opp_data.get('deadline'),
-                        amount_min=opp_data.get('amount_min'),
-                        amount_max=opp_data.get('amount_max'),
-                        currency=opp_data.get('currency', 'USD'),
-                        source_url=opp_data['source_url'],
-                        source_name=opp_data['source_name'],
-                        country=opp_data['country'],
-                        content_hash=content_hash,
-                        scraped_at=opp_data['scraped_at'],
-                        is_verified=opp_data['is_verified']
-                    )
-                    
-                    session.add(opportunity)
-                    saved_count += 1
-                    
-                except Exception as e:
-                    logger.error(f"Error saving opportunity: {e}")
+            for start in range(0, len(pending), SAVE_CHUNK_SIZE):
+                chunk = pending[start:start + SAVE_CHUNK_SIZE]
+                
+                result = await session.execute(
+                    pg_insert(DonorOpportunity)
+                    .values(chunk)
+                    .on_conflict_do_nothing(index_elements=[DonorOpportunity.content_hash])
+                    .returning(DonorOpportunity.source_name)
+                )
+                
+                saved_by_source.update(source_name for (source_name,) in result.all())
             
             await session.commit()
         
-        return saved_count
+        return saved_by_source
     
     async def _award_bot(self, bot: FundingBot, opportunities_found: int):
         """Award bot for successful searches"""
@@ -694,11 +866,23 @@ class BotManager:
                 'opportunities_found': bot.opportunities_found,
                 'last_run': bot.last_run.isoformat() if bot.last_run else None,
                 'errors': len(bot.errors),
-                'targets_count': len(bot.targets)
+                'targets_count': len(bot.targets),
+                'targets': self.scheduler.get_statistics(bot.targets)
             }
         
         return stats
     
+    async def get_status(self) -> Dict[str, Any]:
+        """Snapshot published to the worker lease for the API to read"""
+        return {
+            'bots': await self.get_bot_statistics(),
+            'queue_length': len(self.scrapingQueue),
+            'is_scraping_active': self.isScrapingActive,
+            'last_scraping_run': self.lastScrapingRun.isoformat() if self.lastScrapingRun else None,
+            'extraction_pool': extraction_pool.get_statistics(),
+            'page_cache': page_cache.get_statistics()
+        }
+    
     async def stop(self):
         """Stop all bots"""
         self.running = False
@@ -706,6 +890,7 @@ class BotManager:
         for bot in self.bots.values():
             await bot.close_session()
         
+        extraction_pool.shutdown()
         logger.info("All bots stopped")
 
 # Global bot manager instance
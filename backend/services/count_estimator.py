@@ -0,0 +1,95 @@
+import os
+import json
+import time
+import logging
+from typing import Any, Dict, Hashable, Optional, Tuple
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+logger = logging.getLogger(__name__)
+
+# Listings whose estimated size is above this threshold report an estimate
+# instead of paying for an exact count on every page
+EXACT_COUNT_THRESHOLD = int(os.getenv('SEARCH_EXACT_COUNT_THRESHOLD', '10000'))
+COUNT_CACHE_TTL = int(os.getenv('SEARCH_COUNT_CACHE_TTL', '300'))  # seconds
+COUNT_CACHE_SIZE = 1024
+
+class Explain(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) of a statement, keeping its bound parameters"""
+    inherit_cache = True
+
+    def __init__(self, statement):
+        self.statement = statement
+
+@compiles(Explain, 'postgresql')
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+class CountEstimator:
+    """Decides per filter signature whether a listing needs an exact count.
+
+    Cardinalities are remembered per signature for a short TTL. On a cache
+    miss the planner's row estimate is used; only signatures estimated below
+    the threshold are counted exactly (by the caller, via a window count).
+    """
+
+    def __init__(self, threshold: int = EXACT_COUNT_THRESHOLD, ttl: int = COUNT_CACHE_TTL):
+        self.threshold = threshold
+        self.ttl = ttl
+        self._cache: Dict[Hashable, Tuple[int, float]] = {}
+
+    async def estimate(self, session: AsyncSession, stmt, signature: Hashable) -> Optional[int]:
+        """Return an estimated total for stmt, or None if it should be counted exactly"""
+        cached = self.cached(signature)
+        if cached is not None:
+            return cached if cached >= self.threshold else None
+
+        try:
+            planned_rows = await self._planner_rows(session, stmt)
+        except Exception as e:
+            logger.warning(f"Planner row estimate failed, falling back to exact count: {e}")
+            return None
+
+        if planned_rows >= self.threshold:
+            self.record(signature, planned_rows)
+            return planned_rows
+        return None
+
+    def cached(self, signature: Hashable) -> Optional[int]:
+        """Return the remembered cardinality of a signature if still fresh"""
+        cached = self._cache.get(signature)
+        if cached and time.monotonic() - cached[1] < self.ttl:
+            return cached[0]
+        return None
+
+    def record(self, signature: Hashable, count: int):
+        """Remember the cardinality of a filter signature"""
+        if signature not in self._cache and len(self._cache) >= COUNT_CACHE_SIZE:
+            # Drop the oldest entry (dicts keep insertion order)
+            self._cache.pop(next(iter(self._cache)))
+        self._cache[signature] = (count, time.monotonic())
+
+    def invalidate(self):
+        """Forget all cached cardinalities"""
+        self._cache.clear()
+
+    async def exact_count(self, session: AsyncSession, stmt) -> int:
+        """Count the rows of a filtered statement"""
+        count_stmt = select(func.count()).select_from(stmt.order_by(None).subquery())
+        result = await session.execute(count_stmt)
+        return result.scalar() or 0
+
+    async def _planner_rows(self, session: AsyncSession, stmt) -> int:
+        """Read the planner's row estimate for stmt from EXPLAIN"""
+        # Values stay bound parameters: inlined into text() a colon in a
+        # search term would be re-parsed as a bind name
+        result = await session.execute(Explain(stmt.order_by(None)))
+        plan: Any = result.scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+
+# Global estimator instance
+count_estimator = CountEstimator()
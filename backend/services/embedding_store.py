@@ -0,0 +1,286 @@
+import os
+import asyncio
+import hashlib
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from sqlalchemy import select, update, values, column, table, or_, func, String
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from database.models import DonorOpportunity, EmbeddingCache
+from database.connection import get_db_session
+from services.ai_service import EMBEDDING_MODEL, load_embedding_model
+
+logger = logging.getLogger(__name__)
+
+# Texts encoded per model call in the batch job and on cache misses
+EMBEDDING_BATCH_SIZE = int(os.getenv('EMBEDDING_BATCH_SIZE', '256'))
+# Storage precision; float16 halves the cache and is plenty for cosine ranking
+EMBEDDING_STORAGE_DTYPE = np.dtype(os.getenv('EMBEDDING_STORAGE_DTYPE', 'float16'))
+# Keys per bulk lookup
+FETCH_CHUNK_SIZE = 1000
+# Rows the batch job reads per pass
+JOB_PAGE_SIZE = 2000
+# Characters of the description that go into an opportunity's embedding
+MAX_DESCRIPTION_CHARS = 1000
+
+# donor_calls belongs to the platform app (models.donor.DonorCall); only the
+# columns the embedding job needs are declared here
+donor_calls = table(
+    'donor_calls',
+    column('id', UUID(as_uuid=True)),
+    column('title'),
+    column('description'),
+    column('keywords'),
+    column('eligibility_criteria'),
+    column('updated_at'),
+    column('embedding_hash'),
+)
+
+def join_terms(values: Any) -> str:
+    if not values:
+        return ''
+    if isinstance(values, str):
+        return values
+    return ', '.join(str(value) for value in values if value)
+
+def opportunity_text(title: Optional[str], description: Optional[str], sector: Optional[str],
+                     focus_areas: Any = None, keywords: Any = None) -> str:
+    """Text an opportunity is embedded from"""
+    parts = [title or '', sector or '', join_terms(focus_areas), join_terms(keywords), (description or '')[:MAX_DESCRIPTION_CHARS]]
+    return '. '.join(part for part in parts if part)
+
+def content_key(text: str, model: str = EMBEDDING_MODEL) -> str:
+    """Cache key for the embedding of text under model"""
+    return hashlib.sha1(f"{model}\0{text}".encode()).hexdigest()
+
+def donor_call_text(title: Optional[str], description: Optional[str], keywords: Any = None,
+                    eligibility_criteria: Optional[str] = None) -> str:
+    """Text a donor call is embedded from, shaped like opportunity_text"""
+    return opportunity_text(title, '. '.join(part for part in (description, eligibility_criteria) if part),
+                            None, None, keywords)
+
+def pack_vector(vector: np.ndarray) -> bytes:
+    return np.asarray(vector, dtype=EMBEDDING_STORAGE_DTYPE).tobytes()
+
+def unpack_vector(data: bytes, dimensions: int) -> np.ndarray:
+    """float32 vector from stored bytes, whichever precision it was stored in"""
+    dtype = np.float16 if len(data) == dimensions * 2 else np.float32
+    return np.frombuffer(data, dtype=dtype).astype(np.float32)
+
+class EmbeddingStore:
+    """Persistent embedding cache keyed by content hash.
+
+    Vectors live in embedding_cache under sha1(model, text), so unchanged
+    text is never re-encoded, whichever opportunity or donor call it came
+    from and whichever process asks. Misses are encoded in large batches
+    off the event loop and written back with ON CONFLICT DO NOTHING.
+    """
+
+    def __init__(self, batch_size: int = EMBEDDING_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.model = None
+        self.hits = 0
+        self.encoded = 0
+
+    @property
+    def available(self) -> bool:
+        if self.model is None:
+            self.model = load_embedding_model()
+        return self.model is not None
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        """Normalised float32 embeddings, bypassing the cache (blocking; call off the event loop)"""
+        embeddings = self.model.encode(
+            list(texts), batch_size=min(self.batch_size, 64), normalize_embeddings=True, show_progress_bar=False
+        )
+        return np.asarray(embeddings, dtype=np.float32)
+
+    async def fetch(self, keys: Iterable[str]) -> Dict[str, np.ndarray]:
+        """Stored vectors for content keys; missing keys are left out"""
+        keys = list(dict.fromkeys(keys))
+        vectors = {}
+
+        async with get_db_session() as session:
+            for start in range(0, len(keys), FETCH_CHUNK_SIZE):
+                result = await session.execute(
+                    select(EmbeddingCache.content_hash, EmbeddingCache.dimensions, EmbeddingCache.vector)
+                    .where(EmbeddingCache.content_hash.in_(keys[start:start + FETCH_CHUNK_SIZE]))
+                )
+                for key, dimensions, data in result.all():
+                    vectors[key] = unpack_vector(data, dimensions)
+
+        self.hits += len(vectors)
+        return vectors
+
+    async def embed(self, texts: Sequence[str]) -> Tuple[List[str], np.ndarray]:
+        """Content keys and normalised float32 vectors for texts, encoding only cache misses"""
+        keys = [content_key(text) for text in texts]
+        vectors = await self.fetch(keys)
+
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors:
+                missing.setdefault(key, text)
+
+        if missing:
+            await self._encode_and_store(missing, vectors)
+
+        if not keys:
+            return keys, np.zeros((0, 0), dtype=np.float32)
+        return keys, np.stack([vectors[key] for key in keys])
+
+    async def _encode_and_store(self, missing: Dict[str, str], vectors: Dict[str, np.ndarray]):
+        if not self.available:
+            raise RuntimeError("No embedding model installed (sentence-transformers)")
+
+        items = list(missing.items())
+        for start in range(0, len(items), self.batch_size):
+            batch = items[start:start + self.batch_size]
+            embeddings = await asyncio.to_thread(self.encode, [text for _, text in batch])
+            self.encoded += len(batch)
+
+            rows = []
+            for (key, _), embedding in zip(batch, embeddings):
+                vectors[key] = embedding
+                rows.append({
+                    'content_hash': key,
+                    'model': EMBEDDING_MODEL,
+                    'dimensions': len(embedding),
+                    'vector': pack_vector(embedding)
+                })
+
+            async with get_db_session() as session:
+                await session.execute(
+                    pg_insert(EmbeddingCache).values(rows).on_conflict_do_nothing(
+                        index_elements=[EmbeddingCache.content_hash]
+                    )
+                )
+                await session.commit()
+
+    async def opportunity_vectors(self, opportunity_ids: Iterable[Any]) -> Dict[Any, np.ndarray]:
+        """Vectors of already-embedded opportunities by id, in bulk"""
+        opportunity_ids = list(opportunity_ids)
+        hashes = {}
+
+        async with get_db_session() as session:
+            for start in range(0, len(opportunity_ids), FETCH_CHUNK_SIZE):
+                result = await session.execute(
+                    select(DonorOpportunity.id, DonorOpportunity.embedding_hash).where(
+                        DonorOpportunity.id.in_(opportunity_ids[start:start + FETCH_CHUNK_SIZE]),
+                        DonorOpportunity.embedding_hash.isnot(None)
+                    )
+                )
+                hashes.update(result.all())
+
+        vectors = await self.fetch(hashes.values())
+        return {opp_id: vectors[key] for opp_id, key in hashes.items() if key in vectors}
+
+    async def donor_call_vectors(self, call_ids: Iterable[Any]) -> Dict[Any, np.ndarray]:
+        """Vectors of already-embedded donor calls by id, in bulk"""
+        call_ids = list(call_ids)
+        hashes = {}
+
+        async with get_db_session() as session:
+            for start in range(0, len(call_ids), FETCH_CHUNK_SIZE):
+                result = await session.execute(
+                    select(donor_calls.c.id, donor_calls.c.embedding_hash).where(
+                        donor_calls.c.id.in_(call_ids[start:start + FETCH_CHUNK_SIZE]),
+                        donor_calls.c.embedding_hash.isnot(None)
+                    )
+                )
+                hashes.update(result.all())
+
+        vectors = await self.fetch(hashes.values())
+        return {call_id: vectors[key] for call_id, key in hashes.items() if key in vectors}
+
+    async def embed_pending_opportunities(self, since: Optional[datetime] = None) -> int:
+        """Embed opportunities never embedded, or changed since `since`; returns rows re-pointed"""
+        changed = DonorOpportunity.embedding_hash.is_(None)
+        if since is not None:
+            changed = or_(changed, func.coalesce(DonorOpportunity.updated_at, DonorOpportunity.created_at) > since)
+
+        stmt = select(
+            DonorOpportunity.id, DonorOpportunity.embedding_hash, DonorOpportunity.title,
+            DonorOpportunity.description, DonorOpportunity.sector, DonorOpportunity.focus_areas,
+            DonorOpportunity.keywords
+        ).where(changed)
+
+        def text(row):
+            return opportunity_text(row.title, row.description, row.sector, row.focus_areas, row.keywords)
+
+        return await self._embed_pending(DonorOpportunity.__table__, stmt, text)
+
+    async def embed_pending_donor_calls(self, since: Optional[datetime] = None) -> int:
+        """Embed donor calls never embedded, or changed since `since`; returns rows re-pointed"""
+        changed = donor_calls.c.embedding_hash.is_(None)
+        if since is not None:
+            changed = or_(changed, donor_calls.c.updated_at > since)
+
+        stmt = select(
+            donor_calls.c.id, donor_calls.c.embedding_hash, donor_calls.c.title, donor_calls.c.description,
+            donor_calls.c.keywords, donor_calls.c.eligibility_criteria
+        ).where(changed)
+
+        def text(row):
+            return donor_call_text(row.title, row.description, row.keywords, row.eligibility_criteria)
+
+        return await self._embed_pending(donor_calls, stmt, text)
+
+    async def _embed_pending(self, target, stmt, text_of) -> int:
+        """Page through stmt by id, embed texts whose key changed and point rows at them"""
+        repointed = 0
+        last_id = None
+
+        while True:
+            page = stmt.order_by(target.c.id).limit(JOB_PAGE_SIZE)
+            if last_id is not None:
+                page = page.where(target.c.id > last_id)
+
+            async with get_db_session() as session:
+                rows = (await session.execute(page)).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+
+            stale = []
+            for row in rows:
+                text = text_of(row)
+                if content_key(text) != row.embedding_hash:
+                    stale.append((row.id, text))
+
+            if stale:
+                keys, _ = await self.embed([text for _, text in stale])
+                await self._point_at(target, [(row_id, key) for (row_id, _), key in zip(stale, keys)])
+                repointed += len(stale)
+
+            if len(rows) < JOB_PAGE_SIZE:
+                break
+
+        return repointed
+
+    async def _point_at(self, target, pairs: List[Tuple[Any, str]]):
+        """Set embedding_hash for many rows in one UPDATE ... FROM (VALUES ...)"""
+        hashes = values(
+            column('id', target.c.id.type), column('embedding_hash', String(40)), name='hashes'
+        ).data(pairs)
+        stmt = update(target).where(target.c.id == hashes.c.id).values(embedding_hash=hashes.c.embedding_hash)
+        if target is DonorOpportunity.__table__:
+            # Pointing at a vector isn't a content change; keep updated_at as it was
+            stmt = stmt.values(updated_at=target.c.updated_at)
+
+        async with get_db_session() as session:
+            await session.execute(stmt)
+            await session.commit()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        return {
+            'model': EMBEDDING_MODEL,
+            'storage_dtype': EMBEDDING_STORAGE_DTYPE.name,
+            'cache_hits': self.hits,
+            'encoded': self.encoded,
+        }
+
+# Global embedding store instance
+embedding_store = EmbeddingStore()
@@ -0,0 +1,85 @@
+import os
+import time
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Worker processes for HTML extraction; 0 runs extraction inline on the event loop
+EXTRACTION_WORKERS = int(os.getenv('EXTRACTION_WORKERS', str(min(4, os.cpu_count() or 1))))
+
+class ExtractionPool:
+    """Runs CPU-bound parsing in a bounded pool of worker processes.
+
+    Jobs must be module-level functions taking and returning picklable
+    values (raw HTML, target config, plain dicts). Workers are started with
+    "spawn" so they don't inherit the parent's event loop, sockets or
+    connection pool.
+    """
+
+    def __init__(self, workers: int = EXTRACTION_WORKERS):
+        self.workers = workers
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.pending = 0
+        self.completed = 0
+        self.failed = 0
+        self.total_seconds = 0.0
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+            logger.info(f"Started extraction pool with {self.workers} workers")
+        return self.executor
+
+    async def run(self, func: Callable, *args) -> Any:
+        """Run func(*args) in a worker process without blocking the event loop"""
+        # Daemonic processes (e.g. Celery prefork children) can't start their own
+        # workers; they already run one job per process, so extract inline there
+        if self.workers <= 0 or multiprocessing.current_process().daemon:
+            return func(*args)
+
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        self.pending += 1
+
+        try:
+            result = await loop.run_in_executor(self._executor(), func, *args)
+            self.completed += 1
+            return result
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM on a huge page); replace the pool for the next job
+            logger.error("Extraction pool broken, restarting it")
+            self.failed += 1
+            self.executor = None
+            raise
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.pending -= 1
+            self.total_seconds += time.perf_counter() - started
+
+    def shutdown(self):
+        """Stop worker processes, abandoning queued jobs"""
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    def get_statistics(self) -> Dict[str, Any]:
+        finished = self.completed + self.failed
+        return {
+            'workers': self.workers,
+            'pending': self.pending,
+            'completed': self.completed,
+            'failed': self.failed,
+            'avg_job_ms': round(self.total_seconds / finished * 1000, 2) if finished else 0.0,
+        }
+
+extraction_pool = ExtractionPool()
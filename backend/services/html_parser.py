@@ -0,0 +1,71 @@
+import os
+import logging
+from functools import lru_cache
+from typing import Iterator, List, Optional, Sequence
+import soupsieve
+from bs4 import BeautifulSoup
+
+logger = logging.getLogger(__name__)
+
+def _default_backend() -> str:
+    """Tree builder to use: HTML_PARSER if set, else lxml when installed"""
+    configured = os.getenv('HTML_PARSER')
+    if configured:
+        return configured
+
+    try:
+        import lxml  # noqa: F401
+        return 'lxml'
+    except ImportError:
+        return 'html.parser'
+
+# BeautifulSoup tree builder used for all scraped pages
+PARSER_BACKEND = _default_backend()
+
+def parse_html(html: str, backend: Optional[str] = None) -> BeautifulSoup:
+    """Parse an HTML document with the configured backend"""
+    return BeautifulSoup(html, backend or PARSER_BACKEND)
+
+@lru_cache(maxsize=512)
+def compile_selector(selector: str):
+    """Compile a CSS selector once; later calls reuse the compiled pattern"""
+    return soupsieve.compile(selector)
+
+class SelectorSet:
+    """Ordered CSS selectors compiled up front and tried in turn.
+
+    soup.select() re-parses the selector string on every call, which adds up
+    when the same fallbacks are tried against every container on a page.
+    """
+
+    def __init__(self, selectors: Sequence[str]):
+        self.selectors = tuple(selector for selector in selectors if selector)
+        self.patterns = tuple(compile_selector(selector) for selector in self.selectors)
+
+    def with_override(self, selector: Optional[str]) -> 'SelectorSet':
+        """Copy of this set that tries selector before the defaults"""
+        if not selector or selector in self.selectors:
+            return self
+        return SelectorSet((selector,) + self.selectors)
+
+    def select(self, node) -> List:
+        """All matches of the first selector that matches anything"""
+        for pattern in self.patterns:
+            found = pattern.select(node)
+            if found:
+                return found
+        return []
+
+    def matches(self, node) -> Iterator:
+        """First match of each selector, in selector order"""
+        for pattern in self.patterns:
+            elem = pattern.select_one(node)
+            if elem is not None:
+                yield elem
+
+    def select_one(self, node):
+        """First match of the first selector that matches"""
+        return next(self.matches(node), None)
+
+    def __bool__(self) -> bool:
+        return bool(self.patterns)
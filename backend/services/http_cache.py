@@ -0,0 +1,163 @@
+import json
+import hashlib
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from datetime import datetime
+from typing import Any, Dict, Optional
+import aiohttp
+from services.page_cache import PageCache, page_cache
+
+logger = logging.getLogger(__name__)
+
+# URLs (per selector variant) whose validators are remembered; least recently used are forgotten
+MAX_TRACKED_URLS = 5000
+
+def fetch_key(url: str, variant: Any = None) -> str:
+    """Key for what was extracted from url; variant (e.g. the selectors used) separates parses of one page"""
+    if not variant:
+        return url
+    digest = hashlib.sha1(json.dumps(variant, sort_keys=True, default=str).encode()).hexdigest()[:12]
+    return f"{url}#{digest}"
+
+@dataclass
+class UrlValidators:
+    """What we know about the last response seen for a URL"""
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    body_hash: Optional[str] = None
+    last_checked: Optional[datetime] = None
+    last_changed: Optional[datetime] = None
+
+@dataclass
+class FetchResult:
+    status: int
+    text: Optional[str] = None
+    not_modified: bool = False  # 304, or body identical to the last committed fetch
+    from_cache: bool = False  # text came from the shared page cache after a 304
+    key: Optional[str] = None
+    url: Optional[str] = None
+    validators: Optional[UrlValidators] = None  # to store with ConditionalFetcher.commit once processed
+
+class ConditionalFetcher:
+    """GET with If-None-Match / If-Modified-Since and a body-hash short-circuit.
+
+    When the server answers 304, or returns a body whose hash matches the
+    last committed fetch, the result is flagged not_modified and carries no
+    text so callers can skip parsing entirely. The page cache's copy is
+    then marked as just fetched, so its age reflects the last check.
+
+    A changed page's validators are only stored once the caller calls
+    commit() after parsing and saving it, so a page whose processing failed
+    is downloaded and parsed again next time. Committed pages are also
+    written to the shared page cache. For a URL this fetcher hasn't seen
+    yet (e.g. in a freshly started worker), the cached copy's validators
+    are sent instead, and on 304 its body is returned as the page text
+    without downloading it again.
+    """
+
+    def __init__(self, cache: Optional[PageCache] = page_cache, max_urls: int = MAX_TRACKED_URLS):
+        self.validators: "OrderedDict[str, UrlValidators]" = OrderedDict()
+        self.cache = cache
+        self.max_urls = max_urls
+
+    def _get(self, key: str) -> Optional[UrlValidators]:
+        validators = self.validators.get(key)
+        if validators is not None:
+            self.validators.move_to_end(key)
+        return validators
+
+    def _store(self, key: str, validators: UrlValidators):
+        self.validators[key] = validators
+        self.validators.move_to_end(key)
+        while len(self.validators) > self.max_urls:
+            self.validators.popitem(last=False)
+
+    def conditional_headers(self, key: str) -> Dict[str, str]:
+        """Validator headers to send for a fetch key, if any"""
+        validators = self._get(key)
+        headers = {}
+
+        if validators:
+            if validators.etag:
+                headers['If-None-Match'] = validators.etag
+            if validators.last_modified:
+                headers['If-Modified-Since'] = validators.last_modified
+
+        return headers
+
+    def validators_for(self, url: str, variant: Any = None) -> Optional[UrlValidators]:
+        """Committed validators for url, if any"""
+        return self.validators.get(fetch_key(url, variant))
+
+    async def fetch(self, session: aiohttp.ClientSession, url: str,
+                    headers: Optional[Dict[str, str]] = None, variant: Any = None) -> FetchResult:
+        """Fetch url, returning its text only if it changed since the last committed fetch"""
+        key = fetch_key(url, variant)
+        request_headers = dict(headers or {})
+        request_headers.update(self.conditional_headers(key))
+
+        cached = None
+        if key not in self.validators and self.cache is not None:
+            cached = await self.cache.get(url)
+            if cached:
+                request_headers.update(cached.conditional_headers())
+
+        async with session.get(url, headers=request_headers) as response:
+            checked_at = datetime.utcnow()
+            validators = self.validators.get(key)
+            if validators is not None:
+                validators.last_checked = checked_at
+
+            if response.status == 304 and cached:
+                text = await self.cache.text(cached)
+                if text is None:
+                    # Evicted since the header was read; fetch it unconditionally
+                    return await self.fetch(session, url, headers, variant)
+
+                return FetchResult(
+                    status=200, text=text, from_cache=True, key=key, url=url,
+                    validators=UrlValidators(cached.etag, cached.last_modified, cached.body_hash,
+                                             checked_at, checked_at)
+                )
+
+            if response.status == 304:
+                if self.cache is not None:
+                    await self.cache.refresh(url)
+                return FetchResult(status=304, not_modified=True, key=key, url=url)
+
+            if response.status != 200:
+                return FetchResult(status=response.status, key=key, url=url)
+
+            body = await response.read()
+            body_hash = hashlib.sha1(body).hexdigest()
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+
+            if validators is not None and body_hash == validators.body_hash:
+                # Same body as the one already processed; newer validators are safe to keep
+                validators.etag = etag
+                validators.last_modified = last_modified
+                if self.cache is not None:
+                    await self.cache.refresh(url, etag, last_modified)
+                return FetchResult(status=200, not_modified=True, key=key, url=url)
+
+            return FetchResult(
+                status=200, text=await response.text(), key=key, url=url,
+                validators=UrlValidators(etag, last_modified, body_hash, checked_at, checked_at)
+            )
+
+    async def commit(self, fetched: FetchResult):
+        """Record a fetched page as processed, so unchanged copies of it are skipped from now on"""
+        if fetched.validators is None or fetched.key is None:
+            return
+
+        validators = replace(fetched.validators)
+        self._store(fetched.key, validators)
+        if self.cache is not None:
+            await self.cache.put(fetched.url, fetched.text, validators.etag, validators.last_modified,
+                                 validators.body_hash)
+
+    def forget(self, url: str, variant: Any = None):
+        """Drop stored validators so the next fetch is unconditional"""
+        self.validators.pop(fetch_key(url, variant), None)
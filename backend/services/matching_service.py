@@ -1,22 +1,30 @@
+import os
 import logging
 import asyncio
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 import uuid
 import json
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, func, or_
 from database.models import DonorOpportunity
 from database.connection import get_db_session
+from services.opportunity_index import opportunity_index, profile_text
 
 logger = logging.getLogger(__name__)
 
+# Share of the final match score coming from embedding similarity; the rest
+# comes from the rule-based factors
+SEMANTIC_WEIGHT = float(os.getenv('MATCH_SEMANTIC_WEIGHT', '0.6'))
+# Candidates retrieved by similarity for every result returned, then re-ranked
+RERANK_FACTOR = 5
+MIN_CANDIDATES = 100
+
 class MatchingService:
     """Service for matching organizations with relevant funding opportunities"""
     
-    def __init__(self):
-        # Initialize any required resources
-        pass
+    def __init__(self, index=opportunity_index):
+        self.index = index
     
     async def find_matching_opportunities(
         self, 
@@ -24,37 +32,77 @@ class MatchingService:
         filters: Dict[str, Any] = None,
         limit: int = 20
     ) -> List[Dict[str, Any]]:
-        """Find donor opportunities that match the organization's profile"""
+        """Find donor opportunities that match the organization's profile.
+        
+        Retrieves the closest opportunities to the profile by embedding
+        similarity, then re-ranks them with the rule-based factors. Falls
+        back to rules alone when no embedding model is installed or the
+        index is still loading.
+        """
+        filters = filters or {}
+        
         try:
-            # Get database session
-            async with get_db_session() as session:
-                # Build base query
-                query = select(DonorOpportunity).where(
-                    DonorOpportunity.is_active == True
-                )
-                
-                # Apply filters if provided
-                if filters:
-                    query = self._apply_filters(query, filters)
-                
-                # Apply organization matching criteria
-                query = self._apply_organization_matching(query, organization_profile)
-                
-                # Limit results
-                query = query.limit(limit)
-                
-                # Execute query
-                result = await session.execute(query)
-                opportunities = result.scalars().all()
-                
-                # Calculate match scores and format results
-                return await self._format_matches(opportunities, organization_profile)
+            if self.index.available and self.index.ready():
+                return await self._semantic_matches(organization_profile, filters, limit)
+            return await self._rule_matches(organization_profile, filters, limit)
                 
         except Exception as e:
             logger.error(f"Error finding matching opportunities: {e}")
             # Return empty list on error
             return []
     
+    async def _semantic_matches(self, organization_profile: Dict[str, Any], filters: Dict[str, Any],
+                                limit: int) -> List[Dict[str, Any]]:
+        """Top-k cosine retrieval over the opportunity index, re-ranked by rules"""
+        countries = None
+        if organization_profile.get('country'):
+            # Include both exact country matches and 'Global' opportunities
+            countries = [organization_profile['country'], 'Global']
+        
+        profile_embedding = await self.index.encode_query(profile_text(organization_profile))
+        mask = self.index.filter_mask(filters, countries)
+        candidates = self.index.top_k(profile_embedding, max(limit * RERANK_FACTOR, MIN_CANDIDATES), mask)
+        
+        if not candidates:
+            return []
+        
+        similarities = dict(candidates)
+        async with get_db_session() as session:
+            # Re-check the filters in SQL: rows deleted or changed since the
+            # last index refresh drop out here
+            query = select(DonorOpportunity).where(
+                DonorOpportunity.id.in_(list(similarities)),
+                DonorOpportunity.is_active == True
+            )
+            query = self._apply_filters(query, filters)
+            result = await session.execute(query)
+            opportunities = result.scalars().all()
+        
+        return self._format_matches(opportunities, organization_profile, similarities)[:limit]
+    
+    async def _rule_matches(self, organization_profile: Dict[str, Any], filters: Dict[str, Any],
+                            limit: int) -> List[Dict[str, Any]]:
+        """Rule-based matching over a filtered candidate set"""
+        async with get_db_session() as session:
+            # Build base query
+            query = select(DonorOpportunity).where(
+                DonorOpportunity.is_active == True
+            )
+            
+            # Apply filters if provided
+            query = self._apply_filters(query, filters)
+            
+            # Apply organization matching criteria
+            query = self._apply_organization_matching(query, organization_profile)
+            
+            # Score a wider candidate set than is returned
+            query = query.order_by(DonorOpportunity.scraped_at.desc()).limit(max(limit * RERANK_FACTOR, MIN_CANDIDATES))
+            
+            result = await session.execute(query)
+            opportunities = result.scalars().all()
+        
+        return self._format_matches(opportunities, organization_profile)[:limit]
+    
     def _apply_filters(self, query, filters: Dict[str, Any]):
         """Apply filters to the query"""
         if filters.get('country'):
@@ -98,13 +146,19 @@ class MatchingService:
         
         return query
     
-    async def _format_matches(self, opportunities: List[DonorOpportunity], organization_profile: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def _format_matches(self, opportunities: List[DonorOpportunity], organization_profile: Dict[str, Any],
+                        similarities: Optional[Dict[Any, float]] = None) -> List[Dict[str, Any]]:
         """Format opportunities with match scores and details"""
         results = []
         
         for opp in opportunities:
             # Calculate match score
-            match_score = self._calculate_match_score(opp, organization_profile)
+            rule_score = self._calculate_match_score(opp, organization_profile)
+            similarity = similarities.get(opp.id) if similarities else None
+            if similarity is None:
+                match_score = rule_score
+            else:
+                match_score = SEMANTIC_WEIGHT * max(0.0, similarity) * 100 + (1 - SEMANTIC_WEIGHT) * rule_score
             
             # Format opportunity data
             formatted_opp = {
@@ -121,14 +175,15 @@ class MatchingService:
                 "source_url": opp.source_url,
                 "is_verified": opp.is_verified,
                 "verification_score": opp.verification_score,
-                "match_score": match_score,
-                "match_reasons": self._get_match_reasons(opp, organization_profile, match_score)
+                "match_score": round(match_score, 2),
+                "semantic_similarity": round(similarity, 4) if similarity is not None else None,
+                "match_reasons": self._get_match_reasons(opp, organization_profile, match_score, similarity)
             }
             
             results.append(formatted_opp)
         
-        # Sort by match score (highest first)
-        results.sort(key=lambda x: x["match_score"], reverse=True)
+        # Sort by match score (highest first); ties broken by id so results are stable
+        results.sort(key=lambda x: (-x["match_score"], x["id"]))
         
         return results
     
@@ -168,7 +223,7 @@ class MatchingService:
         # Amount match
         if organization_profile.get('typical_budget') and opportunity.amount_max:
             org_budget = organization_profile['typical_budget']
-            if opportunity.amount_min <= org_budget <= opportunity.amount_max:
+            if (opportunity.amount_min or 0) <= org_budget <= opportunity.amount_max:
                 score += weights["amount"]
             elif opportunity.amount_max >= org_budget * 0.8:
                 score += weights["amount"] * 0.5
@@ -177,17 +232,18 @@ class MatchingService:
         if opportunity.is_verified:
             score += weights["verification"] * min(1.0, opportunity.verification_score)
         
-        # Add some randomness for variety (±5%)
-        import random
-        score += random.uniform(-0.05, 0.05)
-        
         # Ensure score is between 0 and 1
         return max(0.0, min(1.0, score)) * 100
     
-    def _get_match_reasons(self, opportunity: DonorOpportunity, organization_profile: Dict[str, Any], match_score: float) -> List[str]:
+    def _get_match_reasons(self, opportunity: DonorOpportunity, organization_profile: Dict[str, Any], match_score: float,
+                           similarity: Optional[float] = None) -> List[str]:
         """Generate reasons for the match"""
         reasons = []
         
+        # Semantic match
+        if similarity is not None and similarity >= 0.5:
+            reasons.append("Closely related to your mission and focus areas")
+        
         # Sector match
         if organization_profile.get('sector') and opportunity.sector:
             if organization_profile['sector'].lower() in opportunity.sector.lower():
@@ -212,7 +268,7 @@ class MatchingService:
         # Amount match
         if organization_profile.get('typical_budget') and opportunity.amount_max:
             org_budget = organization_profile['typical_budget']
-            if opportunity.amount_min <= org_budget <= opportunity.amount_max:
+            if (opportunity.amount_min or 0) <= org_budget <= opportunity.amount_max:
                 reasons.append(f"Budget range match: {opportunity.amount_min}-{opportunity.amount_max} {opportunity.currency}")
         
         # High match score
@@ -0,0 +1,178 @@
+import os
+import re
+import zlib
+import hashlib
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from sqlalchemy import select, update, values, column, BigInteger, LargeBinary
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.models import DonorOpportunity
+
+logger = logging.getLogger(__name__)
+
+# MinHash permutations per signature, split into LSH_BANDS bands of
+# NUM_PERM // LSH_BANDS rows. 32 bands of 4 rows put the candidate
+# threshold near Jaccard 0.42, below NEAR_DUPLICATE_THRESHOLD, so true
+# near-duplicates are almost always found.
+NUM_PERM = 128
+LSH_BANDS = 32
+ROWS_PER_BAND = NUM_PERM // LSH_BANDS
+
+# Estimated Jaccard similarity of title+description shingles at which two
+# opportunities count as near-duplicates
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv('NEAR_DUPLICATE_THRESHOLD', '0.5'))
+
+# Most candidate rows read per lookup; a band shared by very many rows
+# (boilerplate-only text) must not turn one lookup into a table scan
+NEAR_DUPLICATE_MAX_CANDIDATES = int(os.getenv('NEAR_DUPLICATE_MAX_CANDIDATES', '500'))
+
+# Words per shingle
+SHINGLE_SIZE = 3
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+# Fixed seed: signatures are stored, so the permutations must never change
+_permutations = np.random.RandomState(1).randint(
+    1, np.iinfo(np.int64).max, size=(2, NUM_PERM), dtype=np.int64
+).astype(np.uint64)
+_PERM_A, _PERM_B = _permutations[0] % _MERSENNE_PRIME, _permutations[1] % _MERSENNE_PRIME
+
+_WORD = re.compile(r'\w+')
+
+def shingles(title: Optional[str], description: Optional[str]) -> set:
+    """Word n-grams of the normalised title and description"""
+    words = _WORD.findall(f"{title or ''} {description or ''}".lower())
+    if len(words) < SHINGLE_SIZE:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+def minhash(title: Optional[str], description: Optional[str]) -> np.ndarray:
+    """NUM_PERM-value MinHash signature of an opportunity's text"""
+    hashed = np.fromiter(
+        (zlib.crc32(shingle.encode()) for shingle in shingles(title, description)),
+        dtype=np.uint64
+    )
+    if not hashed.size:
+        return np.full(NUM_PERM, _MAX_HASH, dtype=np.uint32)
+
+    # (a * x + b) mod p, one row per shingle; uint64 wrap-around is intended
+    with np.errstate(over='ignore'):
+        permuted = (np.outer(hashed, _PERM_A) + _PERM_B) % _MERSENNE_PRIME & _MAX_HASH
+    return permuted.min(axis=0).astype(np.uint32)
+
+def is_empty_signature(signature: np.ndarray) -> bool:
+    """Whether a signature comes from text with no words, which says nothing about similarity"""
+    return bool(np.all(signature == _MAX_HASH))
+
+def lsh_buckets(signature: np.ndarray) -> List[int]:
+    """One signed 64-bit bucket key per band, for the GIN-indexed lsh_buckets column.
+
+    Empty-text signatures get no buckets, so they never become candidates
+    of each other.
+    """
+    if is_empty_signature(signature):
+        return []
+    return [
+        int.from_bytes(
+            hashlib.blake2b(
+                band.to_bytes(1, 'big') + signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND].tobytes(),
+                digest_size=8
+            ).digest(),
+            'big',
+            signed=True
+        )
+        for band in range(LSH_BANDS)
+    ]
+
+def build_near_duplicate_fields(title: Optional[str], description: Optional[str]) -> Dict[str, Any]:
+    """The minhash and lsh_buckets values stored on a DonorOpportunity row"""
+    signature = minhash(title, description)
+    return {'minhash': signature.tobytes(), 'lsh_buckets': lsh_buckets(signature)}
+
+def signature_similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Estimated Jaccard similarity from two MinHash signatures"""
+    return float(np.count_nonzero(a == b)) / NUM_PERM
+
+def _signature(opportunity: DonorOpportunity) -> np.ndarray:
+    if opportunity.minhash:
+        return np.frombuffer(opportunity.minhash, dtype=np.uint32)
+    return minhash(opportunity.title, opportunity.description)
+
+async def find_near_duplicates(
+    session: AsyncSession,
+    opportunity: DonorOpportunity,
+    threshold: float = NEAR_DUPLICATE_THRESHOLD,
+    same_source: bool = False
+) -> List[Tuple[float, Any]]:
+    """Opportunities whose text is at least threshold-similar, most similar first.
+
+    Candidates come from the lsh_buckets GIN index, so only rows sharing a
+    band with the opportunity are read, at most NEAR_DUPLICATE_MAX_CANDIDATES
+    of them; their stored signatures then give the similarity estimate.
+    Opportunities with no words match nothing. Looks across every source unless same_source.
+    Rows are (id, title, source_name).
+    """
+    signature = _signature(opportunity)
+    if is_empty_signature(signature):
+        return []
+
+    stmt = select(
+        DonorOpportunity.id,
+        DonorOpportunity.title,
+        DonorOpportunity.source_name,
+        DonorOpportunity.minhash
+    ).where(
+        DonorOpportunity.lsh_buckets.overlap(lsh_buckets(signature)),
+        DonorOpportunity.id != opportunity.id,
+        DonorOpportunity.minhash.isnot(None)
+    )
+    if same_source:
+        stmt = stmt.where(DonorOpportunity.source_name == opportunity.source_name)
+    stmt = stmt.limit(NEAR_DUPLICATE_MAX_CANDIDATES)
+
+    result = await session.execute(stmt)
+
+    matches = []
+    for opp_id, title, source_name, other in result.all():
+        other = np.frombuffer(other, dtype=np.uint32)
+        if is_empty_signature(other):
+            continue  # Indexed before empty texts got no buckets
+        similarity = signature_similarity(signature, other)
+        if similarity >= threshold:
+            matches.append((similarity, (opp_id, title, source_name)))
+
+    matches.sort(key=lambda match: match[0], reverse=True)
+    return matches
+
+async def backfill_near_duplicate_index(session: AsyncSession, batch_size: int = 500) -> int:
+    """Index up to batch_size opportunities saved before signatures were stored"""
+    result = await session.execute(
+        select(DonorOpportunity.id, DonorOpportunity.title, DonorOpportunity.description)
+        .where(DonorOpportunity.lsh_buckets.is_(None))
+        .limit(batch_size)
+    )
+    rows = result.all()
+    if not rows:
+        return 0
+
+    data = []
+    for opp_id, title, description in rows:
+        fields = build_near_duplicate_fields(title, description)
+        data.append((opp_id, fields['minhash'], fields['lsh_buckets']))
+
+    signatures = values(
+        column('id', UUID(as_uuid=True)),
+        column('minhash', LargeBinary),
+        column('lsh_buckets', ARRAY(BigInteger)),
+        name='signatures'
+    ).data(data)
+
+    await session.execute(
+        update(DonorOpportunity.__table__)
+        .where(DonorOpportunity.id == signatures.c.id)
+        .values(minhash=signatures.c.minhash, lsh_buckets=signatures.c.lsh_buckets)
+    )
+    return len(rows)
@@ -0,0 +1,302 @@
+import os
+import time
+import asyncio
+import hashlib
+import logging
+from contextlib import suppress
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from sqlalchemy import select, func
+from database.models import DonorOpportunity
+from database.connection import get_db_session
+from services.embedding_store import embedding_store, opportunity_text, join_terms
+
+logger = logging.getLogger(__name__)
+
+# Seconds between checks for new or changed opportunities
+INDEX_REFRESH_INTERVAL = int(os.getenv('OPPORTUNITY_INDEX_REFRESH', '300'))
+# Seconds re-read behind the last refresh; unchanged rows cost no encoding
+WATERMARK_OVERLAP = 120
+# Seconds between sweeps dropping deleted opportunities, which the watermark can't see
+INDEX_SWEEP_INTERVAL = int(os.getenv('OPPORTUNITY_INDEX_SWEEP', '3600'))
+
+def profile_text(organization_profile: Dict[str, Any]) -> str:
+    """Text an organization profile is embedded from"""
+    parts = [
+        organization_profile.get('name'),
+        organization_profile.get('mission'),
+        organization_profile.get('description'),
+        organization_profile.get('sector'),
+        join_terms(organization_profile.get('focus_areas')),
+        join_terms(organization_profile.get('keywords')),
+    ]
+    return '. '.join(str(part) for part in parts if part)
+
+def _text_hash(text: str) -> bytes:
+    return hashlib.sha1(text.encode()).digest()
+
+def _epoch(value: Optional[datetime]) -> float:
+    return value.timestamp() if value else np.nan
+
+class OpportunityIndex:
+    """In-memory embedding index over active donor opportunities.
+
+    Holds one L2-normalised embedding per opportunity in a float32 matrix,
+    plus NumPy arrays of the fields the matching filters use, so a query is
+    one matrix-vector product and a few vectorised masks however many
+    opportunities there are. Refreshes incrementally from updated_at and
+    only looks up vectors for rows whose text actually changed; a periodic
+    sweep compacts away deleted rows.
+
+    Loading, refreshing and sweeping all run in one background task
+    (started at startup or by the first query). Queries never wait for it:
+    they read whatever the index holds, and ready() reports False
+    until the first load has finished so callers can answer from another
+    path meanwhile.
+    """
+
+    def __init__(self, refresh_interval: int = INDEX_REFRESH_INTERVAL,
+                 sweep_interval: int = INDEX_SWEEP_INTERVAL):
+        self.refresh_interval = refresh_interval
+        self.sweep_interval = sweep_interval
+        self.ids: List[Any] = []
+        self.positions: Dict[Any, int] = {}
+        self.text_hashes: List[bytes] = []
+        self.matrix = np.zeros((0, 0), dtype=np.float32)
+        self.fields: Dict[str, np.ndarray] = {}
+        self.watermark: Optional[datetime] = None
+        self.last_refresh = 0.0
+        self.last_sweep = 0.0
+        self.loaded = False
+        self.task: Optional[asyncio.Task] = None
+        self.lock = asyncio.Lock()
+        self.encoded = 0
+        self.evicted = 0
+
+    @property
+    def available(self) -> bool:
+        return embedding_store.available
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    async def encode_query(self, text: str) -> np.ndarray:
+        return (await asyncio.to_thread(embedding_store.encode, [text]))[0]
+
+    def start(self):
+        """Start the background task that loads and then keeps refreshing the index"""
+        if not self.available:
+            return
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self.task
+            self.task = None
+
+    async def _run(self):
+        while True:
+            started = time.monotonic()
+            try:
+                async with self.lock:
+                    loading = not self.loaded
+                    await self.refresh()
+                if loading:
+                    logger.info(f"Opportunity index loaded: {len(self)} rows in {time.monotonic() - started:.1f}s")
+            except Exception as e:
+                logger.error(f"Opportunity index refresh failed: {e}")
+            await asyncio.sleep(self.refresh_interval)
+
+    def ready(self) -> bool:
+        """Whether the index is loaded; starts the background refresh if it isn't running"""
+        self.start()
+        return self.loaded
+
+    async def refresh(self):
+        """Pull opportunities created or changed since the last refresh into the index"""
+        if not self.available:
+            return
+
+        changed_at = func.coalesce(DonorOpportunity.updated_at, DonorOpportunity.created_at)
+        stmt = select(
+            DonorOpportunity.id,
+            DonorOpportunity.title,
+            DonorOpportunity.description,
+            DonorOpportunity.sector,
+            DonorOpportunity.focus_areas,
+            DonorOpportunity.keywords,
+            DonorOpportunity.country,
+            DonorOpportunity.amount_min,
+            DonorOpportunity.amount_max,
+            DonorOpportunity.deadline,
+            DonorOpportunity.is_active,
+            DonorOpportunity.is_verified,
+            changed_at.label('changed_at')
+        ).order_by(changed_at)
+        if self.watermark is not None:
+            # updated_at is the writing transaction's start time, so a row can
+            # commit after the watermark with an earlier stamp; re-read a margin
+            stmt = stmt.where(changed_at > self.watermark - timedelta(seconds=WATERMARK_OVERLAP))
+
+        async with get_db_session() as session:
+            rows = (await session.execute(stmt)).all()
+
+        if rows:
+            encoded = await self._merge(rows)
+            # Legacy rows may have neither timestamp; they don't move the watermark
+            stamps = [row.changed_at for row in rows if row.changed_at is not None]
+            if stamps:
+                self.watermark = max([self.watermark, *stamps] if self.watermark else stamps)
+            if encoded:
+                logger.info(f"Opportunity index refreshed: {encoded} rows encoded, {len(self)} indexed")
+
+        if self.loaded and time.monotonic() - self.last_sweep >= self.sweep_interval:
+            await self.sweep()
+
+        self.last_refresh = time.monotonic()
+        self.loaded = True
+
+    async def sweep(self):
+        """Drop rows deleted from the database since they were indexed"""
+        async with get_db_session() as session:
+            live_ids = set((await session.execute(select(DonorOpportunity.id))).scalars())
+
+        keep = np.fromiter((opp_id in live_ids for opp_id in self.ids), dtype=bool, count=len(self.ids))
+        removed = len(self.ids) - int(keep.sum())
+        if removed:
+            self._compact(keep)
+            self.evicted += removed
+            logger.info(f"Opportunity index swept: {removed} deleted rows evicted, {len(self)} indexed")
+        self.last_sweep = time.monotonic()
+
+    def _compact(self, keep: np.ndarray):
+        """Keep only the rows where keep is True, renumbering positions"""
+        kept = np.flatnonzero(keep)
+        self.ids = [self.ids[i] for i in kept]
+        self.text_hashes = [self.text_hashes[i] for i in kept]
+        self.positions = {opp_id: position for position, opp_id in enumerate(self.ids)}
+        self.matrix = self.matrix[kept] if len(self.matrix) else self.matrix
+        self.fields = {name: values[kept] for name, values in self.fields.items()}
+
+    async def _merge(self, rows):
+        texts = [
+            opportunity_text(row.title, row.description, row.sector, row.focus_areas, row.keywords)
+            for row in rows
+        ]
+        hashes = [_text_hash(text) for text in texts]
+
+        # Only new rows and rows whose text changed need a vector; verification
+        # and other status updates just refresh the filter fields. Vectors come
+        # from the shared embedding cache, so a restart encodes nothing new
+        to_encode = [
+            i for i, row in enumerate(rows)
+            if row.id not in self.positions or self.text_hashes[self.positions[row.id]] != hashes[i]
+        ]
+        embeddings = None
+        if to_encode:
+            _, embeddings = await embedding_store.embed([texts[i] for i in to_encode])
+            self.encoded += len(to_encode)
+
+        new_ids = [row.id for row in rows if row.id not in self.positions]
+        start = len(self.ids)
+        for offset, opp_id in enumerate(new_ids):
+            self.positions[opp_id] = start + offset
+        self.ids.extend(new_ids)
+        self.text_hashes.extend([b''] * len(new_ids))
+
+        if new_ids:
+            # New rows are always among those just encoded, so embeddings is set
+            grown = np.zeros((len(self.ids), embeddings.shape[1]), dtype=np.float32)
+            if len(self.matrix):
+                grown[:len(self.matrix)] = self.matrix
+            self.matrix = grown
+            self._grow_fields(len(new_ids))
+
+        positions = np.fromiter((self.positions[row.id] for row in rows), dtype=np.int64, count=len(rows))
+        if embeddings is not None:
+            self.matrix[positions[to_encode]] = embeddings
+        for i in to_encode:
+            self.text_hashes[positions[i]] = hashes[i]
+
+        self.fields['country'][positions] = [row.country for row in rows]
+        self.fields['sector'][positions] = [(row.sector or '').lower() for row in rows]
+        self.fields['amount_min'][positions] = [row.amount_min if row.amount_min is not None else np.nan for row in rows]
+        self.fields['amount_max'][positions] = [row.amount_max if row.amount_max is not None else np.nan for row in rows]
+        self.fields['deadline'][positions] = [_epoch(row.deadline) for row in rows]
+        self.fields['is_active'][positions] = [bool(row.is_active) for row in rows]
+        self.fields['is_verified'][positions] = [bool(row.is_verified) for row in rows]
+        return len(to_encode)
+
+    def _grow_fields(self, count: int):
+        defaults = {
+            'country': (object, None), 'sector': (object, ''), 'amount_min': (np.float64, np.nan),
+            'amount_max': (np.float64, np.nan), 'deadline': (np.float64, np.nan),
+            'is_active': (bool, False), 'is_verified': (bool, False),
+        }
+        for name, (dtype, fill) in defaults.items():
+            extra = np.full(count, fill, dtype=dtype)
+            self.fields[name] = np.concatenate([self.fields[name], extra]) if name in self.fields else extra
+
+    def filter_mask(self, filters: Dict[str, Any], countries: Optional[Sequence[str]] = None) -> np.ndarray:
+        """Rows passing the matching filters, as a boolean array"""
+        fields = self.fields
+        mask = fields['is_active'].copy()
+
+        if countries:
+            in_countries = np.zeros(len(mask), dtype=bool)
+            for country in countries:
+                in_countries |= fields['country'] == country
+            mask &= in_countries
+        if filters.get('country'):
+            mask &= fields['country'] == filters['country']
+        if filters.get('sector'):
+            mask &= fields['sector'] == filters['sector'].lower()
+        with np.errstate(invalid='ignore'):
+            if filters.get('min_amount'):
+                mask &= fields['amount_max'] >= filters['min_amount']
+            if filters.get('max_amount'):
+                mask &= fields['amount_min'] <= filters['max_amount']
+            if filters.get('deadline_after'):
+                after = filters['deadline_after']
+                after = after.timestamp() if isinstance(after, datetime) else datetime.fromisoformat(str(after)).timestamp()
+                mask &= fields['deadline'] >= after
+        if filters.get('verified_only'):
+            mask &= fields['is_verified']
+
+        return mask
+
+    def top_k(self, query: np.ndarray, k: int, mask: Optional[np.ndarray] = None) -> List[Tuple[Any, float]]:
+        """The k most similar opportunities as (id, cosine similarity), best first"""
+        if not len(self) or k <= 0:
+            return []
+
+        scores = self.matrix @ query
+        if mask is not None:
+            scores = np.where(mask, scores, -np.inf)
+
+        candidates = min(k, int(np.count_nonzero(np.isfinite(scores))))
+        if candidates == 0:
+            return []
+
+        top = np.argpartition(-scores, candidates - 1)[:candidates]
+        # Deterministic order: similarity, then position in the index
+        top = top[np.lexsort((top, -scores[top]))]
+        return [(self.ids[i], float(scores[i])) for i in top]
+
+    def get_statistics(self) -> Dict[str, Any]:
+        return {
+            'indexed': len(self),
+            'encoded': self.encoded,
+            'evicted': self.evicted,
+            'loaded': self.loaded,
+            'dimensions': int(self.matrix.shape[1]) if self.matrix.ndim == 2 else 0,
+            'memory_mb': round(self.matrix.nbytes / (1024 * 1024), 1),
+            'watermark': self.watermark.isoformat() if self.watermark else None,
+        }
+
+# Global opportunity index instance
+opportunity_index = OpportunityIndex()
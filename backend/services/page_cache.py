@@ -0,0 +1,229 @@
+import os
+import json
+import time
+import zlib
+import asyncio
+import hashlib
+import logging
+import tempfile
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+# Shared by every process that sees this directory (bot worker, Celery workers,
+# API); separate containers need a shared volume, as docker-compose.yml mounts
+PAGE_CACHE_DIR = os.getenv('PAGE_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'granada-page-cache'))
+# Total size of the compressed pages kept on disk
+PAGE_CACHE_MAX_BYTES = int(os.getenv('PAGE_CACHE_MAX_BYTES', str(256 * 1024 * 1024)))
+# Pages younger than this are served without contacting the site (seconds)
+PAGE_CACHE_TTL = int(os.getenv('PAGE_CACHE_TTL', '21600'))
+
+@dataclass
+class CachedPage:
+    """Header of a cached page; the body is read separately with PageCache.text"""
+    url: str
+    body_hash: str
+    fetched_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    def is_fresh(self, ttl: int = PAGE_CACHE_TTL) -> bool:
+        return time.time() - self.fetched_at < ttl
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+    def matches(self, headers: Mapping[str, str]) -> bool:
+        """Whether response headers carry the same validators as the cached copy"""
+        if self.etag and headers.get('ETag'):
+            return headers.get('ETag') == self.etag
+        if self.last_modified and headers.get('Last-Modified'):
+            return headers.get('Last-Modified') == self.last_modified
+        return False
+
+class PageCache:
+    """Size-bounded on-disk cache of fetched pages, shared between processes.
+
+    Each page is one file named after the URL hash: a JSON header line with
+    the URL, validators and fetch time, followed by the zlib-compressed body.
+    Files are replaced atomically, and the least recently used ones are
+    removed once the directory grows past max_bytes.
+    """
+
+    def __init__(self, directory: str = PAGE_CACHE_DIR, max_bytes: int = PAGE_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.size: Optional[int] = None  # bytes on disk, counted on first write
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(url.encode()).hexdigest() + '.page')
+
+    def _read_header(self, url: str) -> Optional[CachedPage]:
+        try:
+            with open(self._path(url), 'rb') as f:
+                page = CachedPage(**json.loads(f.readline()))
+        except (OSError, ValueError, TypeError):
+            return None
+        return page if page.url == url else None
+
+    def _read_text(self, page: CachedPage) -> Optional[str]:
+        path = self._path(page.url)
+        try:
+            with open(path, 'rb') as f:
+                f.readline()
+                text = zlib.decompress(f.read()).decode('utf-8')
+            os.utime(path)  # Recently used pages are evicted last
+            return text
+        except (OSError, zlib.error, UnicodeDecodeError):
+            return None
+
+    def _touch(self, url: str, etag: Optional[str], last_modified: Optional[str]) -> Optional[CachedPage]:
+        """Rewrite a page's header with the current time, keeping its compressed body as is"""
+        try:
+            with open(self._path(url), 'rb') as f:
+                page = CachedPage(**json.loads(f.readline()))
+                body = f.read()
+        except (OSError, ValueError, TypeError):
+            return None
+        if page.url != url:
+            return None
+
+        page.fetched_at = time.time()
+        page.etag = etag or page.etag
+        page.last_modified = last_modified or page.last_modified
+        self._write(page, body)
+        return page
+
+    def _write(self, page: CachedPage, body: bytes):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(page.url)
+
+        try:
+            previous = os.path.getsize(path)
+        except OSError:
+            previous = 0
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(json.dumps(asdict(page)).encode() + b'\n')
+                f.write(body)
+            os.replace(tmp_path, path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+
+        if self.size is None:
+            self.size = self._disk_usage()
+        else:
+            self.size += os.path.getsize(path) - previous
+
+        if self.size > self.max_bytes:
+            self._evict()
+
+    def _disk_usage(self) -> int:
+        total = 0
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.name.endswith('.page'):
+                    total += entry.stat().st_size
+        return total
+
+    def _evict(self):
+        """Remove least recently used pages until the cache is under 90% of max_bytes"""
+        with os.scandir(self.directory) as entries:
+            files = [
+                (entry.stat().st_mtime, entry.stat().st_size, entry.path)
+                for entry in entries if entry.name.endswith('.page')
+            ]
+
+        # Other processes write here too, so start from the real total
+        self.size = sum(size for _, size, _ in files)
+        target = self.max_bytes * 0.9
+
+        for _, size, path in sorted(files):
+            if self.size <= target:
+                break
+            try:
+                os.unlink(path)
+                self.size -= size
+                self.evictions += 1
+            except OSError:
+                pass
+
+    async def get(self, url: str) -> Optional[CachedPage]:
+        """Header of the cached copy of url, fresh or not"""
+        page = await asyncio.to_thread(self._read_header, url)
+        if page is None:
+            self.misses += 1
+        return page
+
+    async def text(self, page: CachedPage) -> Optional[str]:
+        """Body of a cached page, or None if it was evicted meanwhile"""
+        text = await asyncio.to_thread(self._read_text, page)
+        if text is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return text
+
+    async def put(self, url: str, text: str, etag: Optional[str] = None,
+                  last_modified: Optional[str] = None, body_hash: Optional[str] = None) -> CachedPage:
+        """Store a freshly fetched page"""
+        body = text.encode('utf-8')
+        page = CachedPage(
+            url=url,
+            body_hash=body_hash or hashlib.sha1(body).hexdigest(),
+            fetched_at=time.time(),
+            etag=etag,
+            last_modified=last_modified
+        )
+
+        try:
+            await asyncio.to_thread(self._write, page, zlib.compress(body, 6))
+            self.stores += 1
+        except OSError as e:
+            logger.warning(f"Could not cache {url}: {e}")
+
+        return page
+
+    async def refresh(self, url: str, etag: Optional[str] = None,
+                      last_modified: Optional[str] = None) -> Optional[CachedPage]:
+        """Mark a cached page as just confirmed unchanged, without its body; None if not cached"""
+        try:
+            return await asyncio.to_thread(self._touch, url, etag, last_modified)
+        except OSError as e:
+            logger.warning(f"Could not refresh cached {url}: {e}")
+            return None
+
+    async def revalidated(self, page: CachedPage) -> Optional[str]:
+        """Mark a page as confirmed unchanged by the site; returns its body"""
+        text = await self.text(page)
+        if text is not None:
+            await self.put(page.url, text, page.etag, page.last_modified, page.body_hash)
+        return text
+
+    def get_statistics(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'stores': self.stores,
+            'evictions': self.evictions,
+            'bytes': self.size,
+            'max_bytes': self.max_bytes,
+        }
+
+# Global page cache instance
+page_cache = PageCache()
@@ -0,0 +1,68 @@
+import json
+import uuid
+import base64
+from datetime import datetime, timezone
+from typing import Any, List, Optional
+from sqlalchemy import tuple_, func, literal, DateTime
+from database.models import DonorOpportunity
+
+# Listings sort and page on scraped_at with NULLs read as this, so rows
+# without one come last and still carry a cursor
+SCRAPED_AT_FLOOR = datetime(1970, 1, 1, tzinfo=timezone.utc)
+scraped_at_key = func.coalesce(DonorOpportunity.scraped_at, literal(SCRAPED_AT_FLOOR, DateTime(timezone=True)))
+
+def encode_cursor(values: List[Any]) -> str:
+    """Encode keyset values as an opaque, URL-safe token"""
+    payload = json.dumps(values, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+def decode_cursor(token: str) -> List[Any]:
+    """Decode a token produced by encode_cursor, raising ValueError if malformed"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+
+    return values
+
+def encode_opportunity_cursor(opportunity: DonorOpportunity, rank: Optional[float] = None) -> Optional[str]:
+    """Build the cursor pointing just after opportunity in a listing"""
+    values = [(opportunity.scraped_at or SCRAPED_AT_FLOOR).isoformat(), str(opportunity.id)]
+    if rank is not None:
+        values.append(float(rank))
+
+    return encode_cursor(values)
+
+def apply_opportunity_cursor(stmt, token: str, rank=None):
+    """Restrict stmt to rows after the cursor.
+
+    Listings are ordered by (scraped_at_key, id) descending, or by
+    (rank, scraped_at_key, id) descending for full-text searches.
+    """
+    values = decode_cursor(token)
+    expected = 3 if rank is not None else 2
+
+    if len(values) != expected:
+        raise ValueError("Cursor does not match this listing")
+
+    try:
+        scraped_at = datetime.fromisoformat(values[0])
+        opportunity_id = uuid.UUID(values[1])
+        cursor_rank = float(values[2]) if rank is not None else None
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+    if rank is None:
+        return stmt.where(
+            tuple_(scraped_at_key, DonorOpportunity.id) <
+            tuple_(scraped_at, opportunity_id)
+        )
+
+    return stmt.where(
+        tuple_(rank, scraped_at_key, DonorOpportunity.id) <
+        tuple_(cursor_rank, scraped_at, opportunity_id)
+    )
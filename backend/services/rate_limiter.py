@@ -0,0 +1,64 @@
+import time
+import asyncio
+import logging
+from typing import Dict
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+class TokenBucket:
+    """Async token bucket refilled at a fixed number of requests per minute"""
+
+    def __init__(self, rate_per_minute: float, capacity: float = 1.0):
+        self.rate = max(rate_per_minute, 1) / 60.0  # tokens per second
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    def set_rate(self, rate_per_minute: float):
+        self.rate = max(rate_per_minute, 1) / 60.0
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        """Wait until a token is available and take it"""
+        async with self.lock:
+            while True:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+class HostRateLimiter:
+    """One token bucket per host.
+
+    Targets sharing a host share its bucket, which runs at the slowest
+    rate_limit any of them declared.
+    """
+
+    def __init__(self):
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.rates: Dict[str, float] = {}
+
+    def _bucket(self, url: str, rate_per_minute: float) -> TokenBucket:
+        host = urlparse(url).netloc.lower()
+        bucket = self.buckets.get(host)
+
+        if bucket is None:
+            bucket = TokenBucket(rate_per_minute)
+            self.buckets[host] = bucket
+            self.rates[host] = rate_per_minute
+        elif rate_per_minute < self.rates[host]:
+            bucket.set_rate(rate_per_minute)
+            self.rates[host] = rate_per_minute
+
+        return bucket
+
+    async def acquire(self, url: str, rate_per_minute: float):
+        """Wait for permission to send one request to url's host"""
+        await self._bucket(url, rate_per_minute).acquire()
@@ -0,0 +1,121 @@
+import re
+import html
+import logging
+import threading
+from collections import OrderedDict
+from typing import Hashable, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+FUNDING_KEYWORDS = (
+    'grant', 'funding', 'opportunity', 'application', 'proposal',
+    'award', 'fellowship', 'scholarship', 'call', 'tender'
+)
+
+# Title words shorter than this are too common to say anything about a page
+MIN_TITLE_WORD = 4
+
+# Pages whose visible text and keyword count are kept, by body hash
+PAGE_TERMS_CACHE_SIZE = 64
+
+# Markup a reader never sees: script, style, noscript and template blocks,
+# comments, then any other tag. Matched against lowercased HTML in one
+# pass; the unrolled loops skip a 100 KB inline script in a single scan
+# where a lazy .*? would retry the closing tag at every character.
+_MARKUP = re.compile(
+    r'<(?:(script|style|noscript|template)\b[^>]*>[^<]*(?:<(?!/\1)[^<]*)*</\1\s*>'
+    r'|!--[^-]*(?:-(?!->)[^-]*)*-->'
+    r'|[^>]*>)'
+)
+_WORD = re.compile(r'\w+')
+
+def visible_text(page: str) -> str:
+    """Lowercased text a reader would see, without markup, scripts or styles"""
+    text = page.lower()
+    if '<' in text:
+        text = _MARKUP.sub(' ', text)
+    return html.unescape(text) if '&' in text else text
+
+def has_word_prefix(text: str, term: str) -> bool:
+    """Whether some word in text starts with term ("grants" has "grant", "recall" doesn't have "call").
+
+    str.find runs in C and stops at the first hit, which beats a regex
+    alternation over the whole page in CPython.
+    """
+    start = text.find(term)
+    while start != -1:
+        if start == 0 or not (text[start - 1].isalnum() or text[start - 1] == '_'):
+            return True
+        start = text.find(term, start + 1)
+    return False
+
+_page_terms: "OrderedDict[Hashable, Tuple[str, int]]" = OrderedDict()
+_page_terms_lock = threading.Lock()
+
+def page_terms(page: str, key: Optional[Hashable] = None) -> Tuple[str, int]:
+    """A page's visible text and how many funding keywords it contains.
+
+    Cached under key (the body hash the fetch already computed) when one is
+    given, because many opportunities scraped from one listing page share
+    the same source URL, and so the same page. Only the visible text is
+    kept, never the HTML, and the page is never hashed here.
+    """
+    if key is not None:
+        with _page_terms_lock:
+            terms = _page_terms.get(key)
+            if terms is not None:
+                _page_terms.move_to_end(key)
+                return terms
+
+    text = visible_text(page)
+    terms = text, sum(1 for keyword in FUNDING_KEYWORDS if has_word_prefix(text, keyword))
+
+    if key is not None:
+        with _page_terms_lock:
+            _page_terms[key] = terms
+            while len(_page_terms) > PAGE_TERMS_CACHE_SIZE:
+                _page_terms.popitem(last=False)
+    return terms
+
+def clear_page_terms():
+    """Forget every cached page's terms"""
+    with _page_terms_lock:
+        _page_terms.clear()
+
+def title_words(title: str) -> List[str]:
+    return [word for word in _WORD.findall(title.lower()) if len(word) >= MIN_TITLE_WORD]
+
+def _relevance(terms: Tuple[str, int], title: str) -> float:
+    text, keyword_count = terms
+    significant = title_words(title)
+
+    keyword_score = keyword_count / len(FUNDING_KEYWORDS)
+    title_score = sum(1 for word in significant if has_word_prefix(text, word)) / max(1, len(significant))
+
+    return (keyword_score + title_score) / 2
+
+def content_relevance(page: str, title: str, page_key: Optional[Hashable] = None) -> float:
+    """How relevant a page is to an opportunity, from 0.0 to 1.0.
+
+    Averages the share of funding keywords on the page with the share of
+    the title's significant words that appear on it. page_key (e.g. the
+    body hash) lets repeated checks of one page reuse its tokenization.
+    """
+    if not page or not title:
+        return 0.0
+    return _relevance(page_terms(page, page_key), title)
+
+def score_relevance_batch(pairs: Iterable[Tuple[str, str]]) -> List[float]:
+    """content_relevance for many (page, title) pairs; each distinct page is tokenized once"""
+    terms = {}
+    scores = []
+
+    for page, title in pairs:
+        if not page or not title:
+            scores.append(0.0)
+            continue
+        if page not in terms:
+            terms[page] = page_terms(page)
+        scores.append(_relevance(terms[page], title))
+
+    return scores
@@ -10,6 +10,10 @@ from bs4 import BeautifulSoup
 import feedparser
 import json
 import uuid
+from collections import OrderedDict
+from services.http_cache import ConditionalFetcher, FetchResult, MAX_TRACKED_URLS
+from services.html_parser import SelectorSet, compile_selector, parse_html
+from services.extraction_pool import extraction_pool
 
 # Try to import browser automation libraries
 try:
@@ -29,12 +33,22 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Containers tried when a caller supplies no selectors
+GENERIC_CONTAINER_SELECTORS = SelectorSet([
+    '.opportunity', '.grant', '.funding', '.call',
+    '[class*="opportunity"]', '[class*="grant"]',
+    'article', '.post', '.item', '.card',
+    '.listing', '.result', '.program'
+])
+
 class ScrapingService:
     def __init__(self):
         self.session = None
         self.browser = None
         self.page = None
         self.initialized = False
+        self.fetcher = ConditionalFetcher()
+        self.last_results: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()  # by fetch key, least recent first
     
     async def initialize(self):
         """Initialize HTTP session and browser automation"""
@@ -114,102 +128,132 @@ class ScrapingService:
     
     async def _scrape_html(self, url: str, selectors: Dict[str, str] = None) -> Dict[str, Any]:
         """Scrape HTML content using aiohttp and BeautifulSoup"""
-        async with self.session.get(url) as response:
-            if response.status != 200:
-                return {
-                    "success": False,
-                    "url": url,
-                    "status_code": response.status,
-                    "error": f"HTTP error: {response.status}",
-                    "timestamp": datetime.utcnow().isoformat()
-                }
-            
-            html = await response.text()
-            soup = BeautifulSoup(html, 'html.parser')
-            
-            # Take screenshot if browser is available
-            screenshot = None
-            if self.page:
-                try:
-                    await self.page.goto(url)
-                    screenshot = await self.page.screenshot(type='jpeg', quality=50)
-                except Exception as e:
-                    logger.error(f"Error taking screenshot: {e}")
-            
-            # Extract opportunities
-            opportunities = self._extract_opportunities_from_html(soup, url, selectors)
-            
-            return {
-                "success": True,
-                "url": url,
-                "content_type": "html",
-                "opportunities": opportunities,
-                "opportunity_count": len(opportunities),
-                "screenshot": screenshot.decode('utf-8') if screenshot else None,
-                "timestamp": datetime.utcnow().isoformat()
-            }
+        fetched = await self._fetch(url, selectors)
+        
+        if fetched.not_modified:
+            return self._unchanged_result(fetched)
+        
+        if fetched.status != 200:
+            return self._http_error(url, fetched.status)
+        
+        # Extract opportunities in a worker process while the screenshot is taken
+        extraction = asyncio.ensure_future(extraction_pool.run(extract_page, fetched.text, url, selectors))
+        
+        # Take screenshot if browser is available
+        screenshot = None
+        if self.page:
+            try:
+                await self.page.goto(url)
+                screenshot = await self.page.screenshot(type='jpeg', quality=50)
+            except Exception as e:
+                logger.error(f"Error taking screenshot: {e}")
+        
+        opportunities = await extraction
+        
+        return await self._remember(fetched, {
+            "success": True,
+            "url": url,
+            "content_type": "html",
+            "opportunities": opportunities,
+            "opportunity_count": len(opportunities),
+            "screenshot": screenshot.decode('utf-8') if screenshot else None,
+            "timestamp": datetime.utcnow().isoformat()
+        })
     
     async def _scrape_api(self, url: str) -> Dict[str, Any]:
         """Scrape API endpoint"""
-        async with self.session.get(url) as response:
-            if response.status != 200:
-                return {
-                    "success": False,
-                    "url": url,
-                    "status_code": response.status,
-                    "error": f"HTTP error: {response.status}",
-                    "timestamp": datetime.utcnow().isoformat()
-                }
-            
-            try:
-                data = await response.json()
-                
-                # Extract opportunities from API response
-                opportunities = self._extract_opportunities_from_api(data, url)
-                
-                return {
-                    "success": True,
-                    "url": url,
-                    "content_type": "api",
-                    "opportunities": opportunities,
-                    "opportunity_count": len(opportunities),
-                    "timestamp": datetime.utcnow().isoformat()
-                }
-            except json.JSONDecodeError:
-                return {
-                    "success": False,
-                    "url": url,
-                    "error": "Invalid JSON response",
-                    "timestamp": datetime.utcnow().isoformat()
-                }
-    
-    async def _scrape_rss(self, url: str) -> Dict[str, Any]:
-        """Scrape RSS feed"""
-        async with self.session.get(url) as response:
-            if response.status != 200:
-                return {
-                    "success": False,
-                    "url": url,
-                    "status_code": response.status,
-                    "error": f"HTTP error: {response.status}",
-                    "timestamp": datetime.utcnow().isoformat()
-                }
-            
-            content = await response.text()
-            feed = feedparser.parse(content)
+        fetched = await self._fetch(url)
+        
+        if fetched.not_modified:
+            return self._unchanged_result(fetched)
+        
+        if fetched.status != 200:
+            return self._http_error(url, fetched.status)
+        
+        try:
+            data = json.loads(fetched.text)
             
-            # Extract opportunities from RSS feed
-            opportunities = self._extract_opportunities_from_rss(feed, url)
+            # Extract opportunities from API response
+            opportunities = self._extract_opportunities_from_api(data, url)
             
-            return {
+            return await self._remember(fetched, {
                 "success": True,
                 "url": url,
-                "content_type": "rss",
+                "content_type": "api",
                 "opportunities": opportunities,
                 "opportunity_count": len(opportunities),
                 "timestamp": datetime.utcnow().isoformat()
+            })
+        except json.JSONDecodeError:
+            return {
+                "success": False,
+                "url": url,
+                "error": "Invalid JSON response",
+                "timestamp": datetime.utcnow().isoformat()
             }
     
+    async def _scrape_rss(self, url: str) -> Dict[str, Any]:
+        """Scrape RSS feed"""
+        fetched = await self._fetch(url)
+        
+        if fetched.not_modified:
+            return self._unchanged_result(fetched)
+        
+        if fetched.status != 200:
+            return self._http_error(url, fetched.status)
+        
+        feed = feedparser.parse(fetched.text)
+        
+        # Extract opportunities from RSS feed
+        opportunities = self._extract_opportunities_from_rss(feed, url)
+        
+        return await self._remember(fetched, {
+            "success": True,
+            "url": url,
+            "content_type": "rss",
+            "opportunities": opportunities,
+            "opportunity_count": len(opportunities),
+            "timestamp": datetime.utcnow().isoformat()
+        })
+    
+    async def _fetch(self, url: str, selectors: Dict[str, str] = None) -> FetchResult:
+        """Conditionally fetch a URL, skipping the body if it hasn't changed"""
+        fetched = await self.fetcher.fetch(self.session, url, variant=selectors)
+        
+        if fetched.not_modified and fetched.key not in self.last_results:
+            # Nothing cached to serve for this URL: fetch unconditionally
+            self.fetcher.forget(url, selectors)
+            fetched = await self.fetcher.fetch(self.session, url, variant=selectors)
+        
+        return fetched
+    
+    async def _remember(self, fetched: FetchResult, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Mark the page processed and keep its result so unchanged pages needn't be re-parsed"""
+        await self.fetcher.commit(fetched)
+        self.last_results[fetched.key] = result
+        self.last_results.move_to_end(fetched.key)
+        while len(self.last_results) > MAX_TRACKED_URLS:
+            self.last_results.popitem(last=False)
+        return result
+    
+    def _unchanged_result(self, fetched: FetchResult) -> Dict[str, Any]:
+        """Serve the previous result for a page that hasn't changed"""
+        self.last_results.move_to_end(fetched.key)
+        return {
+            **self.last_results[fetched.key],
+            "not_modified": True,
+            "timestamp": datetime.utcnow().isoformat()
+        }
+    
+    def _http_error(self, url: str, status: int) -> Dict[str, Any]:
+        return {
+            "success": False,
+            "url": url,
+            "status_code": status,
+            "error": f"HTTP error: {status}",
+            "timestamp": datetime.utcnow().isoformat()
+        }
+    
     async def _scrape_browser(self, url: str, selectors: Dict[str, str] = None) -> Dict[str, Any]:
         """Scrape using browser automation for JavaScript-heavy sites"""
         if not self.page:
@@ -228,10 +272,9 @@ class ScrapingService:
             
             # Get HTML content
             html = await self.page.content()
-            soup = BeautifulSoup(html, 'html.parser')
             
-            # Extract opportunities
-            opportunities = self._extract_opportunities_from_html(soup, url, selectors)
+            # Extract opportunities in a worker process
+            opportunities = await extraction_pool.run(extract_page, html, url, selectors)
             
             return {
                 "success": True,
@@ -264,15 +307,22 @@ class ScrapingService:
             amount_selector = selectors.get('amount', '')
             link_selector = selectors.get('link', '')
             
-            containers = soup.select(container_selector) if container_selector else []
+            # Compile each selector once rather than per container
+            title_pattern = compile_selector(title_selector) if title_selector else None
+            description_pattern = compile_selector(description_selector) if description_selector else None
+            deadline_pattern = compile_selector(deadline_selector) if deadline_selector else None
+            amount_pattern = compile_selector(amount_selector) if amount_selector else None
+            link_pattern = compile_selector(link_selector) if link_selector else None
+            
+            containers = compile_selector(container_selector).select(soup) if container_selector else []
             
             for container in containers:
                 try:
-                    title_elem = container.select_one(title_selector) if title_selector else None
-                    description_elem = container.select_one(description_selector) if description_selector else None
-                    deadline_elem = container.select_one(deadline_selector) if deadline_selector else None
-                    amount_elem = container.select_one(amount_selector) if amount_selector else None
-                    link_elem = container.select_one(link_selector) if link_selector else None
+                    title_elem = title_pattern.select_one(container) if title_pattern else None
+                    description_elem = description_pattern.select_one(container) if description_pattern else None
+                    deadline_elem = deadline_pattern.select_one(container) if deadline_pattern else None
+                    amount_elem = amount_pattern.select_one(container) if amount_pattern else None
+                    link_elem = link_pattern.select_one(container) if link_pattern else None
                     
                     title = title_elem.get_text(strip=True) if title_elem else None
                     description = description_elem.get_text(strip=True) if description_elem else None
@@ -296,19 +346,7 @@ class ScrapingService:
         else:
             # Use generic extraction if no selectors provided
             # Find opportunity containers
-            container_selectors = [
-                '.opportunity', '.grant', '.funding', '.call',
-                '[class*="opportunity"]', '[class*="grant"]',
-                'article', '.post', '.item', '.card',
-                '.listing', '.result', '.program'
-            ]
-            
-            containers = []
-            for selector in container_selectors:
-                found = soup.select(selector)
-                if found:
-                    containers = found
-                    break
+            containers = GENERIC_CONTAINER_SELECTORS.select(soup)
             
             # If no containers found, try to extract from headings
             if not containers:
@@ -527,4 +565,8 @@ class ScrapingService:
             return {'min': min(amounts), 'max': max(amounts), 'currency': currency}
 
 # Create global instance
-scraping_service = ScrapingService()
\ No newline at end of file
+scraping_service = ScrapingService()
+
+def extract_page(html: str, url: str, selectors: Optional[Dict[str, str]] = None) -> List[Dict[str, Any]]:
+    """Parse a page and extract opportunities; runs in extraction pool workers"""
+    return scraping_service._extract_opportunities_from_html(parse_html(html), url, selectors)
@@ -0,0 +1,34 @@
+import logging
+from typing import Any, Tuple
+from sqlalchemy import func, literal_column, desc
+from database.models import DonorOpportunity
+from services.pagination import scraped_at_key
+
+logger = logging.getLogger(__name__)
+
+# Text search configuration; matches the one the search_vector trigger indexes with
+SEARCH_CONFIG = literal_column("'english'::regconfig")
+
+# ts_rank_cd normalization flags: 1 divides by 1 + log(document length),
+# 32 maps the rank into rank / (rank + 1). Together they give BM25-like
+# length normalisation and term-frequency saturation.
+RANK_NORMALIZATION = 1 | 32
+
+def search_query(query: str):
+    """Parse free text (quoted phrases, OR, -exclusions) into a tsquery"""
+    return func.websearch_to_tsquery(SEARCH_CONFIG, query)
+
+def apply_full_text_search(stmt, query: str) -> Tuple[Any, Any]:
+    """Restrict a DonorOpportunity select to rows matching query.
+
+    Returns the filtered statement and the rank expression so callers can
+    order by relevance or expose the score.
+    """
+    ts_query = search_query(query)
+    rank = func.ts_rank_cd(DonorOpportunity.search_vector, ts_query, RANK_NORMALIZATION)
+    stmt = stmt.where(DonorOpportunity.search_vector.op('@@')(ts_query))
+    return stmt, rank
+
+def order_by_relevance(stmt, rank):
+    """Order by rank first, newest first among equally ranked rows"""
+    return stmt.order_by(desc(rank), desc(scraped_at_key), desc(DonorOpportunity.id))
@@ -0,0 +1,179 @@
+import os
+import time
+import random
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+from sqlalchemy import select
+from database.models import SearchTarget as SearchTargetModel
+from database.connection import get_db_session
+
+logger = logging.getLogger(__name__)
+
+# Bounds for a target's polling interval (seconds)
+MIN_INTERVAL = int(os.getenv('BOT_MIN_TARGET_INTERVAL', '300'))
+MAX_INTERVAL = int(os.getenv('BOT_MAX_TARGET_INTERVAL', '21600'))
+
+# Weight of the latest observation in the change-rate moving average
+CHANGE_RATE_ALPHA = 0.3
+# Change rate below which a source is treated as effectively static
+MIN_CHANGE_RATE = MIN_INTERVAL / MAX_INTERVAL
+# Fraction of the interval added or removed at random so targets don't align
+JITTER = 0.15
+
+@dataclass
+class TargetSchedule:
+    change_rate: float = 1.0  # moving average of how often a fetch yields something new
+    interval: float = MIN_INTERVAL
+    next_run: float = 0.0  # time.monotonic() deadline
+    last_successful_run: Optional[datetime] = None
+    dirty: bool = False  # needs persisting
+
+class AdaptiveScheduler:
+    """Per-target polling intervals learned from how often each source changes.
+
+    Every fetch is scored 1.0 if it produced new opportunities, 0.5 if the page
+    changed without new rows and 0.0 if it was unchanged or failed. The moving
+    average of that score is the target's change rate; the interval is
+    MIN_INTERVAL divided by the change rate, stretched for low-priority
+    targets and clamped to MAX_INTERVAL. The change rate and last productive
+    run are persisted in search_targets (change_rate, last_successful_run).
+    """
+
+    def __init__(self):
+        self.schedules: Dict[str, TargetSchedule] = {}
+
+    def _schedule(self, target) -> TargetSchedule:
+        return self.schedules.setdefault(target.url, TargetSchedule())
+
+    def _interval(self, change_rate: float, priority: int) -> float:
+        priority_factor = 1 + (10 - max(1, min(priority, 10))) * 0.1
+        interval = MIN_INTERVAL / max(change_rate, MIN_CHANGE_RATE) * priority_factor
+        return max(MIN_INTERVAL, min(MAX_INTERVAL, interval))
+
+    def _plan_next(self, schedule: TargetSchedule):
+        jitter = random.uniform(1 - JITTER, 1 + JITTER)
+        schedule.next_run = time.monotonic() + schedule.interval * jitter
+
+    def due(self, targets: Iterable[Any]) -> List[Any]:
+        """Targets whose next run time has passed"""
+        now = time.monotonic()
+        return [target for target in targets if self._schedule(target).next_run <= now]
+
+    def seconds_until_next(self, targets: Iterable[Any]) -> float:
+        """Seconds until the earliest target becomes due"""
+        deadlines = [self._schedule(target).next_run for target in targets]
+        if not deadlines:
+            return MIN_INTERVAL
+        return max(0.0, min(deadlines) - time.monotonic())
+
+    def record(self, target, changed: bool, new_rows: int):
+        """Fold one fetch outcome into the target's change rate and reschedule it"""
+        schedule = self._schedule(target)
+
+        if new_rows > 0:
+            observation = 1.0
+            schedule.last_successful_run = datetime.utcnow()
+        elif changed:
+            observation = 0.5
+        else:
+            observation = 0.0
+
+        schedule.change_rate += CHANGE_RATE_ALPHA * (observation - schedule.change_rate)
+        schedule.interval = self._interval(schedule.change_rate, target.priority)
+        schedule.dirty = True
+        self._plan_next(schedule)
+
+    async def load(self, targets: Iterable[Any]):
+        """Restore learned change rates from search_targets"""
+        targets = list(targets)
+
+        try:
+            async with get_db_session() as session:
+                result = await session.execute(
+                    select(SearchTargetModel).where(
+                        SearchTargetModel.url.in_([target.url for target in targets])
+                    )
+                )
+                rows = {row.url: row for row in result.scalars().all()}
+        except Exception as e:
+            logger.error(f"Error loading target schedules: {e}")
+            return
+
+        for target in targets:
+            row = rows.get(target.url)
+            if not row or row.change_rate is None:
+                continue
+
+            schedule = self._schedule(target)
+            schedule.change_rate = row.change_rate
+            schedule.last_successful_run = row.last_successful_run
+            schedule.interval = self._interval(schedule.change_rate, target.priority)
+
+            # Resume where the previous process left off, spread out by jitter
+            if row.last_successful_run:
+                elapsed = (datetime.utcnow() - row.last_successful_run.replace(tzinfo=None)).total_seconds()
+                remaining = max(0.0, schedule.interval - elapsed)
+                schedule.next_run = time.monotonic() + remaining * random.uniform(0, 1 + JITTER)
+
+    async def persist(self, targets: Iterable[Any]):
+        """Write changed schedules back to search_targets, creating missing rows"""
+        dirty = [target for target in targets if self._schedule(target).dirty]
+        if not dirty:
+            return
+
+        written = []
+        try:
+            async with get_db_session() as session:
+                result = await session.execute(
+                    select(SearchTargetModel).where(
+                        SearchTargetModel.url.in_([target.url for target in dirty])
+                    )
+                )
+                rows = {row.url: row for row in result.scalars().all()}
+
+                for target in dirty:
+                    schedule = self._schedule(target)
+                    row = rows.get(target.url)
+
+                    if row is None:
+                        row = SearchTargetModel(
+                            name=target.name,
+                            url=target.url,
+                            country=target.country,
+                            type=target.type,
+                            selectors=target.selectors,
+                            headers=target.headers,
+                            rate_limit=target.rate_limit,
+                            priority=target.priority
+                        )
+                        session.add(row)
+
+                    row.change_rate = schedule.change_rate
+                    if schedule.last_successful_run:
+                        row.last_successful_run = schedule.last_successful_run
+                    written.append((schedule, schedule.change_rate))
+
+                await session.commit()
+        except Exception as e:
+            logger.error(f"Error persisting target schedules: {e}")
+            return
+
+        for schedule, change_rate in written:
+            # A fetch recorded while committing leaves the schedule dirty
+            if schedule.change_rate == change_rate:
+                schedule.dirty = False
+
+    def get_statistics(self, targets: Iterable[Any]) -> List[Dict[str, Any]]:
+        """Current schedule for each target"""
+        now = time.monotonic()
+        return [
+            {
+                'name': target.name,
+                'change_rate': round(self._schedule(target).change_rate, 3),
+                'interval_seconds': round(self._schedule(target).interval),
+                'next_run_in_seconds': round(max(0.0, self._schedule(target).next_run - now))
+            }
+            for target in targets
+        ]
@@ -0,0 +1,166 @@
+import os
+import time
+import asyncio
+import logging
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, Deque, Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+from services.rate_limiter import HostRateLimiter
+
+logger = logging.getLogger(__name__)
+
+# Opportunities verified at once across all hosts
+VERIFY_CONCURRENCY = int(os.getenv('VERIFY_CONCURRENCY', '10'))
+# In-flight verifications allowed against a single donor site
+VERIFY_PER_HOST_CONCURRENCY = int(os.getenv('VERIFY_PER_HOST_CONCURRENCY', '2'))
+# Requests per minute sent to a single donor site
+VERIFY_HOST_RATE = int(os.getenv('VERIFY_HOST_RATE', '30'))
+
+# Completions kept for the throughput moving window
+THROUGHPUT_WINDOW = 60.0  # seconds
+# Opportunities whose verification raised are not resubmitted for this long
+ERROR_RETRY_DELAY = int(os.getenv('VERIFY_ERROR_RETRY_DELAY', '300'))
+
+class VerificationMetrics:
+    """Throughput, latency and backlog of the verification pipeline"""
+
+    def __init__(self):
+        self.verified = 0
+        self.failed = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.backlog: Optional[int] = None
+        self.completions: Deque[float] = deque()
+
+    def record(self, status: Optional[str], seconds: float):
+        """Record one finished verification (status None means it raised)"""
+        if status is None:
+            self.errors += 1
+        elif status == 'verified':
+            self.verified += 1
+        else:
+            self.failed += 1
+
+        self.total_seconds += seconds
+        now = time.monotonic()
+        self.completions.append(now)
+        while self.completions and now - self.completions[0] > THROUGHPUT_WINDOW:
+            self.completions.popleft()
+
+    def throughput(self) -> float:
+        """Verifications per second over the last THROUGHPUT_WINDOW seconds"""
+        now = time.monotonic()
+        recent = [t for t in self.completions if now - t <= THROUGHPUT_WINDOW]
+        return len(recent) / THROUGHPUT_WINDOW
+
+    def to_dict(self, in_flight: int) -> Dict[str, Any]:
+        finished = self.verified + self.failed + self.errors
+        return {
+            'verified': self.verified,
+            'failed': self.failed,
+            'errors': self.errors,
+            'in_flight': in_flight,
+            'backlog': self.backlog,
+            'throughput_per_second': round(self.throughput(), 3),
+            'avg_latency_ms': round(self.total_seconds / finished * 1000, 1) if finished else 0.0,
+        }
+
+class VerificationPipeline:
+    """Verifies many opportunities concurrently under per-host limits.
+
+    Each opportunity first waits for a slot on its donor site (at most
+    VERIFY_PER_HOST_CONCURRENCY in flight, VERIFY_HOST_RATE requests a
+    minute) and only then takes one of the VERIFY_CONCURRENCY global slots,
+    so work queued behind a slow site never holds capacity other sites
+    could use.
+    """
+
+    def __init__(self, verifier, concurrency: int = VERIFY_CONCURRENCY,
+                 per_host: int = VERIFY_PER_HOST_CONCURRENCY, host_rate: int = VERIFY_HOST_RATE):
+        self.verifier = verifier
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.host_rate = host_rate
+        self.slots = asyncio.Semaphore(concurrency)
+        self.host_slots: Dict[str, asyncio.Semaphore] = {}
+        self.rate_limiter = HostRateLimiter()
+        self.pending: Dict[Any, asyncio.Task] = {}
+        self.errored: Dict[Any, float] = {}  # id -> when it last raised
+        self.metrics = VerificationMetrics()
+
+    @asynccontextmanager
+    async def _host_slot(self, url: Optional[str]):
+        host = urlparse(url or '').netloc.lower()
+        if not host:
+            # Nothing to fetch; the URL check fails without a request
+            yield
+            return
+
+        slot = self.host_slots.setdefault(host, asyncio.Semaphore(self.per_host))
+        async with slot:
+            await self.rate_limiter.acquire(url, self.host_rate)
+            yield
+
+    async def _verify(self, opportunity) -> Optional[Dict[str, Any]]:
+        try:
+            async with self._host_slot(opportunity.source_url):
+                async with self.slots:
+                    started = time.perf_counter()
+                    try:
+                        result = await self.verifier.verify_opportunity(opportunity)
+                    except Exception as e:
+                        self.metrics.record(None, time.perf_counter() - started)
+                        self.errored[opportunity.id] = time.monotonic()
+                        logger.error(f"Error verifying opportunity {opportunity.id}: {e}")
+                        return None
+
+                    self.metrics.record(result['status'], time.perf_counter() - started)
+                    return result
+        finally:
+            self.pending.pop(opportunity.id, None)
+
+    def submit(self, opportunity) -> asyncio.Task:
+        """Start verifying an opportunity unless it is already in flight"""
+        task = self.pending.get(opportunity.id)
+        if task is None:
+            task = asyncio.create_task(self._verify(opportunity))
+            self.pending[opportunity.id] = task
+        return task
+
+    def excluded_ids(self) -> List[Any]:
+        """Ids not to fetch again yet: in flight, or recently raised"""
+        now = time.monotonic()
+        for opportunity_id in [i for i, t in self.errored.items() if now - t > ERROR_RETRY_DELAY]:
+            del self.errored[opportunity_id]
+        return list(self.pending) + list(self.errored)
+
+    async def verify_all(self, opportunities: Iterable[Any]) -> List[Dict[str, Any]]:
+        """Verify opportunities concurrently; results of those that didn't error"""
+        tasks = [self.submit(opportunity) for opportunity in opportunities]
+        results = await asyncio.gather(*tasks)
+        return [result for result in results if result is not None]
+
+    async def wait_for_capacity(self, low_water: int, timeout: Optional[float] = None):
+        """Wait until fewer than low_water opportunities are in flight"""
+        deadline = time.monotonic() + timeout if timeout is not None else None
+
+        while len(self.pending) >= low_water:
+            remaining = deadline - time.monotonic() if deadline is not None else None
+            if remaining is not None and remaining <= 0:
+                return
+            await asyncio.wait(list(self.pending.values()), timeout=remaining,
+                               return_when=asyncio.FIRST_COMPLETED)
+
+    async def drain(self):
+        """Wait for every in-flight verification to finish"""
+        if self.pending:
+            await asyncio.gather(*self.pending.values(), return_exceptions=True)
+
+    def cancel(self):
+        """Abandon in-flight verifications"""
+        for task in self.pending.values():
+            task.cancel()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        return self.metrics.to_dict(len(self.pending))
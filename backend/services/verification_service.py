@@ -1,21 +1,129 @@
+import os
 import asyncio
 import aiohttp
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from urllib.parse import urlparse
 import re
+import uuid
 from bs4 import BeautifulSoup
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update
+from sqlalchemy import select, update, values, column, Float, Boolean
+from sqlalchemy.dialects.postgresql import UUID
 from database.models import DonorOpportunity, OpportunityVerification
 from database.connection import get_db_session
+from services.count_estimator import count_estimator
+from services.near_duplicates import find_near_duplicates
+from services.page_cache import page_cache
+from services.relevance import content_relevance
+from services.verification_pipeline import VerificationPipeline
 
 logger = logging.getLogger(__name__)
 
+# Unverified opportunities fetched per query; the next query is issued
+# once half of them have finished
+VERIFY_BATCH_SIZE = int(os.getenv('VERIFY_BATCH_SIZE', '50'))
+# Wait between polls when nothing is waiting to be verified (seconds)
+VERIFY_IDLE_INTERVAL = int(os.getenv('VERIFY_IDLE_INTERVAL', '300'))
+# Verified opportunities buffered before their results are written
+VERIFY_WRITE_BATCH = int(os.getenv('VERIFY_WRITE_BATCH', '25'))
+
+class VerificationWriter:
+    """Buffers verification results and writes them in batches.
+
+    A flush is one session: a bulk insert of every check row into
+    opportunity_verifications and a single UPDATE ... FROM (VALUES ...)
+    carrying the scores back onto donor_opportunities.
+    """
+
+    def __init__(self, batch_size: int = VERIFY_WRITE_BATCH):
+        self.batch_size = batch_size
+        self.buffer: List[Tuple[uuid.UUID, Dict[str, Any], float, bool, datetime]] = []
+        self.lock = asyncio.Lock()
+        self.flushes = 0
+        self.rows_written = 0
+
+    def pending_ids(self) -> List[uuid.UUID]:
+        """Opportunities verified but not yet written"""
+        return [opportunity_id for opportunity_id, *_ in self.buffer]
+
+    async def add(self, opportunity_id: uuid.UUID, results: Dict[str, Any], score: float, is_verified: bool):
+        """Buffer one opportunity's results, flushing once the batch is full"""
+        self.buffer.append((opportunity_id, results, score, is_verified, datetime.utcnow()))
+
+        if len(self.buffer) >= self.batch_size:
+            try:
+                await self.flush()
+            except Exception as e:
+                # The batch stays buffered and goes out with the next flush
+                logger.error(f"Error writing verification results: {e}")
+
+    async def flush(self) -> int:
+        """Write everything buffered; returns the number of opportunities written"""
+        async with self.lock:
+            batch, self.buffer = self.buffer, []
+            if not batch:
+                return 0
+
+            checks = [
+                {
+                    'opportunity_id': opportunity_id,
+                    'verification_type': check_type,
+                    'status': result.get('status', 'unknown'),
+                    'score': result.get('score', 0.0),
+                    'details': result,
+                    'verified_at': verified_at,
+                    'verified_by': 'verification_service'
+                }
+                for opportunity_id, results, _score, _is_verified, verified_at in batch
+                for check_type, result in results.items()
+            ]
+
+            scores = values(
+                column('id', UUID(as_uuid=True)),
+                column('score', Float),
+                column('is_verified', Boolean),
+                column('verified_at', DonorOpportunity.last_verified.type),
+                name='scores'
+            ).data([
+                (opportunity_id, score, is_verified, verified_at)
+                for opportunity_id, _results, score, is_verified, verified_at in batch
+            ])
+
+            try:
+                async with get_db_session() as session:
+                    await session.execute(OpportunityVerification.__table__.insert(), checks)
+                    await session.execute(
+                        update(DonorOpportunity.__table__)
+                        .where(DonorOpportunity.id == scores.c.id)
+                        .values(
+                            verification_score=scores.c.score,
+                            is_verified=scores.c.is_verified,
+                            last_verified=scores.c.verified_at
+                        )
+                    )
+                    await session.commit()
+            except Exception:
+                self.buffer[:0] = batch
+                raise
+
+            self.flushes += 1
+            self.rows_written += len(batch)
+            return len(batch)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        return {
+            'buffered': len(self.buffer),
+            'flushes': self.flushes,
+            'written': self.rows_written,
+            'avg_batch': round(self.rows_written / self.flushes, 1) if self.flushes else 0.0,
+        }
+
 class OpportunityVerifier:
     def __init__(self):
         self.session: Optional[aiohttp.ClientSession] = None
+        self.writer = VerificationWriter()
         
     async def start_session(self):
         """Initialize HTTP session"""
@@ -46,11 +154,8 @@ class OpportunityVerifier:
         # Determine verification status
         status = 'verified' if overall_score >= 0.7 else 'failed'
         
-        # Save verification results
-        await self._save_verification(opportunity.id, verification_results, overall_score, status)
-        
-        # Update opportunity verification status
-        await self._update_opportunity_verification(opportunity.id, overall_score, status == 'verified')
+        # Save results and verification status with the next batch
+        await self.writer.add(opportunity.id, verification_results, overall_score, status == 'verified')
         
         return {
             'opportunity_id': str(opportunity.id),
@@ -70,19 +175,41 @@ class OpportunityVerifier:
             if not parsed.scheme or not parsed.netloc:
                 return {'score': 0.0, 'status': 'failed', 'reason': 'Invalid URL format'}
             
-            # Check if URL is accessible
-            async with self.session.get(opportunity.source_url) as response:
-                if response.status == 200:
+            url = opportunity.source_url
+            cached = await page_cache.get(url)
+            
+            # The bot (or an earlier verification) fetched this page recently
+            if cached and cached.is_fresh():
+                content = await page_cache.text(cached)
+                if content is not None:
+                    return self._url_result(content, cached.body_hash, opportunity, 200, cached=True)
+            
+            # Content is on disk already; only reachability needs checking
+            if cached:
+                async with self.session.head(url, allow_redirects=True) as response:
+                    if response.status not in (405, 501):
+                        if response.status != 200:
+                            return {'score': 0.2, 'status': 'failed', 'reason': f'HTTP {response.status}'}
+                        if cached.matches(response.headers):
+                            content = await page_cache.revalidated(cached)
+                            if content is not None:
+                                return self._url_result(content, cached.body_hash, opportunity, response.status,
+                                                        cached=True)
+            
+            # Download the page, conditionally if there is an old copy
+            headers = cached.conditional_headers() if cached else {}
+            async with self.session.get(url, headers=headers) as response:
+                if response.status == 304 and cached:
+                    content = await page_cache.revalidated(cached)
+                    if content is not None:
+                        return self._url_result(content, cached.body_hash, opportunity, 200, cached=True)
+                    return {'score': 0.8, 'status': 'verified', 'reason': 'Not modified since last check'}
+                elif response.status == 200:
                     # Check if content is relevant
                     content = await response.text()
-                    relevance_score = self._check_content_relevance(content, opportunity.title)
-                    
-                    return {
-                        'score': min(1.0, 0.7 + relevance_score * 0.3),
-                        'status': 'verified',
-                        'response_code': response.status,
-                        'relevance_score': relevance_score
-                    }
+                    page = await page_cache.put(url, content, response.headers.get('ETag'),
+                                                response.headers.get('Last-Modified'))
+                    return self._url_result(content, page.body_hash, opportunity, response.status)
                 elif response.status in [301, 302, 303, 307, 308]:
                     return {'score': 0.8, 'status': 'verified', 'reason': 'Redirected but accessible'}
                 else:
@@ -93,29 +220,18 @@ class OpportunityVerifier:
         except Exception as e:
             return {'score': 0.0, 'status': 'failed', 'reason': str(e)}
     
-    def _check_content_relevance(self, content: str, title: str) -> float:
-        """Check if page content is relevant to the opportunity"""
-        if not content or not title:
-            return 0.0
-        
-        # Convert to lowercase for comparison
-        content_lower = content.lower()
-        title_words = title.lower().split()
-        
-        # Check for funding-related keywords
-        funding_keywords = [
-            'grant', 'funding', 'opportunity', 'application', 'proposal',
-            'award', 'fellowship', 'scholarship', 'call', 'tender'
-        ]
-        
-        keyword_matches = sum(1 for keyword in funding_keywords if keyword in content_lower)
-        title_matches = sum(1 for word in title_words if len(word) > 3 and word in content_lower)
+    def _url_result(self, content: str, body_hash: str, opportunity: DonorOpportunity, status: int,
+                    cached: bool = False) -> Dict[str, Any]:
+        """URL check result for a reachable page"""
+        relevance_score = content_relevance(content, opportunity.title, body_hash)
         
-        # Calculate relevance score
-        keyword_score = min(1.0, keyword_matches / len(funding_keywords))
-        title_score = min(1.0, title_matches / max(1, len([w for w in title_words if len(w) > 3])))
-        
-        return (keyword_score + title_score) / 2
+        return {
+            'score': min(1.0, 0.7 + relevance_score * 0.3),
+            'status': 'verified',
+            'response_code': status,
+            'relevance_score': relevance_score,
+            'cached': cached
+        }
     
     async def _analyze_content(self, opportunity: DonorOpportunity) -> Dict[str, Any]:
         """Analyze opportunity content for quality and completeness"""
@@ -190,107 +306,66 @@ class OpportunityVerifier:
             return {'score': 1.0, 'status': 'verified', 'days_remaining': days_until_deadline}
     
     async def _check_duplicates(self, opportunity: DonorOpportunity) -> Dict[str, Any]:
-        """Check for duplicate opportunities"""
+        """Check for duplicate opportunities, including reposts on other sources"""
         async with get_db_session() as session:
-            # Check for exact title matches from same source
-            exact_matches = await session.execute(
-                select(DonorOpportunity).where(
-                    DonorOpportunity.title == opportunity.title,
-                    DonorOpportunity.source_name == opportunity.source_name,
-                    DonorOpportunity.id != opportunity.id
-                )
-            )
-            
-            exact_count = len(exact_matches.all())
-            
-            if exact_count > 0:
-                return {'score': 0.0, 'status': 'failed', 'reason': 'Exact duplicate found'}
-            
-            # Check for similar titles
-            similar_matches = await session.execute(
-                select(DonorOpportunity).where(
-                    DonorOpportunity.source_name == opportunity.source_name,
-                    DonorOpportunity.id != opportunity.id
-                )
-            )
-            
-            similar_opps = similar_matches.scalars().all()
-            
-            for opp in similar_opps:
-                similarity = self._calculate_title_similarity(opportunity.title, opp.title)
-                if similarity > 0.8:
-                    return {
-                        'score': 0.2, 
-                        'status': 'warning', 
-                        'reason': 'Similar opportunity exists',
-                        'similarity': similarity,
-                        'similar_id': str(opp.id)
-                    }
-            
-            return {'score': 1.0, 'status': 'verified', 'reason': 'No duplicates found'}
-    
-    def _calculate_title_similarity(self, title1: str, title2: str) -> float:
-        """Calculate similarity between two titles"""
-        if not title1 or not title2:
-            return 0.0
-        
-        # Normalize titles
-        t1 = title1.lower()
-        t2 = title2.lower()
-        
-        # Remove common words
-        common_words = {'the', 'and', 'for', 'in', 'on', 'of', 'to', 'a', 'an'}
-        t1_words = [w for w in t1.split() if w not in common_words]
-        t2_words = [w for w in t2.split() if w not in common_words]
+            matches = await find_near_duplicates(session, opportunity)
         
-        # Count matching words
-        matches = sum(1 for w in t1_words if w in t2_words)
+        if not matches:
+            return {'score': 1.0, 'status': 'verified', 'reason': 'No duplicates found'}
         
-        # Calculate similarity
-        if not t1_words or not t2_words:
-            return 0.0
+        # Check for exact title matches from same source
+        for _, (_, title, source_name) in matches:
+            if source_name == opportunity.source_name and title == opportunity.title:
+                return {'score': 0.0, 'status': 'failed', 'reason': 'Exact duplicate found'}
         
-        return matches / max(len(t1_words), len(t2_words))
-    
-    async def _save_verification(self, opportunity_id: uuid.UUID, results: Dict[str, Any], 
-                                score: float, status: str):
-        """Save verification results to database"""
-        async with get_db_session() as session:
-            for check_type, result in results.items():
-                verification = OpportunityVerification(
-                    opportunity_id=opportunity_id,
-                    verification_type=check_type,
-                    status=result.get('status', 'unknown'),
-                    score=result.get('score', 0.0),
-                    details=result,
-                    verified_at=datetime.utcnow(),
-                    verified_by='verification_service'
-                )
-                
-                session.add(verification)
-            
-            await session.commit()
-    
-    async def _update_opportunity_verification(self, opportunity_id: uuid.UUID, 
-                                             score: float, is_verified: bool):
-        """Update opportunity verification status"""
-        async with get_db_session() as session:
-            await session.execute(
-                update(DonorOpportunity)
-                .where(DonorOpportunity.id == opportunity_id)
-                .values(
-                    verification_score=score,
-                    is_verified=is_verified,
-                    last_verified=datetime.utcnow()
-                )
-            )
-            
-            await session.commit()
+        similarity, (similar_id, _, similar_source) = matches[0]
+        return {
+            'score': 0.2, 
+            'status': 'warning', 
+            'reason': 'Similar opportunity exists',
+            'similarity': similarity,
+            'similar_id': str(similar_id),
+            'similar_source': similar_source,
+            'cross_source': similar_source != opportunity.source_name
+        }
 
 class VerificationService:
     def __init__(self):
         self.verifier = OpportunityVerifier()
+        self.pipeline = VerificationPipeline(self.verifier)
         self.running = False
+        self.last_batch_at: Optional[datetime] = None
+        self.last_batch_size = 0
+    
+    async def fetch_unverified(self, limit: int = VERIFY_BATCH_SIZE) -> List[DonorOpportunity]:
+        """Next unverified opportunities not already in the pipeline; also refreshes the backlog metric"""
+        # last_verified is set by every written result, whatever it scored; a
+        # zero score can't mark "not yet checked" since failed checks score 0.0
+        unverified = select(DonorOpportunity).where(DonorOpportunity.last_verified.is_(None))
+        
+        # Write finished results first so they aren't fetched again
+        try:
+            await self.verifier.writer.flush()
+        except Exception as e:
+            logger.error(f"Error writing verification results: {e}")
+        
+        async with get_db_session() as session:
+            stmt = unverified
+            excluded = self.pipeline.excluded_ids() + self.verifier.writer.pending_ids()
+            if excluded:
+                stmt = stmt.where(DonorOpportunity.id.notin_(excluded))
+            
+            result = await session.execute(stmt.limit(limit))
+            opportunities = result.scalars().all()
+            
+            backlog = await count_estimator.estimate(session, unverified, ('verification_backlog',))
+            if backlog is None:
+                backlog = await count_estimator.exact_count(session, unverified)
+            self.pipeline.metrics.backlog = backlog
+        
+        self.last_batch_at = datetime.utcnow()
+        self.last_batch_size = len(opportunities)
+        return opportunities
     
     async def start(self):
         """Start verification service"""
@@ -301,41 +376,45 @@ class VerificationService:
         
         while self.running:
             try:
-                # Get unverified opportunities
-                async with get_db_session() as session:
-                    unverified = await session.execute(
-                        select(DonorOpportunity)
-                        .where(
-                            DonorOpportunity.is_verified == False,
-                            DonorOpportunity.verification_score == 0.0
-                        )
-                        .limit(50)
-                    )
-                    
-                    opportunities = unverified.scalars().all()
+                opportunities = await self.fetch_unverified()
                 
                 if opportunities:
                     logger.info(f"Verifying {len(opportunities)} opportunities")
-                    
-                    # Verify each opportunity
                     for opp in opportunities:
-                        try:
-                            await self.verifier.verify_opportunity(opp)
-                            # Rate limiting
-                            await asyncio.sleep(1)
-                        except Exception as e:
-                            logger.error(f"Error verifying opportunity {opp.id}: {e}")
-                
-                # Wait before next batch
-                await asyncio.sleep(300)  # 5 minutes
+                        self.pipeline.submit(opp)
+                    
+                    # Top the pipeline up once half the batch has finished
+                    await self.pipeline.wait_for_capacity(max(1, VERIFY_BATCH_SIZE // 2))
+                elif self.pipeline.pending:
+                    await self.pipeline.drain()
+                    await self.verifier.writer.flush()
+                else:
+                    # Nothing to verify; wait before polling again
+                    await asyncio.sleep(VERIFY_IDLE_INTERVAL)
                 
             except Exception as e:
                 logger.error(f"Error in verification service: {e}")
                 await asyncio.sleep(60)
     
+    async def get_status(self) -> Dict[str, Any]:
+        """Snapshot published to the worker lease for the API to read"""
+        return {
+            'running': self.running,
+            'last_batch_at': self.last_batch_at.isoformat() if self.last_batch_at else None,
+            'last_batch_size': self.last_batch_size,
+            'pipeline': self.pipeline.get_statistics(),
+            'writer': self.verifier.writer.get_statistics(),
+            'page_cache': page_cache.get_statistics()
+        }
+    
     async def stop(self):
         """Stop verification service"""
         self.running = False
+        self.pipeline.cancel()
+        try:
+            await self.verifier.writer.flush()
+        except Exception as e:
+            logger.error(f"Error writing verification results: {e}")
         await self.verifier.close_session()
         logger.info("Verification service stopped")
 
@@ -0,0 +1,146 @@
+import os
+import uuid
+import socket
+import logging
+from datetime import timedelta
+from typing import Any, Dict, Optional
+from sqlalchemy import select, update, or_, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from database.models import WorkerLease as WorkerLeaseModel
+from database.connection import get_db_session
+
+logger = logging.getLogger(__name__)
+
+# A lease not renewed within this many seconds can be taken over by a standby worker
+LEASE_TTL = int(os.getenv('WORKER_LEASE_TTL', '60'))
+
+class WorkerLease:
+    """Time-limited exclusive ownership of a named component, stored in worker_leases.
+
+    Acquiring is a single upsert that only succeeds if the row is missing,
+    expired, or already ours, so at most one worker holds a name at a time.
+    The holder renews the lease every heartbeat and publishes a status
+    snapshot alongside it.
+    """
+
+    def __init__(self, name: str, ttl: int = LEASE_TTL):
+        self.name = name
+        self.ttl = ttl
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.held = False
+
+    def _expiry(self):
+        return func.now() + timedelta(seconds=self.ttl)
+
+    async def try_acquire(self, status: Optional[Dict[str, Any]] = None) -> bool:
+        """Take the lease if nobody holds it; True if we hold it afterwards"""
+        stmt = pg_insert(WorkerLeaseModel).values(
+            name=self.name,
+            holder=self.holder,
+            acquired_at=func.now(),
+            heartbeat_at=func.now(),
+            expires_at=self._expiry(),
+            status=status
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[WorkerLeaseModel.name],
+            set_={
+                'holder': stmt.excluded.holder,
+                'acquired_at': func.now(),
+                'heartbeat_at': func.now(),
+                'expires_at': stmt.excluded.expires_at,
+                'status': stmt.excluded.status,
+            },
+            where=or_(
+                WorkerLeaseModel.expires_at < func.now(),
+                WorkerLeaseModel.holder == self.holder
+            )
+        ).returning(WorkerLeaseModel.holder)
+
+        try:
+            async with get_db_session() as session:
+                result = await session.execute(stmt)
+                await session.commit()
+                self.held = result.scalar() == self.holder
+        except Exception as e:
+            logger.error(f"Error acquiring lease {self.name}: {e}")
+            self.held = False
+
+        return self.held
+
+    async def renew(self, status: Optional[Dict[str, Any]] = None) -> bool:
+        """Extend the lease; False means it was lost and the component must stop"""
+        values = {'heartbeat_at': func.now(), 'expires_at': self._expiry()}
+        if status is not None:
+            values['status'] = status
+
+        try:
+            async with get_db_session() as session:
+                result = await session.execute(
+                    update(WorkerLeaseModel)
+                    .where(
+                        WorkerLeaseModel.name == self.name,
+                        WorkerLeaseModel.holder == self.holder
+                    )
+                    .values(**values)
+                    .returning(WorkerLeaseModel.name)
+                )
+                await session.commit()
+                self.held = result.scalar() is not None
+        except Exception as e:
+            # Can't confirm ownership; assume it's gone rather than risk two holders
+            logger.error(f"Error renewing lease {self.name}: {e}")
+            self.held = False
+
+        return self.held
+
+    async def release(self, status: Optional[Dict[str, Any]] = None):
+        """Expire the lease now so a standby can take over immediately"""
+        if not self.held:
+            return
+
+        values = {'expires_at': func.now()}
+        if status is not None:
+            values['status'] = status
+
+        try:
+            async with get_db_session() as session:
+                await session.execute(
+                    update(WorkerLeaseModel)
+                    .where(
+                        WorkerLeaseModel.name == self.name,
+                        WorkerLeaseModel.holder == self.holder
+                    )
+                    .values(**values)
+                )
+                await session.commit()
+        except Exception as e:
+            logger.error(f"Error releasing lease {self.name}: {e}")
+        finally:
+            self.held = False
+
+async def get_lease_states() -> Dict[str, Dict[str, Any]]:
+    """Holder, liveness and published status of every component, keyed by name"""
+    async with get_db_session() as session:
+        # Liveness is judged by the database clock, the same one leases are written with
+        result = await session.execute(
+            select(WorkerLeaseModel, (WorkerLeaseModel.expires_at > func.now()).label('running'))
+        )
+        rows = result.all()
+
+    return {
+        lease.name: {
+            'running': running,
+            'holder': lease.holder,
+            'acquired_at': lease.acquired_at.isoformat() if lease.acquired_at else None,
+            'heartbeat_at': lease.heartbeat_at.isoformat() if lease.heartbeat_at else None,
+            'status': lease.status or {}
+        }
+        for lease, running in rows
+    }
+
+async def get_lease_state(name: str) -> Dict[str, Any]:
+    """State of one component; not running if it never held a lease"""
+    states = await get_lease_states()
+    return states.get(name, {'running': False, 'holder': None, 'acquired_at': None,
+                             'heartbeat_at': None, 'status': {}})
@@ -0,0 +1,70 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Optional
+import aiohttp
+from celery.signals import worker_process_init, worker_process_shutdown
+from database.connection import engine, close_db
+from services.bot_manager import create_http_session
+from services.verification_service import verification_service, OpportunityVerifier
+
+logger = logging.getLogger(__name__)
+
+# One event loop per worker process, shared by every task it runs
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_http_session: Optional[aiohttp.ClientSession] = None
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """The worker's event loop, created on first use outside a prefork child"""
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_loop)
+    return _loop
+
+def run_async(coro: Awaitable[Any]) -> Any:
+    """Run a coroutine to completion on the worker's persistent loop"""
+    return get_loop().run_until_complete(coro)
+
+async def get_http_session() -> aiohttp.ClientSession:
+    """aiohttp session shared by all tasks in this worker process"""
+    global _http_session
+    if _http_session is None or _http_session.closed:
+        _http_session = create_http_session()
+    return _http_session
+
+async def get_verifier() -> OpportunityVerifier:
+    """The verifier, with its HTTP session opened once per worker process"""
+    verifier = verification_service.verifier
+    if verifier.session is None or verifier.session.closed:
+        await verifier.start_session()
+    return verifier
+
+async def _close_resources():
+    if _http_session and not _http_session.closed:
+        await _http_session.close()
+    await verification_service.verifier.writer.flush()
+    await verification_service.verifier.close_session()
+    await close_db()
+
+@worker_process_init.connect
+def start_worker_loop(**kwargs):
+    """Create the loop when a worker child starts"""
+    # Connections inherited from the parent across fork must not be reused
+    engine.sync_engine.dispose(close=False)
+    get_loop()
+    logger.info("Started persistent event loop for worker process")
+
+@worker_process_shutdown.connect
+def stop_worker_loop(**kwargs):
+    """Close shared sessions, the DB pool and the loop when a worker child exits"""
+    global _loop
+    if _loop is None or _loop.is_closed():
+        return
+
+    try:
+        _loop.run_until_complete(_close_resources())
+    except Exception as e:
+        logger.error(f"Error closing worker resources: {e}")
+    finally:
+        _loop.close()
+        _loop = None
@@ -24,6 +24,18 @@ app.conf.beat_schedule = {
         'task': 'tasks.maintenance_tasks.cleanup_old_opportunities',
         'schedule': crontab(day_of_week=0, hour=2, minute=0),  # Run at 2:00 AM every Sunday
     },
+    'index-near-duplicates': {
+        'task': 'tasks.maintenance_tasks.index_near_duplicates',
+        'schedule': crontab(minute=15),  # Run hourly until older rows are indexed
+    },
+    'embed-new-content': {
+        'task': 'tasks.embedding_tasks.embed_new_content',
+        'schedule': crontab(minute='*/15'),  # Run every 15 minutes; each run looks back 30
+    },
+    'refresh-match-scores': {
+        'task': 'tasks.dashboard_tasks.refresh_match_scores',
+        'schedule': crontab(minute='*/15'),  # Run every 15 minutes; only stale scores are recalculated
+    },
 }
 
 app.conf.timezone = 'UTC'
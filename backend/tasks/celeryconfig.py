@@ -23,6 +23,8 @@ task_routes = {
     'tasks.search_tasks.*': {'queue': 'search'},
     'tasks.verification_tasks.*': {'queue': 'verification'},
     'tasks.maintenance_tasks.*': {'queue': 'maintenance'},
+    'tasks.embedding_tasks.*': {'queue': 'embedding'},
+    'tasks.dashboard_tasks.*': {'queue': 'maintenance'},
 }
 
 # Task time limits
@@ -49,4 +51,6 @@ imports = (
     'tasks.search_tasks',
     'tasks.verification_tasks',
     'tasks.maintenance_tasks',
+    'tasks.embedding_tasks',
+    'tasks.dashboard_tasks',
 )
\ No newline at end of file
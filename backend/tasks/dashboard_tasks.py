@@ -0,0 +1,30 @@
+import logging
+from celery import shared_task
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+@shared_task
+def refresh_match_scores():
+    """Recalculate stale dashboard match scores for every user"""
+    logger.info("Starting match score refresh")
+    
+    try:
+        # Imported here so workers that never run this task don't open a dashboard engine
+        from app.services.dashboard_service import refresh_all_match_scores
+        
+        rescored = refresh_all_match_scores()
+        
+        return {
+            "status": "success",
+            "message": f"Refreshed {rescored} match scores",
+            "rescored_count": rescored,
+            "timestamp": datetime.utcnow().isoformat()
+        }
+    except Exception as e:
+        logger.error(f"Error in match score refresh task: {e}")
+        return {
+            "status": "error",
+            "message": f"Error in match score refresh task: {str(e)}",
+            "timestamp": datetime.utcnow().isoformat()
+        }
@@ -0,0 +1,44 @@
+import logging
+from celery import shared_task
+from services.embedding_store import embedding_store
+from tasks.async_runtime import run_async
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+@shared_task
+def embed_new_content(since_minutes: int = 30):
+    """Embed opportunities and donor calls that are new or changed recently"""
+    logger.info(f"Starting embedding of content changed in the last {since_minutes} minutes")
+    
+    try:
+        async def perform_embedding():
+            since = datetime.utcnow() - timedelta(minutes=since_minutes)
+            opportunities = await embedding_store.embed_pending_opportunities(since)
+            donor_calls = await embedding_store.embed_pending_donor_calls(since)
+            return opportunities, donor_calls
+        
+        if not embedding_store.available:
+            return {
+                "status": "skipped",
+                "message": "No embedding model installed",
+                "timestamp": datetime.utcnow().isoformat()
+            }
+        
+        opportunities, donor_calls = run_async(perform_embedding())
+        
+        return {
+            "status": "success",
+            "message": f"Embedded {opportunities} opportunities and {donor_calls} donor calls",
+            "opportunities": opportunities,
+            "donor_calls": donor_calls,
+            "store": embedding_store.get_statistics(),
+            "timestamp": datetime.utcnow().isoformat()
+        }
+    except Exception as e:
+        logger.error(f"Error in embedding task: {e}")
+        return {
+            "status": "error",
+            "message": f"Error in embedding task: {str(e)}",
+            "timestamp": datetime.utcnow().isoformat()
+        }
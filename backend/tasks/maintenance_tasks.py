@@ -1,10 +1,11 @@
-import asyncio
 import logging
 from celery import shared_task
 from services.bot_manager import bot_manager
 from database.models import DonorOpportunity, SearchStatistics
 from database.connection import get_db_session
-from sqlalchemy import delete, func, select
+from services.near_duplicates import backfill_near_duplicate_index
+from tasks.async_runtime import run_async
+from sqlalchemy import delete, func, select, Integer
 from datetime import datetime, timedelta
 
 logger = logging.getLogger(__name__)
@@ -14,10 +15,6 @@ def cleanup_old_opportunities(days: int = 180):
     """Remove opportunities older than specified days"""
     logger.info(f"Starting cleanup of opportunities older than {days} days")
     
-    # Run the async task in a new event loop
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    
     try:
         async def perform_cleanup():
             cutoff_date = datetime.utcnow() - timedelta(days=days)
@@ -36,7 +33,7 @@ def cleanup_old_opportunities(days: int = 180):
                 logger.info(f"Deleted {deleted_count} old opportunities")
                 return deleted_count
         
-        deleted_count = loop.run_until_complete(perform_cleanup())
+        deleted_count = run_async(perform_cleanup())
         
         return {
             "status": "success",
@@ -51,18 +48,12 @@ def cleanup_old_opportunities(days: int = 180):
             "message": f"Error in cleanup task: {str(e)}",
             "timestamp": datetime.utcnow().isoformat()
         }
-    finally:
-        loop.close()
 
 @shared_task
 def generate_search_statistics():
     """Generate statistics about search performance"""
     logger.info("Starting generation of search statistics")
     
-    # Run the async task in a new event loop
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    
     try:
         async def generate_stats():
             async with get_db_session() as session:
@@ -109,7 +100,7 @@ def generate_search_statistics():
                 
                 return len(stats_entries)
         
-        stats_count = loop.run_until_complete(generate_stats())
+        stats_count = run_async(generate_stats())
         
         return {
             "status": "success",
@@ -124,21 +115,15 @@ def generate_search_statistics():
             "message": f"Error in statistics generation task: {str(e)}",
             "timestamp": datetime.utcnow().isoformat()
         }
-    finally:
-        loop.close()
 
 @shared_task
 def update_bot_statistics():
     """Update statistics for all bots"""
     logger.info("Starting update of bot statistics")
     
-    # Run the async task in a new event loop
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    
     try:
         # Update bot statistics
-        loop.run_until_complete(bot_manager.get_bot_statistics())
+        run_async(bot_manager.get_bot_statistics())
         
         return {
             "status": "success",
@@ -152,5 +137,39 @@ def update_bot_statistics():
             "message": f"Error in bot statistics update task: {str(e)}",
             "timestamp": datetime.utcnow().isoformat()
         }
-    finally:
-        loop.close()
\ No newline at end of file
+
+@shared_task
+def index_near_duplicates(batch_size: int = 500, max_batches: int = 20):
+    """Store MinHash signatures for opportunities saved before the near-duplicate index"""
+    logger.info("Starting near-duplicate index backfill")
+    
+    try:
+        async def backfill():
+            indexed = 0
+            for _ in range(max_batches):
+                async with get_db_session() as session:
+                    count = await backfill_near_duplicate_index(session, batch_size)
+                    await session.commit()
+                
+                indexed += count
+                if count < batch_size:
+                    break
+            
+            return indexed
+        
+        indexed_count = run_async(backfill())
+        logger.info(f"Indexed {indexed_count} opportunities for near-duplicate detection")
+        
+        return {
+            "status": "success",
+            "message": f"Indexed {indexed_count} opportunities",
+            "indexed_count": indexed_count,
+            "timestamp": datetime.utcnow().isoformat()
+        }
+    except Exception as e:
+        logger.error(f"Error in near-duplicate index task: {e}")
+        return {
+            "status": "error",
+            "message": f"Error in near-duplicate index task: {str(e)}",
+            "timestamp": datetime.utcnow().isoformat()
+        }
@@ -1,40 +1,93 @@
-import asyncio
 import logging
-from celery import shared_task
-from services.bot_manager import bot_manager
+from dataclasses import asdict
+from typing import Any, Dict, List, Optional, Tuple
+from celery import shared_task, chord
+from services.bot_manager import bot_manager, bot_configs, SearchTarget
+from tasks.async_runtime import run_async, get_http_session
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+def _country_key(country: str) -> str:
+    return country.lower().replace(' ', '_')
+
+def _fan_out(bots: List[Tuple[str, str, List[SearchTarget]]], label: str,
+             query: Optional[str] = None) -> Dict[str, Any]:
+    """Queue one scrape_target task per target, summarized by a chord callback"""
+    signatures = [
+        scrape_target.s(bot_id, asdict(target), query)
+        for bot_id, _country, targets in bots
+        for target in sorted(targets, key=lambda t: t.priority, reverse=True)
+    ]
+    
+    if not signatures:
+        return {
+            "status": "success",
+            "message": f"No targets configured for {label}",
+            "targets_queued": 0,
+            "timestamp": datetime.utcnow().isoformat()
+        }
+    
+    result = chord(signatures)(summarize_search.s(label))
+    logger.info(f"{label} fanned out to {len(signatures)} target tasks")
+    
+    return {
+        "status": "success",
+        "message": f"{label} scheduled",
+        "targets_queued": len(signatures),
+        "summary_task_id": result.id,
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+# Fanned out one per target, so the default task rate limit would throttle
+# dispatch; politeness comes from the per-host limiter in BotManager.scrape_target
+@shared_task(rate_limit=None)
+def scrape_target(bot_id: str, target: Dict[str, Any], query: str = None):
+    """Fetch, parse and bulk-save a single search target"""
+    async def scrape():
+        session = await get_http_session()
+        return await bot_manager.scrape_target(bot_id, SearchTarget(**target), query, session=session)
+    
+    try:
+        return run_async(scrape())
+    except Exception as e:
+        # Report instead of raising so one bad target doesn't fail the whole chord
+        logger.error(f"Error scraping target {target.get('name')}: {e}")
+        return {
+            "target": target.get('name'),
+            "country": target.get('country'),
+            "found": 0,
+            "saved": 0,
+            "errors": [str(e)]
+        }
+
+@shared_task
+def summarize_search(results: List[Dict[str, Any]], label: str):
+    """Combine per-target results once every scrape in a sweep has finished"""
+    failed = [result['target'] for result in results if result.get('errors')]
+    summary = {
+        "status": "success",
+        "message": f"{label} completed",
+        "targets_searched": len(results),
+        "opportunities_found": sum(result['found'] for result in results),
+        "opportunities_saved": sum(result['saved'] for result in results),
+        "failed_targets": failed,
+        "timestamp": datetime.utcnow().isoformat()
+    }
+    
+    logger.info(
+        f"{label}: {summary['opportunities_saved']} new opportunities from "
+        f"{len(results)} targets ({len(failed)} with errors)"
+    )
+    return summary
+
 @shared_task
 def run_daily_search():
     """Run daily search across all bots"""
     logger.info("Starting daily search task")
     
-    # Run the async task in a new event loop
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    
     try:
-        # Run all bots
-        for bot_id, bot in bot_manager.bots.items():
-            logger.info(f"Triggering search for bot: {bot_id}")
-            
-            # Add all targets to the queue
-            for target in bot.targets:
-                bot_manager.scrapingQueue.append({"target": target})
-        
-        logger.info(f"Daily search scheduled with {len(bot_manager.scrapingQueue)} targets")
-        
-        # Update last run time
-        bot_manager.lastScrapingRun = datetime.utcnow()
-        
-        return {
-            "status": "success",
-            "message": "Daily search scheduled",
-            "targets_queued": len(bot_manager.scrapingQueue),
-            "timestamp": datetime.utcnow().isoformat()
-        }
+        return _fan_out(list(bot_configs().values()), "Daily search")
     except Exception as e:
         logger.error(f"Error in daily search task: {e}")
         return {
@@ -42,22 +95,15 @@ def run_daily_search():
             "message": f"Error in daily search task: {str(e)}",
             "timestamp": datetime.utcnow().isoformat()
         }
-    finally:
-        loop.close()
 
 @shared_task
 def search_specific_country(country: str, query: str = None):
     """Run search for a specific country"""
     logger.info(f"Starting search task for country: {country}")
     
-    # Run the async task in a new event loop
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    
     try:
         # Find bot for country
-        country_key = country.lower().replace(' ', '_')
-        bot = bot_manager.bots.get(country_key)
+        bot = bot_configs().get(_country_key(country))
         
         if not bot:
             logger.error(f"No bot found for country: {country}")
@@ -67,23 +113,7 @@ def search_specific_country(country: str, query: str = None):
                 "timestamp": datetime.utcnow().isoformat()
             }
         
-        # Add targets to queue
-        targets_queued = 0
-        for target in bot.targets:
-            if query:
-                bot_manager.scrapingQueue.append({"target": target, "query": query})
-            else:
-                bot_manager.scrapingQueue.append({"target": target})
-            targets_queued += 1
-        
-        logger.info(f"Search for {country} scheduled with {targets_queued} targets")
-        
-        return {
-            "status": "success",
-            "message": f"Search for {country} scheduled",
-            "targets_queued": targets_queued,
-            "timestamp": datetime.utcnow().isoformat()
-        }
+        return _fan_out([bot], f"Search for {country}", query)
     except Exception as e:
         logger.error(f"Error in country search task: {e}")
         return {
@@ -91,21 +121,14 @@ def search_specific_country(country: str, query: str = None):
             "message": f"Error in country search task: {str(e)}",
             "timestamp": datetime.utcnow().isoformat()
         }
-    finally:
-        loop.close()
 
 @shared_task
 def search_specific_url(url: str, country: str, source_name: str):
     """Run search for a specific URL"""
     logger.info(f"Starting search task for URL: {url}")
     
-    # Run the async task in a new event loop
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    
     try:
         # Create a temporary target
-        from services.bot_manager import SearchTarget
         target = SearchTarget(
             name=source_name,
             url=url,
@@ -116,14 +139,16 @@ def search_specific_url(url: str, country: str, source_name: str):
             priority=5
         )
         
-        # Add to queue
-        bot_manager.scrapingQueue.append({"target": target})
+        bot = bot_configs().get(_country_key(country))
+        bot_id = bot[0] if bot else f"{_country_key(country)}_bot"
         
+        result = scrape_target.delay(bot_id, asdict(target))
         logger.info(f"Search for URL {url} scheduled")
         
         return {
             "status": "success",
             "message": f"Search for URL {url} scheduled",
+            "task_id": result.id,
             "timestamp": datetime.utcnow().isoformat()
         }
     except Exception as e:
@@ -133,5 +158,3 @@ def search_specific_url(url: str, country: str, source_name: str):
             "message": f"Error in URL search task: {str(e)}",
             "timestamp": datetime.utcnow().isoformat()
         }
-    finally:
-        loop.close()
\ No newline at end of file
@@ -1,7 +1,7 @@
-import asyncio
 import logging
 from celery import shared_task
 from services.verification_service import verification_service
+from tasks.async_runtime import run_async, get_verifier
 from database.models import DonorOpportunity
 from database.connection import get_db_session
 from sqlalchemy import select
@@ -14,46 +14,28 @@ def verify_opportunities(limit: int = 50):
     """Verify a batch of unverified opportunities"""
     logger.info(f"Starting verification task for up to {limit} opportunities")
     
-    # Run the async task in a new event loop
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    
     try:
-        # Get unverified opportunities
         async def get_and_verify():
-            async with get_db_session() as session:
-                # Get unverified opportunities
-                result = await session.execute(
-                    select(DonorOpportunity)
-                    .where(
-                        DonorOpportunity.is_verified == False,
-                        DonorOpportunity.verification_score == 0.0
-                    )
-                    .limit(limit)
-                )
-                
-                opportunities = result.scalars().all()
-                logger.info(f"Found {len(opportunities)} unverified opportunities")
-                
-                # Verify each opportunity
-                verified_count = 0
-                for opp in opportunities:
-                    try:
-                        await verification_service.verifier.verify_opportunity(opp)
-                        verified_count += 1
-                        # Add small delay to avoid overwhelming resources
-                        await asyncio.sleep(1)
-                    except Exception as e:
-                        logger.error(f"Error verifying opportunity {opp.id}: {e}")
-                
-                return verified_count
+            # Opens the verifier's worker-lifetime session if needed
+            await get_verifier()
+            
+            # Get unverified opportunities
+            opportunities = await verification_service.fetch_unverified(limit)
+            logger.info(f"Found {len(opportunities)} unverified opportunities")
+            
+            # Verify them concurrently under per-host limits
+            results = await verification_service.pipeline.verify_all(opportunities)
+            await verification_service.verifier.writer.flush()
+            return len(results)
         
-        verified_count = loop.run_until_complete(get_and_verify())
+        verified_count = run_async(get_and_verify())
         
         return {
             "status": "success",
             "message": f"Verified {verified_count} opportunities",
             "opportunities_processed": verified_count,
+            "pipeline": verification_service.pipeline.get_statistics(),
+            "writer": verification_service.verifier.writer.get_statistics(),
             "timestamp": datetime.utcnow().isoformat()
         }
     except Exception as e:
@@ -63,21 +45,17 @@ def verify_opportunities(limit: int = 50):
             "message": f"Error in verification task: {str(e)}",
             "timestamp": datetime.utcnow().isoformat()
         }
-    finally:
-        loop.close()
 
 @shared_task
 def verify_specific_opportunity(opportunity_id: str):
     """Verify a specific opportunity by ID"""
     logger.info(f"Starting verification task for opportunity: {opportunity_id}")
     
-    # Run the async task in a new event loop
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    
     try:
         # Get and verify the opportunity
         async def get_and_verify_one():
+            verifier = await get_verifier()
+            
             async with get_db_session() as session:
                 # Get the opportunity
                 result = await session.execute(
@@ -91,10 +69,12 @@ def verify_specific_opportunity(opportunity_id: str):
                     return None
                 
                 # Verify the opportunity
-                verification_result = await verification_service.verifier.verify_opportunity(opportunity)
-                return verification_result
+                verification_result = await verifier.verify_opportunity(opportunity)
+            
+            await verifier.writer.flush()
+            return verification_result
         
-        verification_result = loop.run_until_complete(get_and_verify_one())
+        verification_result = run_async(get_and_verify_one())
         
         if verification_result:
             return {
@@ -115,6 +95,4 @@ def verify_specific_opportunity(opportunity_id: str):
             "status": "error",
             "message": f"Error in specific verification task: {str(e)}",
             "timestamp": datetime.utcnow().isoformat()
-        }
-    finally:
-        loop.close()
\ No newline at end of file
+        }
\ No newline at end of file
@@ -0,0 +1,4 @@
+import os
+
+# The dashboard app builds its engine at import; tests use an in-memory database
+os.environ.setdefault("DATABASE_URL", "sqlite://")
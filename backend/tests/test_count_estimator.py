@@ -0,0 +1,47 @@
+import asyncio
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from database.models import DonorOpportunity
+from services.count_estimator import CountEstimator, Explain
+from services.search_index import apply_full_text_search
+
+class RecordingSession:
+    """Stands in for an AsyncSession: compiles what it is given and returns a fixed plan"""
+
+    def __init__(self, plan_rows: int):
+        self.plan_rows = plan_rows
+        self.compiled = None
+
+    async def execute(self, statement):
+        self.compiled = statement.compile(dialect=postgresql.dialect())
+        return self
+
+    def scalar(self):
+        return [{'Plan': {'Plan Rows': self.plan_rows}}]
+
+def search_statement(query: str):
+    stmt, _ = apply_full_text_search(select(DonorOpportunity), query)
+    return stmt
+
+def test_explain_keeps_colon_terms_as_bound_parameters():
+    compiled = Explain(search_statement('health:care a:b')).compile(dialect=postgresql.dialect())
+
+    assert str(compiled).startswith('EXPLAIN (FORMAT JSON) SELECT')
+    assert 'health:care a:b' not in str(compiled)
+    assert 'health:care a:b' in compiled.params.values()
+
+def test_estimate_with_colon_in_query_uses_planner_rows():
+    session = RecordingSession(plan_rows=50000)
+    estimator = CountEstimator(threshold=10000)
+
+    estimate = asyncio.run(estimator.estimate(session, search_statement('health:care'), ('health:care',)))
+
+    assert estimate == 50000
+    assert 'health:care' in session.compiled.params.values()
+    assert estimator.cached(('health:care',)) == 50000
+
+def test_estimate_below_threshold_asks_for_exact_count():
+    session = RecordingSession(plan_rows=12)
+    estimator = CountEstimator(threshold=10000)
+
+    assert asyncio.run(estimator.estimate(session, search_statement('grants'), ('grants',))) is None
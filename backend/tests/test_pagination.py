@@ -0,0 +1,51 @@
+import uuid
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from database.models import DonorOpportunity
+from services.pagination import apply_opportunity_cursor, encode_opportunity_cursor, SCRAPED_AT_FLOOR
+from app.models.dashboard import Base as DashboardBase, Opportunity, OpportunityType
+from app.schemas.dashboard import OpportunitySearch
+from app.services.dashboard_service import DashboardService
+
+def dashboard_session():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    DashboardBase.metadata.create_all(engine)
+    return sessionmaker(bind=engine)()
+
+def test_dashboard_cursor_pages_past_null_posted_dates():
+    db = dashboard_session()
+    start = datetime(2025, 6, 1)
+    for i in range(7):
+        db.add(Opportunity(
+            title=f"Opportunity {i}",
+            opportunity_type=OpportunityType.GRANT,
+            posted_date=None if i % 2 else start + timedelta(days=i),
+            is_active=True
+        ))
+    db.commit()
+
+    service = DashboardService(db)
+    seen, cursor = [], None
+    for _ in range(10):
+        page = service.search_opportunities(OpportunitySearch(limit=2, cursor=cursor))
+        seen.extend(opportunity.id for opportunity in page["opportunities"])
+        cursor = page["next_cursor"]
+        if not page["has_more"]:
+            break
+
+    assert sorted(seen) == list(range(1, 8))
+    assert len(seen) == len(set(seen))
+
+def test_search_cursor_for_null_scraped_at():
+    opportunity = DonorOpportunity(id=uuid.uuid4(), scraped_at=None)
+
+    cursor = encode_opportunity_cursor(opportunity)
+
+    assert cursor is not None
+    stmt = apply_opportunity_cursor(select(DonorOpportunity), cursor)
+    compiled = stmt.compile(dialect=postgresql.dialect())
+    assert "coalesce(donor_opportunities.scraped_at" in str(compiled)
+    assert SCRAPED_AT_FLOOR in compiled.params.values()
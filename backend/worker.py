@@ -0,0 +1,101 @@
+"""Background worker for the bot system and the opportunity verifier.
+
+Runs outside the API process. Each component is guarded by a lease in
+worker_leases, so any number of workers can be started: one runs each
+component and the others wait on standby to take over if it stops
+heartbeating.
+
+    python worker.py            # bots and verifier
+    python worker.py bots
+    python worker.py verifier
+"""
+import asyncio
+import signal
+import logging
+import argparse
+from typing import Any, Awaitable, Callable, Dict
+from database.connection import create_tables, close_db
+from services.bot_manager import bot_manager, start_bot_system, stop_bot_system
+from services.verification_service import verification_service, start_verification_service, stop_verification_service
+from services.worker_lease import WorkerLease, LEASE_TTL
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+)
+logger = logging.getLogger(__name__)
+
+# Renew well inside the TTL so one slow heartbeat doesn't hand the lease away
+HEARTBEAT_INTERVAL = max(1, LEASE_TTL // 3)
+
+COMPONENTS = {
+    'bots': ('bot_manager', start_bot_system, stop_bot_system, bot_manager.get_status),
+    'verifier': ('verification_service', start_verification_service, stop_verification_service,
+                 verification_service.get_status),
+}
+
+async def _wait(event: asyncio.Event, timeout: float) -> bool:
+    """Wait for event up to timeout seconds; True if it was set"""
+    try:
+        await asyncio.wait_for(event.wait(), timeout)
+        return True
+    except asyncio.TimeoutError:
+        return False
+
+async def run_component(name: str, start: Callable[[], Awaitable[Any]], stop: Callable[[], Awaitable[Any]],
+                        status: Callable[[], Awaitable[Dict[str, Any]]], shutdown: asyncio.Event):
+    """Run a component while holding its lease, standing by whenever another worker holds it"""
+    lease = WorkerLease(name)
+
+    while not shutdown.is_set():
+        if not await lease.try_acquire():
+            logger.info(f"{name} is held by another worker, standing by")
+            await _wait(shutdown, HEARTBEAT_INTERVAL)
+            continue
+
+        logger.info(f"Acquired lease for {name} as {lease.holder}")
+        task = asyncio.create_task(start())
+
+        try:
+            while not task.done():
+                if await _wait(shutdown, HEARTBEAT_INTERVAL):
+                    break
+                if not await lease.renew(await status()):
+                    logger.warning(f"Lost lease for {name}, stopping it")
+                    break
+
+            if task.done() and not task.cancelled() and task.exception():
+                logger.error(f"{name} exited with an error: {task.exception()}")
+        finally:
+            await stop()
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            await lease.release(await status())
+
+        if not shutdown.is_set():
+            # Crashed or lost the lease; give other workers a chance first
+            await _wait(shutdown, HEARTBEAT_INTERVAL)
+
+async def main(components):
+    shutdown = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, shutdown.set)
+
+    await create_tables()
+
+    try:
+        await asyncio.gather(*(
+            run_component(*COMPONENTS[component], shutdown) for component in components
+        ))
+    finally:
+        await close_db()
+        logger.info("Worker stopped")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Granada background worker")
+    parser.add_argument('components', nargs='*', choices=sorted(COMPONENTS),
+                        help="components to run (default: all)")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.components or sorted(COMPONENTS)))
@@ -0,0 +1,27 @@
+/*
+  # Full-text search for donor opportunities
+
+  1. Columns
+    - `donor_opportunities.search_vector` - weighted tsvector over title (A),
+      keywords and focus areas (B) and description (C)
+
+  2. Backfill
+    - Populate `search_vector` for rows scraped before this migration.
+      New rows get their vector from the bot manager at insert time.
+
+  3. Indexes
+    - GIN index on `search_vector` so `@@` lookups replace ILIKE scans
+*/
+
+ALTER TABLE donor_opportunities ADD COLUMN IF NOT EXISTS search_vector tsvector;
+
+UPDATE donor_opportunities
+SET search_vector =
+    setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce(keywords, '[]'::jsonb)), 'B') ||
+    setweight(to_tsvector('english', coalesce(focus_areas, '[]'::jsonb)), 'B') ||
+    setweight(to_tsvector('english', coalesce(description, '')), 'C')
+WHERE search_vector IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_donor_opportunities_search_vector
+    ON donor_opportunities USING gin(search_vector);
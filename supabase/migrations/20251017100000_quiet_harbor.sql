@@ -0,0 +1,24 @@
+/*
+  # Worker leases for the bot system and verifier
+
+  1. New Tables
+    - `worker_leases` - one row per singleton background component
+      (`bot_manager`, `verification_service`). The worker holding an
+      unexpired lease is the only one running that component; it renews
+      `expires_at` on every heartbeat and publishes its state in `status`
+      for the API to read.
+
+  2. Security
+    - Enable RLS; only the service role writes leases
+*/
+
+CREATE TABLE IF NOT EXISTS worker_leases (
+    name text PRIMARY KEY,
+    holder text NOT NULL,
+    acquired_at timestamptz DEFAULT now(),
+    heartbeat_at timestamptz DEFAULT now(),
+    expires_at timestamptz NOT NULL,
+    status jsonb
+);
+
+ALTER TABLE worker_leases ENABLE ROW LEVEL SECURITY;
@@ -0,0 +1,25 @@
+/*
+  # Near-duplicate index for donor opportunities
+
+  1. Columns
+    - `donor_opportunities.minhash` - 128 x uint32 MinHash signature of the
+      title+description word 3-shingles
+    - `donor_opportunities.lsh_buckets` - one bigint key per LSH band
+      (32 bands of 4 signature values); two opportunities sharing any key
+      are near-duplicate candidates
+
+  2. Backfill
+    - Signatures are computed in Python. The bot manager stores them at
+      insert time; the `index_near_duplicates` maintenance task fills in
+      rows scraped before this migration.
+
+  3. Indexes
+    - GIN index on `lsh_buckets` so `&&` candidate lookups read only
+      rows sharing a band instead of every row from the same source
+*/
+
+ALTER TABLE donor_opportunities ADD COLUMN IF NOT EXISTS minhash bytea;
+ALTER TABLE donor_opportunities ADD COLUMN IF NOT EXISTS lsh_buckets bigint[];
+
+CREATE INDEX IF NOT EXISTS idx_donor_opportunities_lsh_buckets
+    ON donor_opportunities USING gin(lsh_buckets);
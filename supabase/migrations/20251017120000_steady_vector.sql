@@ -0,0 +1,39 @@
+/*
+  # Persistent embedding cache
+
+  1. New Tables
+    - `embedding_cache`
+      - `content_hash` (text, primary key) - sha1 of the model name and the
+        embedded text, so identical text is encoded once per model
+      - `model` (text) - sentence-transformers model that produced the vector
+      - `dimensions` (integer)
+      - `vector` (bytea) - L2-normalised vector, float16 by default
+      - `created_at` (timestamptz)
+
+  2. Columns
+    - `donor_opportunities.embedding_hash` and `donor_calls.embedding_hash` -
+      the `embedding_cache` key of each row's current text, set by the
+      `embed_new_content` task. Rows with no key are picked up on its next run.
+
+  3. Security
+    - Enable RLS on `embedding_cache`
+*/
+
+CREATE TABLE IF NOT EXISTS embedding_cache (
+    content_hash varchar(40) PRIMARY KEY,
+    model varchar(100) NOT NULL,
+    dimensions integer NOT NULL,
+    vector bytea NOT NULL,
+    created_at timestamptz DEFAULT now()
+);
+
+ALTER TABLE donor_opportunities ADD COLUMN IF NOT EXISTS embedding_hash varchar(40);
+ALTER TABLE donor_calls ADD COLUMN IF NOT EXISTS embedding_hash varchar(40);
+
+-- The batch job looks for rows that have never been embedded
+CREATE INDEX IF NOT EXISTS idx_donor_opportunities_unembedded
+    ON donor_opportunities(id) WHERE embedding_hash IS NULL;
+CREATE INDEX IF NOT EXISTS idx_donor_calls_unembedded
+    ON donor_calls(id) WHERE embedding_hash IS NULL;
+
+ALTER TABLE embedding_cache ENABLE ROW LEVEL SECURITY;
@@ -0,0 +1,46 @@
+/*
+  # Keep donor opportunity search vectors current in the database
+
+  1. Functions
+    - `donor_opportunities_search_vector()` - computes the weighted tsvector
+      over title (A), keywords and focus areas (B) and description (C)
+
+  2. Triggers
+    - `donor_opportunities_search_vector_update` - BEFORE INSERT OR UPDATE
+      of the indexed columns, so rows from every writer (bot manager, the
+      scrape-donor edge function, manual edits) get a vector that follows
+      their text. The bot manager no longer computes it.
+
+  3. Backfill
+    - Recompute `search_vector` for every row, including rows inserted or
+      edited without one since the full-text search migration
+*/
+
+CREATE OR REPLACE FUNCTION donor_opportunities_search_vector()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(NEW.keywords, '[]'::jsonb)), 'B') ||
+        setweight(to_tsvector('english', coalesce(NEW.focus_areas, '[]'::jsonb)), 'B') ||
+        setweight(to_tsvector('english', coalesce(NEW.description, '')), 'C');
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS donor_opportunities_search_vector_update ON donor_opportunities;
+
+CREATE TRIGGER donor_opportunities_search_vector_update
+    BEFORE INSERT OR UPDATE OF title, description, keywords, focus_areas
+    ON donor_opportunities
+    FOR EACH ROW
+    EXECUTE FUNCTION donor_opportunities_search_vector();
+
+UPDATE donor_opportunities
+SET search_vector =
+    setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce(keywords, '[]'::jsonb)), 'B') ||
+    setweight(to_tsvector('english', coalesce(focus_areas, '[]'::jsonb)), 'B') ||
+    setweight(to_tsvector('english', coalesce(description, '')), 'C');
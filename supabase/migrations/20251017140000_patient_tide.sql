@@ -0,0 +1,21 @@
+/*
+  # Dedicated column for learned target change rates
+
+  1. Columns
+    - `search_targets.change_rate` - moving average (0-1) of how often a
+      fetch of the target yields something new; the adaptive scheduler
+      derives the polling interval from it. NULL until first learned.
+
+  2. Data
+    - The scheduler stored this value in `success_rate` until now, and
+      nothing else writes that column for search targets: move it over and
+      reset `success_rate` to its default
+*/
+
+ALTER TABLE search_targets ADD COLUMN IF NOT EXISTS change_rate float;
+
+UPDATE search_targets
+SET change_rate = success_rate,
+    success_rate = 0.0
+WHERE change_rate IS NULL
+  AND success_rate > 0;